@@ -0,0 +1,80 @@
+"""
+Event-loop latency while one session does heavy post-processing.
+
+Runs aggregates.summarize_delegation over a synthetic delegation, first inline on
+the event loop and then through offload.WorkerPool, while LoopLagMonitor samples
+how late the loop wakes up. This is the lag every other MCP session would see.
+With the pool, lag should stay flat.
+
+Usage:
+    uv run python benchmarks/event_loop_latency.py [--bills 50000] [--rounds 3]
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "congress"))
+
+from aggregates import summarize_delegation  # noqa: E402
+from offload import LoopLagMonitor, WorkerPool  # noqa: E402
+from records import Bill, Member  # noqa: E402
+
+POLICY_AREAS = ["Energy", "Health", "Taxation", "Armed Forces and National Security", "Agriculture and Food", None]
+
+
+def synthetic_delegation(bill_count, member_count=10):
+    members = [Member(f"M{index:06d}", f"Member {index}", "Independent") for index in range(member_count)]
+    sponsored = {}
+    cosponsored = {}
+    for member in members:
+        items = [Bill.from_api({
+            "congress": random.choice([116, 117, 118]),
+            "type": random.choice(["HR", "S", "HRES"]),
+            "number": random.randrange(bill_count),
+            "title": "A bill to amend title 42 " * 4,
+            "policyArea": {"name": random.choice(POLICY_AREAS)},
+            "latestAction": {"actionDate": f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+                             "text": "Referred to the Committee on Energy and Commerce."},
+            "url": "https://api.congress.gov/v3/bill/118/hr/1",
+        }) for _ in range(bill_count // member_count)]
+        sponsored[member.bioguide_id] = items[:len(items) // 10]
+        cosponsored[member.bioguide_id] = items[len(items) // 10:]
+    return members, sponsored, cosponsored
+
+
+async def measure(pool, payload, rounds):
+    monitor = LoopLagMonitor()
+    monitor.start()
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await pool.run(summarize_delegation, *payload, size=1, threshold=1)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.1)
+    monitor.stop()
+    return elapsed, monitor.summary()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bills", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = synthetic_delegation(args.bills)
+    pool = WorkerPool(max_workers=2)
+    # start the workers outside the measurement
+    await pool.run(len, [], size=1, threshold=1)
+
+    print(f"{'mode':<10}{'seconds':>10}{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}")
+    for mode, runner in (("inline", WorkerPool(max_workers=0)), ("offloaded", pool)):
+        elapsed, lag = await measure(runner, payload, args.rounds)
+        print(f"{mode:<10}{elapsed:>10.2f}{lag.get('p50', 0):>12.2f}{lag.get('p99', 0):>12.2f}{lag.get('max', 0):>12.2f}")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
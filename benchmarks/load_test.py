@@ -0,0 +1,351 @@
+"""
+Load test of the congress MCP server with many concurrent sessions.
+
+Starts the server with the SSE transport against a local stand-in for the
+Congress.gov, FRED and Fiscal Data APIs, which answers every request with
+synthetic JSON after a fixed latency. For each session count, that many MCP
+sessions connect, wait for each other, and replay a tool-call mix, each call
+awaiting the previous one as a model would. The mix is sampled from the
+call_tool spans recorded by client.py in the trace file, or from DEFAULT_MIX
+when no calls were recorded.
+
+Reported per session count: calls per second, call latency percentiles, the
+server's event-loop lag (from the get_server_stats tool) and its resident memory,
+with the growth since the server started. The response cache TTL defaults to 0,
+so every call reaches the stand-in; pass --cache-ttl to measure cached serving.
+
+Usage:
+    uv run python benchmarks/load_test.py [--sessions 1,4,16,64] [--calls 20]
+        [--upstream-latency 0.1] [--traces cache/traces/spans.jsonl] [--output load.json]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVER_SCRIPT = ROOT / "congress" / "congress.py"
+TRACE_FILE = os.environ.get("CONGRESS_TRACE_FILE") or "cache/traces/spans.jsonl"
+STARTUP_TIMEOUT = 60  # seconds
+# tools that change server state, or whose arguments are only valid in the recorded session
+EXCLUDED_TOOLS = {"watch_bill", "unwatch_bill", "next_page", "get_server_stats", "diff_removed_env_pages"}
+STATES = ["CA", "TX", "NY", "FL", "OH", "MI", "WA", "AZ"]
+BILL_TYPES = ["hr", "s", "hres", "sres"]
+
+
+def _bill(rng):
+    return {"congress": 118, "bill_type": rng.choice(BILL_TYPES), "bill_number": rng.randint(1, 5000)}
+
+
+# (weight, tool, arguments(rng)), roughly the calls of a conversation about legislation
+DEFAULT_MIX = [
+    (10, "get_current_congress", lambda rng: {}),
+    (8, "get_bills", lambda rng: {}),
+    (14, "get_bill_details", _bill),
+    (10, "get_bill_actions", _bill),
+    (6, "get_bill_cosponsors", _bill),
+    (4, "get_bill_summaries", _bill),
+    (5, "get_bills_by_congress_and_type", lambda rng: {"congress": 118, "bill_type": rng.choice(BILL_TYPES)}),
+    (6, "get_member_details", lambda rng: {"bioguide_id": f"M{rng.randint(1, 535):06d}"}),
+    (5, "get_members_by_state", lambda rng: {"state_code": rng.choice(STATES)}),
+    (4, "get_member_sponsored_legislation", lambda rng: {"bioguide_id": f"M{rng.randint(1, 535):06d}"}),
+    (3, "get_committee_details", lambda rng: {"chamber": "house", "committee_code": "hsag00"}),
+    (2, "get_all_committees", lambda rng: {}),
+    (4, "get_daily_treasury_statement", lambda rng: {}),
+    (2, "get_debt_outstanding", lambda rng: {}),
+    (2, "get_fred_data_releases", lambda rng: {}),
+    (3, "search_bill_texts", lambda rng: {"query": rng.choice(["clean water", "tax credit", "veterans"])}),
+    (2, "get_state_delegation_activity", lambda rng: {"state_code": rng.choice(STATES)}),
+]
+
+# list key of a Congress.gov path, by its last non-numeric segment
+LIST_KEYS = {
+    "bill": "bills", "actions": "actions", "cosponsors": "cosponsors", "summaries": "summaries",
+    "committees": "committees", "committee": "committees", "member": "members", "congress": "congresses",
+    "sponsored-legislation": "sponsoredLegislation", "cosponsored-legislation": "cosponsoredLegislation",
+    "amendments": "amendments", "relatedbills": "relatedBills", "subjects": "legislativeSubjects",
+    "text": "textVersions", "titles": "titles", "releases": "releases", "series": "seriess",
+}
+DETAIL_KEYS = {"bill": "bill", "member": "member", "committee": "committee", "congress": "congress"}
+
+
+def synthetic_item(key, index):
+    """Return one list item shaped like the API's, for the list named key."""
+    if key in ("members",):
+        return {"bioguideId": f"M{index:06d}", "name": f"Member, Test {index}", "partyName": "Independent",
+                "state": STATES[index % len(STATES)], "district": index % 20,
+                "terms": {"item": [{"chamber": "House of Representatives", "startYear": 2023}]},
+                "url": f"https://api.congress.gov/v3/member/M{index:06d}?format=json"}
+    if key in ("bills", "sponsoredLegislation", "cosponsoredLegislation", "relatedBills"):
+        return {"congress": 118, "type": "HR", "number": str(index), "originChamber": "House",
+                "title": "To amend the Federal Water Pollution Control Act with respect to permits " * 2,
+                "introducedDate": "2024-03-01", "policyArea": {"name": "Environmental Protection"},
+                "latestAction": {"actionDate": "2024-03-05", "text": "Referred to the Committee on "
+                                 "Transportation and Infrastructure."},
+                "updateDate": "2024-03-06T12:00:00Z",
+                "url": f"https://api.congress.gov/v3/bill/118/hr/{index}?format=json"}
+    return {"name": f"Item {index}", "actionDate": "2024-03-05", "systemCode": f"hsxx{index:02d}",
+            "text": "Referred to the Committee on Energy and Commerce.", "updateDate": "2024-03-06T12:00:00Z"}
+
+
+def synthetic_body(path, items):
+    """Return a JSON body for any upstream path."""
+    segments = [segment for segment in path.strip("/").split("/") if segment]
+    if "fiscal_service" in segments:
+        rows = [{"record_date": f"2024-03-{1 + index % 28:02d}", "account_type": "Treasury General Account",
+                 "open_today_bal": str(700000 + index), "close_today_bal": str(710000 + index)}
+                for index in range(items)]
+        return {"data": rows, "meta": {"count": items, "total-count": items, "total-pages": 1}}
+    names = [segment for segment in segments if not segment.isdigit() and segment not in BILL_TYPES
+             and segment not in STATES and segment.lower() not in ("v3", "fred")]
+    name = names[-1] if names else ""
+    if segments and segments[-1].isdigit() and name in DETAIL_KEYS:
+        return {DETAIL_KEYS[name]: synthetic_item(LIST_KEYS[name], int(segments[-1])), "request": {"format": "json"}}
+    key = LIST_KEYS.get(name, "items")
+    return {key: [synthetic_item(key, index) for index in range(1, items + 1)],
+            "pagination": {"count": items}, "request": {"format": "json"}}
+
+
+def serve_upstream(port, latency, items):
+    """Serve synthetic API responses on port, each after latency seconds (runs in its own process)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = json.dumps(synthetic_body(urlparse(self.path).path, items)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def recorded_calls(path):
+    """Return [(tool, arguments)] of the call_tool spans recorded by client.py."""
+    calls = []
+    try:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if '"mcp.arguments"' not in line:
+                    continue
+                for resource_spans in json.loads(line)["resourceSpans"]:
+                    for scope_spans in resource_spans["scopeSpans"]:
+                        for span in scope_spans["spans"]:
+                            attributes = {attribute["key"]: next(iter(attribute["value"].values()))
+                                          for attribute in span["attributes"]}
+                            if attributes.get("mcp.tool") in EXCLUDED_TOOLS or "mcp.arguments" not in attributes:
+                                continue
+                            calls.append((attributes["mcp.tool"], json.loads(attributes["mcp.arguments"])))
+    except FileNotFoundError:
+        pass
+    return calls
+
+
+def call_plan(rng, recorded, count):
+    """Return count (tool, arguments) calls sampled from the recorded calls or DEFAULT_MIX."""
+    if recorded:
+        return rng.choices(recorded, k=count)
+    weights = [weight for weight, _, _ in DEFAULT_MIX]
+    return [(name, arguments(rng)) for _, name, arguments in rng.choices(DEFAULT_MIX, weights, k=count)]
+
+
+def percentile(values, q):
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def start_server(directory, upstream, port, cache_ttl):
+    env = {
+        **os.environ,
+        "CONGRESS_API_KEY": os.environ.get("CONGRESS_API_KEY", "load-test"),
+        "FRED_API_KEY": os.environ.get("FRED_API_KEY", "load-test"),
+        "CONGRESS_API_ROOT": f"{upstream}/",
+        "FRED_API_ROOT": f"{upstream}/fred/",
+        "FISCALDATA_API_ROOT": f"{upstream}/services/api/fiscal_service/",
+        "CONGRESS_MCP_TRANSPORT": "sse",
+        "FASTMCP_HOST": "127.0.0.1",
+        "FASTMCP_PORT": str(port),
+        "FASTMCP_LOG_LEVEL": "WARNING",
+        "CONGRESS_CACHE_TTL": str(cache_ttl),
+        "CONGRESS_HOT_TTL": str(cache_ttl),
+        "CONGRESS_HOT_MAX_STALE": "0",
+        "CONGRESS_HOT_REFRESH_SECONDS": "0",
+        "CONGRESS_WATCH_POLL_SECONDS": "0",
+    }
+    env.pop("CONGRESS_OFFLINE_BUNDLE", None)
+    log = open(Path(directory) / "server.log", "w")
+    # a fresh working directory, so cache/ starts empty and the repository's is untouched
+    return subprocess.Popen([sys.executable, str(SERVER_SCRIPT)], cwd=directory, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+
+async def wait_for_server(process, port):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"the server exited with {process.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"the server did not listen on port {port} within {STARTUP_TIMEOUT} s")
+
+
+def tool_json(result):
+    return json.loads(result.content[0].text)
+
+
+async def run_session(url, calls, ready, start, latencies, failures):
+    async with sse_client(url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            ready()
+            await start.wait()
+            for name, arguments in calls:
+                began = time.perf_counter()
+                try:
+                    result = await session.call_tool(name, arguments)
+                    text = result.content[0].text if result.content else ""
+                    failed = result.isError or text.startswith("Unable")
+                except Exception:
+                    failed = True
+                latencies.append(time.perf_counter() - began)
+                failures[name] = failures.get(name, 0) + failed
+
+
+async def run_level(url, sessions, plans):
+    """Run one session per plan concurrently; return wall seconds, latencies and failures by tool."""
+    latencies, failures, connected = [], {}, 0
+    all_ready, start = asyncio.Event(), asyncio.Event()
+
+    def ready():
+        nonlocal connected
+        connected += 1
+        if connected == sessions:
+            all_ready.set()
+
+    tasks = [asyncio.create_task(run_session(url, plan, ready, start, latencies, failures)) for plan in plans]
+    waiting = asyncio.create_task(all_ready.wait())
+    await asyncio.wait([waiting, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    began = time.perf_counter()
+    start.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - began
+    waiting.cancel()
+    session_errors = [result for result in results if isinstance(result, BaseException)]
+    return elapsed, latencies, failures, session_errors
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", default="1,4,16,64", help="comma-separated session counts")
+    parser.add_argument("--calls", type=int, default=20, help="tool calls per session")
+    parser.add_argument("--upstream-latency", type=float, default=0.1, help="seconds per upstream response")
+    parser.add_argument("--items", type=int, default=20, help="items per upstream list response")
+    parser.add_argument("--cache-ttl", type=int, default=0, help="response cache TTL of the server, seconds")
+    parser.add_argument("--traces", default=TRACE_FILE, help="trace file with recorded client.py calls")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    levels = [int(count) for count in args.sessions.split(",")]
+    recorded = recorded_calls(args.traces)
+    rng = random.Random(args.seed)
+    print(f"replaying {'%d recorded calls' % len(recorded) if recorded else 'the default mix'}, "
+          f"{args.calls} calls per session, upstream latency {args.upstream_latency * 1000:.0f} ms")
+
+    upstream_port, server_port = free_port(), free_port()
+    upstream = multiprocessing.Process(target=serve_upstream, daemon=True,
+                                       args=(upstream_port, args.upstream_latency, args.items))
+    upstream.start()
+    directory = tempfile.mkdtemp(prefix="congress-load-")
+    server = start_server(directory, f"http://127.0.0.1:{upstream_port}", server_port, args.cache_ttl)
+    url = f"http://127.0.0.1:{server_port}/sse"
+    results = []
+    try:
+        await wait_for_server(server, server_port)
+        async with sse_client(url) as (read, write):
+            async with ClientSession(read, write) as control:
+                await control.initialize()
+                # warm up imports and code paths once, then take the memory baseline
+                for name, arguments in {name: arguments for name, arguments in call_plan(rng, recorded, 50)}.items():
+                    await control.call_tool(name, arguments)
+                baseline = tool_json(await control.call_tool("get_server_stats", {"reset": True}))["memory"]
+
+                print(f"{'sessions':>8}{'calls':>7}{'errors':>8}{'calls/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+                      f"{'p99 ms':>9}{'lag p99':>9}{'lag max':>9}{'RSS MiB':>9}{'growth':>8}")
+                for sessions in levels:
+                    plans = [call_plan(rng, recorded, args.calls) for _ in range(sessions)]
+                    await control.call_tool("get_server_stats", {"reset": True})
+                    elapsed, latencies, failures, session_errors = await run_level(url, sessions, plans)
+                    stats = tool_json(await control.call_tool("get_server_stats", {"reset": True}))
+                    latencies_ms = sorted(latency * 1000 for latency in latencies)
+                    lag, memory = stats["loopLag"], stats["memory"]
+                    row = {
+                        "sessions": sessions,
+                        "calls": len(latencies),
+                        "errors": sum(failures.values()),
+                        "failedSessions": len(session_errors),
+                        "callsPerSecond": round(len(latencies) / elapsed, 1) if elapsed else 0,
+                        "p50": round(percentile(latencies_ms, 50), 1),
+                        "p95": round(percentile(latencies_ms, 95), 1),
+                        "p99": round(percentile(latencies_ms, 99), 1),
+                        "loopLag": lag,
+                        "memory": memory,
+                        "rssGrowthMiB": round(memory["rssMiB"] - baseline["rssMiB"], 1),
+                        "errorsByTool": {name: count for name, count in failures.items() if count},
+                    }
+                    results.append(row)
+                    print(f"{sessions:>8}{row['calls']:>7}{row['errors']:>8}{row['callsPerSecond']:>9.1f}"
+                          f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}{lag.get('p99', 0):>9.1f}"
+                          f"{lag.get('max', 0):>9.1f}{memory['rssMiB']:>9.1f}{row['rssGrowthMiB']:>8.1f}")
+                    for error in session_errors[:3]:
+                        print(f"    session failed: {type(error).__name__}: {error}")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        upstream.terminate()
+    if args.output:
+        settings = {key: value for key, value in vars(args).items() if key != "output"}
+        Path(args.output).write_text(json.dumps({"settings": settings, "baseline": baseline,
+                                                 "levels": results}, indent=2))
+    print(f"server log: {Path(directory) / 'server.log'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
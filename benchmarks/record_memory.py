@@ -0,0 +1,108 @@
+"""
+Memory per bill and per member: JSON dicts versus compact records.
+
+Builds a synthetic full-congress bill list and member roster shaped like the
+Congress.gov list responses, parses it with json.loads as the clients do, and
+measures the retained size of the parsed dicts and of records.Bill/records.Member
+built from them with tracemalloc. Also times the conversion both ways.
+
+Usage:
+    uv run python benchmarks/record_memory.py [--bills 15000] [--members 540]
+"""
+from pathlib import Path
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "congress"))
+
+from records import Bill, Member  # noqa: E402
+
+BILL_TYPES = ["HR", "S", "HRES", "SRES", "HJRES", "SJRES", "HCONRES", "SCONRES"]
+POLICY_AREAS = ["Energy", "Health", "Taxation", "Armed Forces and National Security", "Agriculture and Food",
+                "Crime and Law Enforcement", "Education", "Immigration", "Transportation and Public Works"]
+ACTIONS = ["Referred to the House Committee on Energy and Commerce.",
+           "Read twice and referred to the Committee on Finance.",
+           "Referred to the Committee on Ways and Means, and in addition to the Committee on the Budget.",
+           "Became Public Law No: 118-31.", "Passed/agreed to in House: On motion to suspend the rules and pass."]
+STATES = ["California", "Texas", "New York", "Florida", "Ohio", "Georgia", "Michigan", "Illinois"]
+PARTIES = ["Democratic", "Republican", "Independent"]
+
+
+def synthetic_bills(count):
+    return json.dumps({"bills": [{
+        "congress": 118,
+        "type": (bill_type := random.choice(BILL_TYPES)),
+        "number": str(number),
+        "originChamber": "House" if bill_type.startswith("H") else "Senate",
+        "originChamberCode": bill_type[0],
+        "title": f"To amend title {random.randint(1, 50)} of the United States Code to provide for {number}.",
+        "policyArea": {"name": random.choice(POLICY_AREAS)},
+        "introducedDate": f"2023-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+        "latestAction": {"actionDate": f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+                         "text": random.choice(ACTIONS)},
+        "updateDate": f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}T12:00:00Z",
+        "url": f"https://api.congress.gov/v3/bill/118/{bill_type.lower()}/{number}?format=json",
+    } for number in range(1, count + 1)]})
+
+
+def synthetic_members(count):
+    return json.dumps({"members": [{
+        "bioguideId": f"M{index:06d}",
+        "name": f"Lastname{index}, Firstname",
+        "partyName": random.choice(PARTIES),
+        "state": random.choice(STATES),
+        "district": random.randint(1, 30),
+        "depiction": {"imageUrl": f"https://www.congress.gov/img/member/m{index:06d}_200.jpg",
+                      "attribution": "Image courtesy of the Member"},
+        "terms": {"item": [{"chamber": "House of Representatives", "startYear": 2015 + 2 * term}
+                           for term in range(random.randint(1, 5))]},
+        "updateDate": "2024-06-01T12:00:00Z",
+        "url": f"https://api.congress.gov/v3/member/M{index:06d}?format=json",
+    } for index in range(count)]})
+
+
+def retained(build):
+    """Return the object built and the bytes it retains, as traced by tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return value, size
+
+
+def compare(name, raw, items_key, record_type):
+    items, dict_bytes = retained(lambda: json.loads(raw)[items_key])
+    start = time.perf_counter()
+    records, record_bytes = retained(lambda: [record_type.from_api(item) for item in items])
+    from_api_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    output = [record.to_dict() for record in records]
+    to_dict_seconds = time.perf_counter() - start
+    count = len(items)
+    print(f"{name:<8}{count:>8}{dict_bytes / count:>12.0f}{record_bytes / count:>12.0f}"
+          f"{dict_bytes / record_bytes:>8.1f}x{count / from_api_seconds:>14,.0f}{count / to_dict_seconds:>14,.0f}")
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bills", type=int, default=15000)
+    parser.add_argument("--members", type=int, default=540)
+    args = parser.parse_args()
+
+    print(f"{'entity':<8}{'count':>8}{'dict B/ea':>12}{'record B/ea':>12}{'ratio':>9}"
+          f"{'from_api /s':>14}{'to_dict /s':>14}")
+    compare("bills", synthetic_bills(args.bills), "bills", Bill)
+    compare("members", synthetic_members(args.members), "members", Member)
+
+
+if __name__ == "__main__":
+    main()
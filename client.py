@@ -1,27 +1,135 @@
+import argparse
 import asyncio
-from dataclasses import dataclass
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
 from typing import Optional
 from contextlib import AsyncExitStack
 
-from mcp import ClientSession, StdioServerParameters
+from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 
+from congress.tracing import CLIENT, TRACE_ARGUMENTS, Tracer, summarize_trace
+
 load_dotenv()  # load environment variables from .env
 
+# how long a tool result may be reused within a session, in seconds; 0 never reuses it
+MEMO_TTL = int(os.environ.get("CONGRESS_MEMO_TTL", 10 * 60))
+MEMO_MAX_BYTES = int(os.environ.get("CONGRESS_MEMO_MAX_BYTES", 8 * 1024 * 1024))
+MEMO_TTLS = {
+    # side effects, or state that changes between calls
+    "watch_bill": 0,
+    "unwatch_bill": 0,
+    "get_bill_watch_feed": 0,
+    "next_page": 0,
+    "get_cache_stats": 0,
+    "get_prefetch_stats": 0,
+    "get_server_stats": 0,
+    # published at most daily
+    "get_daily_treasury_statement": 60,
+    "get_daily_treasury_operating_cash_activities": 60,
+    "get_public_debt_transactions": 60,
+    "aggregate_treasury_table": 60,
+    # rarely changes
+    "get_all_congresses": 60 * 60,
+    "get_current_congress": 60 * 60,
+    "get_congress_details": 60 * 60,
+}
+
 @dataclass
 class AIMessage:
     role: str
     content: str
 
 
+@dataclass
+class QueryResult:
+    query: str
+    answer: list[str] = field(default_factory=list)
+    latency: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    model_calls: int = 0
+    tool_calls: int = 0
+    memo_hits: int = 0
+    trace_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class ToolMemo:
+    """ Tool results of one session, keyed by tool name and canonical arguments.
+
+    Each tool's results are reused for its MEMO_TTLS entry, or MEMO_TTL, seconds.
+    Entries are evicted least recently used first beyond max_bytes of result text.
+    Error results are not kept.
+    """
+
+    def __init__(self, ttls=MEMO_TTLS, default_ttl=MEMO_TTL, max_bytes=MEMO_MAX_BYTES):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (result, size, stored_at)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def key(name, arguments):
+        return name, json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+    def ttl(self, name):
+        return self.ttls.get(name, self.default_ttl)
+
+    def get(self, name, arguments):
+        key = self.key(name, arguments)
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() - entry[2] >= self.ttl(name):
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.bytes_saved += entry[1]
+        return entry[0]
+
+    def put(self, name, arguments, result):
+        texts = [getattr(content, "text", "") or "" for content in result.content]
+        if self.ttl(name) <= 0 or result.isError or any(text.startswith("Unable to") for text in texts):
+            return
+        size = sum(map(len, texts))
+        if size > self.max_bytes:
+            return
+        key = self.key(name, arguments)
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (result, size, time.monotonic())
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted, _) = self.entries.popitem(last=False)
+            self.bytes -= evicted
+
+    def summary(self):
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses,
+                "bytesSaved": self.bytes_saved}
+
+
 class MCPClient:
     def __init__(self):
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
-        self.anthropic = Anthropic()
+        self.anthropic = AsyncAnthropic()
+        self.tracer = Tracer("mcp-client", keep=True)
+        self.memo = ToolMemo()
 
     async def connect_to_server(self, server_script_path: str):
         """Connect to an MCP server
@@ -52,8 +160,111 @@ class MCPClient:
         tools = response.tools
         print("\nConnected to server with tools:", [tool.name for tool in tools])
 
+    async def call_tool(self, name: str, arguments: dict):
+        """Call a tool on the server, passing the current trace context in the request _meta"""
+        # the arguments let benchmarks/load_test.py replay recorded calls
+        with self.tracer.span(f"call_tool {name}", kind=CLIENT, category="mcp",
+                              **{"mcp.tool": name,
+                                 "mcp.arguments": json.dumps(arguments) if TRACE_ARGUMENTS else None}) as span:
+            return await self.session.send_request(
+                types.ClientRequest(
+                    types.CallToolRequest(
+                        method="tools/call",
+                        params=types.CallToolRequestParams(
+                            name=name,
+                            arguments=arguments,
+                            _meta=types.RequestParams.Meta(traceparent=span.traceparent),
+                        ),
+                    )
+                ),
+                types.CallToolResult,
+            )
+
+    async def memoized_call_tool(self, name: str, arguments: dict, result: QueryResult):
+        """Call a tool, or answer a repeated call from the session memo"""
+        tool_result = self.memo.get(name, arguments)
+        if tool_result is not None:
+            result.memo_hits += 1
+            with self.tracer.span(f"call_tool {name}", category="memo", **{"mcp.tool": name, "mcp.memoized": True}):
+                return tool_result
+        tool_result = await self.call_tool(name, arguments)
+        self.memo.put(name, arguments, tool_result)
+        return tool_result
+
     async def process_query(self, query: str) -> str:
         """Process a query using Claude and available tools with preserved context for agentic behavior"""
+        result = QueryResult(query)
+        with self.tracer.span("query", category="query") as span:
+            text = await self._process_query(query, result, echo=True)
+        print(summarize_trace(span.trace_id, self.tracer.pop_trace(span.trace_id)))
+        memo = self.memo.summary()
+        print(f"Tool calls: {result.tool_calls}, {result.memo_hits} answered from the session memo "
+              f"({memo['entries']} results, {memo['bytes'] / 1024:.0f} KiB held, "
+              f"{memo['bytesSaved'] / 1024:.0f} KiB not refetched this session)")
+        return text
+
+    async def run_query(self, query: str) -> QueryResult:
+        """Process a query without printing, returning its answer, latency, token and tool call counts"""
+        result = QueryResult(query)
+        started = time.perf_counter()
+        with self.tracer.span("query", category="query") as span:
+            result.trace_id = span.trace_id
+            try:
+                await self._process_query(query, result, echo=False)
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+        self.tracer.pop_trace(span.trace_id)
+        result.latency = round(time.perf_counter() - started, 3)
+        return result
+
+    async def run_batch(self, input_path: str, output_path: str, concurrency: int = 4) -> dict:
+        """Run every query of a JSONL file, at most `concurrency` conversations at a time
+
+        Each input line is a JSON string or an object with a "query" key; other keys are
+        copied to the output line. Results are appended to output_path as they complete.
+
+        Returns:
+            dict: Aggregate throughput, latency percentiles, token and tool call totals
+        """
+        with open(input_path, encoding="utf-8") as file:
+            items = [json.loads(line) for line in file if line.strip()]
+        items = [item if isinstance(item, dict) else {"query": item} for item in items]
+        slots = asyncio.Semaphore(concurrency)
+        results = []
+
+        async def run(index, item):
+            async with slots:
+                result = await self.run_query(item["query"])
+            results.append(result)
+            line = {"index": index, **item, **asdict(result), "answer": "\n".join(result.answer)}
+            output.write(json.dumps(line) + "\n")
+            output.flush()
+            print(f"[{len(results)}/{len(items)}] {result.latency:.1f}s {result.tool_calls} tool calls"
+                  f"{' ERROR ' + result.error if result.error else ''}: {item['query'][:60]}")
+
+        started = time.perf_counter()
+        with open(output_path, "w", encoding="utf-8") as output:
+            await asyncio.gather(*(run(index, item) for index, item in enumerate(items)))
+        elapsed = time.perf_counter() - started
+        latencies = [result.latency for result in results]
+        return {
+            "queries": len(results),
+            "errors": sum(1 for result in results if result.error),
+            "concurrency": concurrency,
+            "elapsed": round(elapsed, 2),
+            "queries_per_minute": round(60 * len(results) / elapsed, 2) if elapsed else 0.0,
+            "latency_p50": percentile(latencies, 0.5),
+            "latency_p95": percentile(latencies, 0.95),
+            "latency_max": max(latencies, default=0.0),
+            "input_tokens": sum(result.input_tokens for result in results),
+            "output_tokens": sum(result.output_tokens for result in results),
+            "model_calls": sum(result.model_calls for result in results),
+            "tool_calls": sum(result.tool_calls for result in results),
+            "memo_hits": sum(result.memo_hits for result in results),
+            "memo": self.memo.summary(),
+        }
+
+    async def _process_query(self, query: str, result: QueryResult, echo: bool) -> str:
         messages = []
         messages.append({
             "role": "user",
@@ -78,20 +289,29 @@ class MCPClient:
 
         while True:
             # Send a request to the LLM with available tools and current conversation context
-            response = self.anthropic.messages.create(
-                model="claude-3-7-sonnet-20250219",
-                max_tokens=4196,
-                messages=messages,
-                tools=available_tools
-            )
+            with self.tracer.span("messages.create", kind=CLIENT, category="model") as span:
+                response = await self.anthropic.messages.create(
+                    model="claude-3-7-sonnet-20250219",
+                    max_tokens=4196,
+                    messages=messages,
+                    tools=available_tools
+                )
+                span.set("gen_ai.request.model", response.model)
+                span.set("gen_ai.usage.input_tokens", response.usage.input_tokens)
+                span.set("gen_ai.usage.output_tokens", response.usage.output_tokens)
+            result.model_calls += 1
+            result.input_tokens += response.usage.input_tokens
+            result.output_tokens += response.usage.output_tokens
 
             # Handle response from the LLM
             for content in response.content:
                 if content.type == 'text':
                     # final_text.append(content.text)
-                    print("<------------------>")
-                    print(content.text)
-                    print("<------------------>")
+                    result.answer.append(content.text)
+                    if echo:
+                        print("<------------------>")
+                        print(content.text)
+                        print("<------------------>")
                     messages.append({
                         "role": "assistant",
                         "content": content.text
@@ -102,8 +322,9 @@ class MCPClient:
                     tool_args = content.input
 
                     # Execute the tool call and store the result
-                    result = await self.session.call_tool(tool_name, tool_args)
-                    tool_results.append({"call": tool_name, "result": result})
+                    tool_result = await self.memoized_call_tool(tool_name, tool_args, result)
+                    result.tool_calls += 1
+                    tool_results.append({"call": tool_name, "result": tool_result})
 
                     # Add tool call and result to messages
                     messages.append({
@@ -125,7 +346,7 @@ class MCPClient:
                         "content": [{
                             "type": "tool_result",
                             "tool_use_id": content.id,
-                            "content": result.content[0].text
+                            "content": tool_result.content[0].text
                         }]
 
                     })
@@ -161,17 +382,23 @@ class MCPClient:
         await self.exit_stack.aclose()
 
 async def main():
-    if len(sys.argv) < 2:
-        print("Usage: python client.py <path_to_server_script>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Chat with an MCP server, or run a batch of queries")
+    parser.add_argument("server_script", help="path to the server script (.py or .js)")
+    parser.add_argument("--batch", metavar="QUERIES_JSONL", help="run the queries in this file instead of chatting")
+    parser.add_argument("--output", default="answers.jsonl", help="where batch results are written")
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel conversations in batch mode")
+    args = parser.parse_args()
 
     client = MCPClient()
     try:
-        await client.connect_to_server(sys.argv[1])
-        await client.chat_loop()
+        await client.connect_to_server(args.server_script)
+        if args.batch:
+            summary = await client.run_batch(args.batch, args.output, args.concurrency)
+            print(json.dumps(summary, indent=2))
+        else:
+            await client.chat_loop()
     finally:
         await client.cleanup()
 
 if __name__ == "__main__":
-    import sys
     asyncio.run(main())
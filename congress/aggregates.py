@@ -0,0 +1,212 @@
+"""
+Aggregated views built from several Congress.gov endpoints.
+
+Each aggregate fetches its underlying lists concurrently through paging.fetch_all
+and summarizes them server-side, so the agent gets one compact answer instead of
+making dozens of tool calls. When a list could only be fetched in part, the
+summary names it under "incomplete" and the status is PARTIAL.
+
+"""
+import asyncio
+from collections import Counter
+
+from offload import worker_pool
+from paging import PARTIAL, fetch, fetch_all
+from records import Bill, Member
+
+SUMMARY_LIMIT = 25
+OFFLOAD_ITEMS = 5000  # summaries over more list items than this run in a worker process
+COMMITTEE_ITEM_CAP = 1000
+COMMITTEE_RESOURCES = {
+    "bills": ("bills", ("committee-bills", "bills")),
+    "reports": ("reports", "reports"),
+    "nominations": ("nominations", "nominations"),
+    "houseCommunications": ("house-communication", "houseCommunications"),
+    "senateCommunications": ("senate-communication", "senateCommunications"),
+}
+
+
+def summarize_delegation(members, sponsored, cosponsored, congress=None, limit=SUMMARY_LIMIT):
+    """Combine each member's sponsored and cosponsored legislation into one summary.
+
+    Args:
+        members (list): Member records of the delegation.
+        sponsored (dict): Sponsored legislation Bill records by bioguide ID.
+        cosponsored (dict): Cosponsored legislation Bill records by bioguide ID.
+        congress (int, optional): Only count legislation from this congress.
+        limit (int): Maximum number of shared bills and latest actions to return.
+
+    Returns:
+        dict: The de-duplicated, aggregated summary.
+    """
+    bills = {}
+    member_summaries = []
+    for member in members:
+        bioguide_id = member.bioguide_id
+        counts = {}
+        for role, items in (("sponsor", sponsored.get(bioguide_id, [])),
+                            ("cosponsor", cosponsored.get(bioguide_id, []))):
+            count = 0
+            for item in items:
+                if congress and item.congress != congress:
+                    continue
+                count += 1
+                key = item.key
+                if key not in bills:
+                    bills[key] = {**item.to_dict(), "sponsors": [], "cosponsors": []}
+                bill = bills[key]
+                bill[f"{role}s"].append(bioguide_id)
+            counts[role] = count
+        member_summaries.append({
+            "bioguideId": bioguide_id,
+            "name": member.name,
+            "party": member.party,
+            "district": member.district or None,
+            "sponsored": counts["sponsor"],
+            "cosponsored": counts["cosponsor"],
+        })
+
+    def members_on(bill):
+        return len(set(bill["sponsors"]) | set(bill["cosponsors"]))
+
+    def action_date(bill):
+        return (bill["latestAction"] or {}).get("actionDate") or ""
+
+    shared = sorted(
+        (bill for bill in bills.values() if members_on(bill) > 1),
+        key=lambda bill: (members_on(bill), action_date(bill)),
+        reverse=True,
+    )
+    latest = sorted(bills.values(), key=action_date, reverse=True)
+    by_policy_area = Counter(bill["policyArea"] or "Unspecified" for bill in bills.values())
+
+    return {
+        "members": member_summaries,
+        "totalBills": len(bills),
+        "billsByPolicyArea": dict(by_policy_area.most_common()),
+        "sharedBillCount": len(shared),
+        "sharedBills": shared[:limit],
+        "latestActions": [
+            {"bill": bill["bill"], "title": bill["title"], "latestAction": bill["latestAction"]}
+            for bill in latest[:limit]
+        ],
+    }
+
+
+async def delegation_activity(client, state_code, congress=None, limit=SUMMARY_LIMIT):
+    """Fetch and summarize the legislative activity of a state's current delegation.
+
+    The delegation is resolved first, then every member's full sponsored and
+    cosponsored legislation lists are fetched concurrently.
+
+    Returns:
+        tuple: The summary from summarize_delegation() and a status code.
+    """
+    members, status = await fetch_all(
+        client, f"member/{state_code.upper()}", "members", params={"currentMember": "true"}
+    )
+    if status not in (200, PARTIAL) or not members:
+        return None, status if status not in (200, PARTIAL) else 404
+    incomplete = ["members"] if status == PARTIAL else []
+
+    members = [Member.from_api(member) for member in members]
+    ids = [member.bioguide_id for member in members]
+
+    async def legislation(bioguide_id, kind, items_key):
+        # converted as each list arrives, so the raw dicts of every list are never held at once
+        items, list_status = await fetch_all(client, f"member/{bioguide_id}/{kind}-legislation", items_key)
+        if list_status != 200:
+            incomplete.append(f"{kind} legislation of {bioguide_id}")
+        return [Bill.from_api(item) for item in items or []]
+
+    results = await asyncio.gather(
+        *(legislation(bioguide_id, "sponsored", "sponsoredLegislation") for bioguide_id in ids),
+        *(legislation(bioguide_id, "cosponsored", "cosponsoredLegislation") for bioguide_id in ids),
+    )
+    sponsored = dict(zip(ids, results[:len(ids)]))
+    cosponsored = dict(zip(ids, results[len(ids):]))
+
+    item_count = sum(map(len, sponsored.values())) + sum(map(len, cosponsored.values()))
+    summary = await worker_pool.run(summarize_delegation, members, sponsored, cosponsored, congress, limit,
+                                    size=item_count, threshold=OFFLOAD_ITEMS)
+    summary["state"] = state_code.upper()
+    summary["congress"] = congress
+    if incomplete:
+        summary["incomplete"] = incomplete
+        return summary, PARTIAL
+    return summary, 200
+
+
+def summarize_committee(details, lists, limit=SUMMARY_LIMIT):
+    """Compute summary statistics over a committee's bills, reports, nominations and communications.
+
+    Args:
+        details (dict): The committee object from the committee/{chamber}/{code} endpoint.
+        lists (dict): Items for each key of COMMITTEE_RESOURCES.
+        limit (int): Maximum number of recent items to return per list.
+
+    Returns:
+        dict: The committee snapshot.
+    """
+    bills = lists["bills"]
+    referred = [bill for bill in bills if (bill.get("relationshipType") or "").startswith("Referred")]
+    communications = lists["houseCommunications"] + lists["senateCommunications"]
+
+    def month(date):
+        return (date or "")[:7] or "Unknown"
+
+    def recent(items, date_field):
+        return sorted(items, key=lambda item: item.get(date_field) or "", reverse=True)[:limit]
+
+    stats = {
+        "billsReferredByMonth": dict(sorted(Counter(month(bill.get("actionDate")) for bill in referred).items())),
+        "billsByRelationship": dict(Counter(bill.get("relationshipType") or "Unknown" for bill in bills).most_common()),
+        "reportsFiled": len(lists["reports"]),
+        "reportsByCongress": dict(sorted(Counter(report.get("congress") or 0 for report in lists["reports"]).items())),
+        "nominationsByCongress": dict(sorted(Counter(nom.get("congress") or 0 for nom in lists["nominations"]).items())),
+        "communicationsByType": dict(Counter(
+            (comm.get("communicationType") or {}).get("name") or "Unknown" for comm in communications
+        ).most_common()),
+    }
+    return {
+        "committee": details,
+        "counts": {name: len(items) for name, items in lists.items()},
+        "stats": stats,
+        "recentBills": recent(bills, "actionDate"),
+        "recentReports": recent(lists["reports"], "updateDate"),
+        "recentNominations": recent(lists["nominations"], "receivedDate"),
+        "recentCommunications": recent(communications, "updateDate"),
+    }
+
+
+async def committee_snapshot(client, chamber, committee_code, max_items=COMMITTEE_ITEM_CAP, limit=SUMMARY_LIMIT):
+    """Fetch a committee's details and every sub-resource list concurrently and summarize them.
+
+    Each list is paginated fully, up to max_items items.
+
+    Returns:
+        tuple: The summary from summarize_committee() and a status code.
+    """
+    base = f"committee/{chamber.lower()}/{committee_code.lower()}"
+    details_result, *list_results = await asyncio.gather(
+        fetch(client, base),
+        *(fetch_all(client, f"{base}/{path}", items_key, max_items=max_items)
+          for path, items_key in COMMITTEE_RESOURCES.values()),
+    )
+    details, status = details_result
+    if status != 200:
+        return None, status
+
+    lists = {}
+    incomplete = []
+    for name, (items, list_status) in zip(COMMITTEE_RESOURCES, list_results):
+        # not every committee has every sub-resource, e.g. house committees and senate communications
+        lists[name] = items or []
+        if list_status not in (200, 404):
+            incomplete.append(name)
+    summary = await worker_pool.run(summarize_committee, details.get("committee", details), lists, limit,
+                                    size=sum(map(len, lists.values())), threshold=OFFLOAD_ITEMS)
+    if incomplete:
+        summary["incomplete"] = incomplete
+        return summary, PARTIAL
+    return summary, 200
@@ -0,0 +1,177 @@
+"""
+Section-by-section diff between two stored versions of a bill's text.
+
+Sections of the two versions are aligned by section number, then the lines of each
+changed section are compared with Myers' linear-space diff. Sections are read one
+at a time from the memory-mapped texts of bill_text.BillTextStore and the diffs are
+yielded as they are computed, so memory stays bounded by the largest section.
+
+"""
+from collections import Counter
+
+DEFAULT_CONTEXT = 2
+
+
+def _middle_snake(a, b, a_lo, a_hi, b_lo, b_hi):
+    """Find the middle snake of the shortest edit script between a[a_lo:a_hi] and b[b_lo:b_hi].
+
+    Returns:
+        tuple: (x0, y0, x1, y1), the start and end of the snake relative to a_lo and b_lo.
+    """
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    delta = n - m
+    odd = delta % 2 != 0
+    limit = (n + m + 1) // 2
+    offset = limit + 1
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+
+    for d in range(limit + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            c = delta - k
+            if odd and -(d - 1) <= c <= d - 1 and x + backward[offset + c] >= n:
+                return x0, y0, x, y
+
+        for c in range(-d, d + 1, 2):
+            if c == -d or (c != d and backward[offset + c - 1] < backward[offset + c + 1]):
+                x = backward[offset + c + 1]
+            else:
+                x = backward[offset + c - 1] + 1
+            y = x - c
+            x0, y0 = x, y
+            while x < n and y < m and a[a_hi - 1 - x] == b[b_hi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + c] = x
+            k = delta - c
+            if not odd and -d <= k <= d and x + forward[offset + k] >= n:
+                return n - x, m - y, n - x0, m - y0
+    raise AssertionError("no middle snake found")
+
+
+def _emit(ops, tag, i1, i2, j1, j2):
+    if i1 == i2 and j1 == j2:
+        return
+    if ops and ops[-1][0] == tag and ops[-1][2] == i1 and ops[-1][4] == j1:
+        ops[-1] = (tag, ops[-1][1], i2, ops[-1][3], j2)
+    else:
+        ops.append((tag, i1, i2, j1, j2))
+
+
+def _diff(a, b, a_lo, a_hi, b_lo, b_hi, ops):
+    prefix = 0
+    while a_lo + prefix < a_hi and b_lo + prefix < b_hi and a[a_lo + prefix] == b[b_lo + prefix]:
+        prefix += 1
+    _emit(ops, "equal", a_lo, a_lo + prefix, b_lo, b_lo + prefix)
+    a_lo += prefix
+    b_lo += prefix
+
+    suffix = 0
+    while a_hi - suffix > a_lo and b_hi - suffix > b_lo and a[a_hi - 1 - suffix] == b[b_hi - 1 - suffix]:
+        suffix += 1
+    a_hi -= suffix
+    b_hi -= suffix
+
+    if a_lo == a_hi or b_lo == b_hi:
+        _emit(ops, "delete", a_lo, a_hi, b_lo, b_lo)
+        _emit(ops, "insert", a_hi, a_hi, b_lo, b_hi)
+    else:
+        # both sides are non-empty and differ at each end, so each half has fewer edits
+        x0, y0, x1, y1 = _middle_snake(a, b, a_lo, a_hi, b_lo, b_hi)
+        _diff(a, b, a_lo, a_lo + x0, b_lo, b_lo + y0, ops)
+        _emit(ops, "equal", a_lo + x0, a_lo + x1, b_lo + y0, b_lo + y1)
+        _diff(a, b, a_lo + x1, a_hi, b_lo + y1, b_hi, ops)
+    _emit(ops, "equal", a_hi, a_hi + suffix, b_hi, b_hi + suffix)
+
+
+def diff_opcodes(a, b):
+    """Return a minimal edit script between two sequences, in linear space.
+
+    Returns:
+        list: (tag, i1, i2, j1, j2) tuples as in difflib.SequenceMatcher.get_opcodes(),
+            with tag one of "equal", "delete" or "insert".
+    """
+    ops = []
+    _diff(a, b, 0, len(a), 0, len(b), ops)
+    return ops
+
+
+def hunks(a, b, context=DEFAULT_CONTEXT):
+    """Group the changed lines of two line lists into hunks with context lines."""
+    ops = diff_opcodes(a, b)
+    result = []
+    hunk = None
+    for index, (tag, i1, i2, j1, j2) in enumerate(ops):
+        if tag == "equal":
+            if hunk is None:
+                continue
+            if index == len(ops) - 1 or i2 - i1 > 2 * context:
+                hunk["lines"].extend(f" {line}" for line in a[i1:min(i2, i1 + context)])
+                result.append(hunk)
+                hunk = None
+            else:
+                hunk["lines"].extend(f" {line}" for line in a[i1:i2])
+            continue
+        if hunk is None:
+            lead = max(0, i1 - context)
+            hunk = {"oldStart": lead + 1, "newStart": j1 - (i1 - lead) + 1,
+                    "lines": [f" {line}" for line in a[lead:i1]]}
+        prefix = "-" if tag == "delete" else "+"
+        hunk["lines"].extend(f"{prefix}{line}" for line in (a[i1:i2] if tag == "delete" else b[j1:j2]))
+    if hunk is not None:
+        result.append(hunk)
+    return result
+
+
+def _keyed(sections):
+    """Key sections by (section number, occurrence), since omnibus divisions reuse numbers."""
+    seen = Counter()
+    keyed = {}
+    for section in sections:
+        number = section["enum"] or section["id"] or section["header"]
+        seen[number] += 1
+        keyed[(number, seen[number])] = section
+    return keyed
+
+
+def iter_section_diffs(old_text, new_text, context=DEFAULT_CONTEXT):
+    """Yield a diff for each section that was changed, added or removed between two versions.
+
+    Args:
+        old_text (BillText): The earlier version.
+        new_text (BillText): The later version.
+        context (int): The number of unchanged lines shown around each change.
+
+    Yields:
+        dict: The section number, header, path, status and hunks of changed lines.
+    """
+    old_sections = _keyed(old_text.sections)
+    new_sections = _keyed(new_text.sections)
+
+    def describe(section, status, changes):
+        return {"section": section["enum"], "header": section["header"], "path": section["path"],
+                "status": status, "hunks": changes}
+
+    for key, section in new_sections.items():
+        new_lines = new_text.section_text(section).splitlines()
+        old_section = old_sections.get(key)
+        if old_section is None:
+            yield describe(section, "added", hunks([], new_lines, context))
+            continue
+        old_lines = old_text.section_text(old_section).splitlines()
+        if old_lines != new_lines:
+            yield describe(section, "changed", hunks(old_lines, new_lines, context))
+    for key, section in old_sections.items():
+        if key not in new_sections:
+            yield describe(section, "removed", hunks(old_text.section_text(section).splitlines(), [], context))
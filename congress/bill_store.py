@@ -0,0 +1,238 @@
+"""
+Local SQLite store of bills, actions, cosponsors, committees and subjects.
+
+The store is filled offline by ingest_billstatus.py from GovInfo BILLSTATUS
+archives. The bill tools read from it before calling Congress.gov, and return the
+same shapes as the corresponding API endpoints. Bills of the congress in session
+keep changing after an archive is ingested, so the tools only use the store for
+earlier congresses, or when running offline.
+
+The database is in WAL mode, so tool reads never wait on an ingest writing.
+
+"""
+from contextlib import closing
+from datetime import date
+from pathlib import Path
+import os
+import sqlite3
+
+STORE_PATH = os.environ.get("CONGRESS_BILL_STORE", "cache/bills.sqlite")
+READ_TIMEOUT = 0.5  # seconds a read waits for a lock before the tool falls back to the API
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bills (
+    congress INTEGER, bill_type TEXT, number INTEGER,
+    title TEXT, introduced_date TEXT, origin_chamber TEXT, policy_area TEXT,
+    sponsor_bioguide_id TEXT, sponsor_name TEXT, sponsor_party TEXT, sponsor_state TEXT,
+    latest_action_date TEXT, latest_action_text TEXT, update_date TEXT,
+    PRIMARY KEY (congress, bill_type, number)
+);
+CREATE TABLE IF NOT EXISTS actions (
+    congress INTEGER, bill_type TEXT, number INTEGER,
+    action_date TEXT, action_time TEXT, action_code TEXT, type TEXT, text TEXT, source TEXT,
+    committee_code TEXT
+);
+CREATE TABLE IF NOT EXISTS cosponsors (
+    congress INTEGER, bill_type TEXT, number INTEGER,
+    bioguide_id TEXT, full_name TEXT, party TEXT, state TEXT,
+    sponsorship_date TEXT, is_original INTEGER, withdrawn_date TEXT
+);
+CREATE TABLE IF NOT EXISTS committees (
+    congress INTEGER, bill_type TEXT, number INTEGER,
+    system_code TEXT, name TEXT, chamber TEXT, activity TEXT, activity_date TEXT
+);
+CREATE TABLE IF NOT EXISTS subjects (
+    congress INTEGER, bill_type TEXT, number INTEGER, name TEXT
+);
+-- one row per bill write, so derived data can be updated incrementally
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, congress INTEGER, bill_type TEXT, number INTEGER
+);
+CREATE INDEX IF NOT EXISTS actions_bill ON actions (congress, bill_type, number);
+CREATE INDEX IF NOT EXISTS cosponsors_bill ON cosponsors (congress, bill_type, number);
+CREATE INDEX IF NOT EXISTS cosponsors_member ON cosponsors (bioguide_id);
+CREATE INDEX IF NOT EXISTS committees_bill ON committees (congress, bill_type, number);
+CREATE INDEX IF NOT EXISTS subjects_bill ON subjects (congress, bill_type, number);
+"""
+
+# column order of each table after the (congress, bill_type, number) key
+COLUMNS = {
+    "bills": ("title", "introduced_date", "origin_chamber", "policy_area", "sponsor_bioguide_id",
+              "sponsor_name", "sponsor_party", "sponsor_state", "latest_action_date",
+              "latest_action_text", "update_date"),
+    "actions": ("action_date", "action_time", "action_code", "type", "text", "source", "committee_code"),
+    "cosponsors": ("bioguide_id", "full_name", "party", "state", "sponsorship_date", "is_original",
+                   "withdrawn_date"),
+    "committees": ("system_code", "name", "chamber", "activity", "activity_date"),
+    "subjects": ("name",),
+}
+KEY = "congress = ? AND bill_type = ? AND number = ?"
+
+
+def current_congress(today=None):
+    """Return the number of the congress in session on a date, today by default."""
+    today = today or date.today()
+    # each congress begins on January 3 of an odd year, the 1st in 1789
+    year = today.year - (today.year % 2 == 1 and (today.month, today.day) < (1, 3))
+    return (year - 1789) // 2 + 1
+
+
+class BillStore:
+    """ Reads and bulk-writes the local bill store.
+
+    Usage example:
+    store = BillStore()
+    data = store.bill_details(118, "hr", 1)  # None if the bill was never ingested
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = Path(path)
+
+    def exists(self):
+        return self.path.exists()
+
+    def connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def write_bills(self, connection, records):
+        """Replace the rows of each bill record in one transaction.
+
+        Args:
+            connection (sqlite3.Connection): A connection from connect().
+            records (list): Records from ingest_billstatus.parse_billstatus(), each with a
+                "key" of (congress, bill_type, number), a "bill" row tuple and lists of
+                row tuples for the other tables.
+
+        Returns:
+            int: The number of rows written.
+        """
+        rows = 0
+        with connection:
+            keys = [record["key"] for record in records]
+            for table in COLUMNS:
+                connection.executemany(f"DELETE FROM {table} WHERE {KEY}", keys)
+            for table, columns in COLUMNS.items():
+                placeholders = ", ".join("?" * (len(columns) + 3))
+                values = [
+                    record["key"] + tuple(row)
+                    for record in records
+                    for row in ([record["bill"]] if table == "bills" else record[table])
+                ]
+                connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", values)
+                rows += len(values)
+            connection.executemany("INSERT INTO changes (congress, bill_type, number) VALUES (?, ?, ?)", keys)
+        return rows
+
+    def _query(self, sql, parameters):
+        if not self.exists():
+            return []
+        with closing(sqlite3.connect(self.path, timeout=READ_TIMEOUT)) as connection:
+            connection.row_factory = sqlite3.Row
+            try:
+                return connection.execute(sql, parameters).fetchall()
+            except sqlite3.OperationalError:
+                return []
+
+    def _bill_rows(self, table, congress, bill_type, number, order=""):
+        return self._query(f"SELECT * FROM {table} WHERE {KEY} {order}", (congress, bill_type.lower(), number))
+
+    def changes_since(self, seq):
+        """Return the sponsorships of bills written after change seq.
+
+        Returns:
+            tuple: The latest change seq, the changed bills as (congress, bill_type, number,
+                sponsor_bioguide_id, sponsor_party, sponsor_name) rows, and their current
+                cosponsors as (congress, bill_type, number, bioguide_id, party, full_name) rows.
+        """
+        latest = self._query("SELECT MAX(seq) FROM changes", ())
+        latest = latest[0][0] if latest and latest[0][0] is not None else seq
+        if latest <= seq:
+            return seq, [], []
+        changed = "SELECT DISTINCT congress, bill_type, number FROM changes WHERE seq > ?"
+        bills = self._query(
+            f"SELECT congress, bill_type, number, sponsor_bioguide_id, sponsor_party, sponsor_name "
+            f"FROM bills JOIN ({changed}) USING (congress, bill_type, number)", (seq,))
+        cosponsors = self._query(
+            f"SELECT congress, bill_type, number, bioguide_id, party, full_name "
+            f"FROM cosponsors JOIN ({changed}) USING (congress, bill_type, number) "
+            f"WHERE withdrawn_date IS NULL", (seq,))
+        return latest, bills, cosponsors
+
+    def has_bill(self, congress, bill_type, number):
+        return bool(self._bill_rows("bills", congress, bill_type, number))
+
+    def bill_details(self, congress, bill_type, number):
+        """Return the bill in the shape of the bill/{congress}/{type}/{number} endpoint, or None."""
+        rows = self._bill_rows("bills", congress, bill_type, number)
+        if not rows:
+            return None
+        row = rows[0]
+        return {"bill": {
+            "congress": row["congress"],
+            "type": row["bill_type"].upper(),
+            "number": str(row["number"]),
+            "title": row["title"],
+            "introducedDate": row["introduced_date"],
+            "originChamber": row["origin_chamber"],
+            "policyArea": {"name": row["policy_area"]},
+            "sponsors": [{"bioguideId": row["sponsor_bioguide_id"], "fullName": row["sponsor_name"],
+                          "party": row["sponsor_party"], "state": row["sponsor_state"]}],
+            "latestAction": {"actionDate": row["latest_action_date"], "text": row["latest_action_text"]},
+            "updateDate": row["update_date"],
+            "source": "local BILLSTATUS store",
+        }}
+
+    def bill_actions(self, congress, bill_type, number):
+        if not self.has_bill(congress, bill_type, number):
+            return None
+        rows = self._bill_rows("actions", congress, bill_type, number, "ORDER BY action_date DESC, action_time DESC")
+        return {"actions": [{
+            "actionDate": row["action_date"],
+            "actionTime": row["action_time"],
+            "actionCode": row["action_code"],
+            "type": row["type"],
+            "text": row["text"],
+            "sourceSystem": {"name": row["source"]},
+            "committees": [{"systemCode": row["committee_code"]}] if row["committee_code"] else [],
+        } for row in rows]}
+
+    def bill_cosponsors(self, congress, bill_type, number):
+        if not self.has_bill(congress, bill_type, number):
+            return None
+        rows = self._bill_rows("cosponsors", congress, bill_type, number, "ORDER BY sponsorship_date")
+        return {"cosponsors": [{
+            "bioguideId": row["bioguide_id"],
+            "fullName": row["full_name"],
+            "party": row["party"],
+            "state": row["state"],
+            "sponsorshipDate": row["sponsorship_date"],
+            "isOriginalCosponsor": bool(row["is_original"]),
+            "sponsorshipWithdrawnDate": row["withdrawn_date"],
+        } for row in rows]}
+
+    def bill_committees(self, congress, bill_type, number):
+        if not self.has_bill(congress, bill_type, number):
+            return None
+        committees = {}
+        for row in self._bill_rows("committees", congress, bill_type, number):
+            committee = committees.setdefault(row["system_code"], {
+                "systemCode": row["system_code"], "name": row["name"], "chamber": row["chamber"], "activities": [],
+            })
+            if row["activity"]:
+                committee["activities"].append({"name": row["activity"], "date": row["activity_date"]})
+        return {"committees": list(committees.values())}
+
+    def bill_subjects(self, congress, bill_type, number):
+        rows = self._bill_rows("bills", congress, bill_type, number)
+        if not rows:
+            return None
+        subjects = self._bill_rows("subjects", congress, bill_type, number, "ORDER BY name")
+        return {"subjects": {
+            "legislativeSubjects": [{"name": row["name"]} for row in subjects],
+            "policyArea": {"name": rows[0]["policy_area"]},
+        }}
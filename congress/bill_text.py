@@ -0,0 +1,306 @@
+"""
+Local storage for the full text of bills.
+
+The text-version URLs returned by the bill/{congress}/{type}/{number}/text endpoint
+point at XML documents that run to many megabytes for omnibus bills. A chosen
+version is downloaded once, streamed to disk, parsed incrementally, and stored
+under cache/bill_text/ as:
+
+    <document>.txt         plain text of every section, one after another
+    <document>.index.json  byte offsets of each section in the .txt file
+
+Reads memory-map the .txt file, so a single section of a very large bill can be
+returned without loading the whole document.
+
+"""
+from pathlib import Path
+import json
+import logging
+import mmap
+import os
+import re
+import xml.etree.ElementTree as ET
+
+import requests
+
+TEXT_DIR = os.environ.get("CONGRESS_BILL_TEXT_DIR", "cache/bill_text")
+CHUNK_SIZE = 64 * 1024
+DIVISION_TAGS = ("division", "title", "subtitle", "part", "subpart", "chapter", "subchapter")
+BODY_TAGS = ("legis-body", "resolution-body", "engrossed-amendment-body")
+BLOCK_TAGS = {
+    "subsection", "paragraph", "subparagraph", "clause", "subclause", "item", "subitem",
+    "quoted-block", "continuation-text", "toc-entry", "after-quoted-block",
+}
+VERSION_PATTERN = re.compile(r"BILLS-\d+[a-z]+\d+([a-z]+)\.xml", re.IGNORECASE)
+
+logger = logging.getLogger(__name__)
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _clean(text):
+    return " ".join(text.split())
+
+
+def render_text(element):
+    """Render an element as plain text, starting a new line at each block-level element."""
+    lines = []
+    current = []
+
+    def flush():
+        line = _clean("".join(current))
+        if line:
+            lines.append(line)
+        current.clear()
+
+    def walk(node):
+        is_block = _local_name(node.tag) in BLOCK_TAGS
+        if is_block:
+            flush()
+        current.append(node.text or "")
+        for child in node:
+            walk(child)
+            if _local_name(child.tag) in ("enum", "header"):
+                current.append(" ")
+            current.append(child.tail or "")
+        if is_block:
+            flush()
+
+    walk(element)
+    flush()
+    return "\n".join(lines)
+
+
+def version_code(url):
+    """Return the text version code, such as "ih" or "enr", of a bill XML URL."""
+    match = VERSION_PATTERN.search(url or "")
+    return match.group(1).lower() if match else None
+
+
+def bill_id(congress, bill_type, bill_number):
+    return f"{congress}-{bill_type.lower()}{bill_number}"
+
+
+def document_id(congress, bill_type, bill_number, version):
+    return f"{bill_id(congress, bill_type, bill_number)}-{version.lower()}"
+
+
+class _SectionWriter:
+    """Receives parser events and writes each top-level section to the text file as it completes."""
+
+    def __init__(self, out):
+        self.out = out
+        self.offset = 0
+        self.tags = []
+        self.divisions = []
+        self.sections = []
+        self.title = None
+
+    def _write(self, element, section_id, enum, header):
+        text = render_text(element)
+        data = (text + "\n\n").encode("utf-8")
+        self.out.write(data)
+        self.sections.append({
+            "id": section_id,
+            "enum": enum,
+            "header": header,
+            "path": " > ".join(
+                " ".join(filter(None, (division["enum"], division["header"])))
+                for division in self.divisions
+            ),
+            "start": self.offset,
+            "end": self.offset + len(data) - 2,
+        })
+        self.offset += len(data)
+
+    def start(self, element):
+        tag = _local_name(element.tag)
+        if tag in DIVISION_TAGS and "section" not in self.tags:
+            self.divisions.append({"level": tag, "enum": None, "header": None})
+        self.tags.append(tag)
+
+    def end(self, element):
+        tag = self.tags.pop()
+        parent = self.tags[-1] if self.tags else None
+        nested = "section" in self.tags
+
+        if tag in ("enum", "header") and parent in DIVISION_TAGS and not nested and self.divisions:
+            self.divisions[-1][tag] = _clean("".join(element.itertext()))
+        elif tag == "official-title" and self.title is None:
+            self.title = _clean("".join(element.itertext()))
+        elif tag in DIVISION_TAGS and not nested:
+            self.divisions.pop()
+            element.clear()
+        elif tag == "section" and not nested:
+            enum = element.find("./enum")
+            header = element.find("./header")
+            self._write(
+                element,
+                element.get("id"),
+                _clean("".join(enum.itertext())).rstrip(".") if enum is not None else None,
+                _clean("".join(header.itertext())) if header is not None else None,
+            )
+            # sections are the unit of storage, so drop each one once it is written
+            element.clear()
+        elif tag in BODY_TAGS and not self.sections:
+            self._write(element, tag, None, None)
+
+
+def parse_stream(chunks, text_path):
+    """Incrementally parse bill XML from an iterable of byte chunks into a text file.
+
+    Args:
+        chunks (iterable): Byte chunks of the XML document.
+        text_path (Path): Where the plain text of the sections is written.
+
+    Returns:
+        dict: The section index, with byte offsets into text_path.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    with open(text_path, "wb") as out:
+        writer = _SectionWriter(out)
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                getattr(writer, event)(element)
+        parser.close()
+        for event, element in parser.read_events():
+            getattr(writer, event)(element)
+    return {"title": writer.title, "size": writer.offset, "sections": writer.sections}
+
+
+class BillText:
+    """ A stored bill text, memory-mapped for reading. """
+
+    def __init__(self, text_path, index):
+        self.index = index
+        self.size = index["size"]
+        self._file = open(text_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    @property
+    def sections(self):
+        return self.index["sections"]
+
+    def read_bytes(self, start=0, end=None):
+        """Return the UTF-8 bytes between two byte offsets."""
+        end = self.size if end is None else end
+        start = max(0, min(start, self.size))
+        end = max(start, min(end, self.size))
+        return self._map[start:end]
+
+    def read(self, start, end):
+        """Return the text between two byte offsets."""
+        return self.read_bytes(start, end).decode("utf-8", errors="ignore")
+
+    def find_sections(self, keys):
+        """Return the index entries matching section numbers (e.g. "10102") or XML ids."""
+        wanted = {str(key).lower().removeprefix("sec.").strip().rstrip(".") for key in keys}
+        return [
+            section for section in self.sections
+            if (section["enum"] or "").lower() in wanted or (section["id"] or "").lower() in wanted
+        ]
+
+    def section_text(self, section):
+        return self.read(section["start"], section["end"])
+
+    def close(self):
+        if self.size:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BillTextStore:
+    """ Downloads, indexes and opens bill texts under TEXT_DIR.
+
+    Usage example:
+    store = BillTextStore()
+    doc = store.ensure(url, document_id(118, "hr", 4366, "enr"))
+    with store.open(doc) as text:
+        for section in text.find_sections(["10102"]):
+            print(text.section_text(section))
+    """
+
+    def __init__(self, directory=TEXT_DIR):
+        self.directory = Path(directory)
+
+    def _paths(self, doc_id):
+        return self.directory / f"{doc_id}.txt", self.directory / f"{doc_id}.index.json"
+
+    def has(self, doc_id):
+        # the index is written last, so its presence marks a complete document
+        return self._paths(doc_id)[1].exists()
+
+    def documents(self):
+        """Return the ids of every stored document."""
+        return sorted(path.name.removesuffix(".index.json") for path in self.directory.glob("*.index.json"))
+
+    def download(self, url, doc_id):
+        """Stream the XML at url to a temporary file and return its path."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        xml_path = self.directory / f"{doc_id}.xml.part"
+        logger.info("downloading %s", url)
+        with requests.get(url, stream=True, timeout=60) as response, open(xml_path, "wb") as out:
+            response.raise_for_status()
+            for chunk in response.iter_content(CHUNK_SIZE):
+                out.write(chunk)
+        return xml_path
+
+    def build(self, xml_path, doc_id, url=None):
+        """Parse a downloaded XML file into the text and index of doc_id, then remove it."""
+        text_path, index_path = self._paths(doc_id)
+        tmp_path = text_path.with_suffix(".txt.part")
+        with open(xml_path, "rb") as file:
+            index = parse_stream(iter(lambda: file.read(CHUNK_SIZE), b""), tmp_path)
+        index.update({"document": doc_id, "url": url})
+
+        os.replace(tmp_path, text_path)
+        with open(index_path.with_suffix(".part"), "w", encoding="utf-8") as file:
+            json.dump(index, file)
+        os.replace(index_path.with_suffix(".part"), index_path)
+        os.remove(xml_path)
+        return doc_id
+
+    def ensure(self, url, doc_id):
+        """Download and index the XML at url unless doc_id is already stored."""
+        if self.has(doc_id):
+            return doc_id
+        return self.build(self.download(url, doc_id), doc_id, url)
+
+    def open(self, doc_id):
+        text_path, index_path = self._paths(doc_id)
+        with open(index_path, encoding="utf-8") as file:
+            index = json.load(file)
+        return BillText(text_path, index)
+
+
+def xml_text_versions(text_data):
+    """Return (code, type, date, url) for each text version of a bill that has an XML format."""
+    versions = []
+    for text_version in text_data.get("textVersions", []):
+        for text_format in text_version.get("formats", []):
+            if "XML" in (text_format.get("type") or ""):
+                url = text_format["url"]
+                versions.append((version_code(url), text_version.get("type"), text_version.get("date"), url))
+    return versions
+
+
+def choose_version(versions, version=None):
+    """Pick a text version by code ("enr") or type ("Enrolled Bill"); the first listed if none is given."""
+    if not versions:
+        return None
+    if version is None:
+        return versions[0]
+    wanted = version.lower()
+    for candidate in versions:
+        if wanted in ((candidate[0] or "").lower(), (candidate[1] or "").lower()):
+            return candidate
+    return None
@@ -0,0 +1,232 @@
+"""
+Content-addressed, dictionary-compressed storage for cached response bodies.
+
+Congress.gov payloads repeat the same member, committee and URL fragments across
+thousands of responses, which generic compression of each small body cannot
+exploit. Bodies are compressed against a dictionary trained on the cache itself:
+zstd when the optional zstandard package is installed, otherwise zlib with a
+preset dictionary. Each body is stored once under the SHA-256 of its bytes, so
+identical bodies shared by several cache keys take the space of one.
+
+Each blob starts with a codec byte and the id of the dictionary it was compressed
+with, so blobs written before a new dictionary was trained stay readable.
+
+The saving is in disk space, not read time: a cold read opens the entry and the
+blob and decompresses it, about 0.5 ms per bill list body against 0.3 ms for
+the older inline entries, with the page cache dropped.
+
+Usage:
+    python congress/blob_store.py train     # train a dictionary on cached bodies
+    python congress/blob_store.py compact   # recompress the cache with it
+    python congress/blob_store.py stats
+
+"""
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DICT_SIZE = 112 * 1024
+ZLIB_DICT_SIZE = 32 * 1024  # the largest preset dictionary zlib uses
+TRAINING_SAMPLES = 2000
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+HEADER = struct.Struct(">cI")  # codec, dictionary id (0 for none)
+CODEC_ZSTD = b"s"
+CODEC_ZLIB = b"z"
+FRAGMENT_SEPARATORS = re.compile(rb"[{},\[\]]")
+
+
+class BlobStore:
+    """ Stores byte strings under their SHA-256 digest, compressed with the current dictionary.
+
+    Usage example:
+    blobs = BlobStore("cache/http/blobs")
+    digest = blobs.put(b'{"bill": ...}')
+    data = blobs.get(digest)
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.dict_directory = self.directory.parent / "dicts"
+        self.codec = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+        self._dicts = {}
+        self._lock = threading.Lock()
+        self.dict_id = self._latest_dict_id()
+
+    def _latest_dict_id(self):
+        suffix = ".zstdict" if self.codec == CODEC_ZSTD else ".zdict"
+        ids = [int(path.stem) for path in self.dict_directory.glob(f"*{suffix}") if path.stem.isdigit()]
+        return max(ids, default=0)
+
+    def _dict(self, codec, dict_id):
+        if not dict_id:
+            return None
+        with self._lock:
+            if (codec, dict_id) not in self._dicts:
+                suffix = ".zstdict" if codec == CODEC_ZSTD else ".zdict"
+                data = (self.dict_directory / f"{dict_id}{suffix}").read_bytes()
+                self._dicts[(codec, dict_id)] = zstandard.ZstdCompressionDict(data) if codec == CODEC_ZSTD else data
+            return self._dicts[(codec, dict_id)]
+
+    def _path(self, digest):
+        return self.directory / digest[:2] / digest
+
+    def compress(self, data):
+        dictionary = self._dict(self.codec, self.dict_id)
+        if self.codec == CODEC_ZSTD:
+            compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary).compress(data)
+        else:
+            compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary) if dictionary else zlib.compressobj(ZLIB_LEVEL)
+            compressed = compressor.compress(data) + compressor.flush()
+        return HEADER.pack(self.codec, self.dict_id) + compressed
+
+    def decompress(self, blob):
+        codec, dict_id = HEADER.unpack_from(blob)
+        if codec == CODEC_ZSTD and zstandard is None:
+            raise ValueError("blob is zstd-compressed but zstandard is not installed")
+        dictionary = self._dict(codec, dict_id)
+        payload = blob[HEADER.size:]
+        if codec == CODEC_ZSTD:
+            return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(payload)
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(payload) + decompressor.flush()
+
+    def put(self, data):
+        """Store data unless an identical blob exists, and return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        try:
+            # a reused blob counts as new, so compact keeps it until the entry referring to it is written
+            os.utime(path)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(self.compress(data))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest):
+        """Return the bytes stored under digest, or None if the blob is missing or unreadable."""
+        try:
+            return self.decompress(self._path(digest).read_bytes())
+        except (FileNotFoundError, ValueError, zlib.error):
+            return None
+
+    def digests(self):
+        for path in self.directory.glob("*/*"):
+            if len(path.name) == 64:
+                yield path.name
+
+    def is_current(self, digest):
+        """Whether the blob is compressed with the current codec and dictionary."""
+        with open(self._path(digest), "rb") as file:
+            return HEADER.unpack(file.read(HEADER.size)) == (self.codec, self.dict_id)
+
+    def rewrite(self, digest):
+        """Recompress a blob with the current codec and dictionary."""
+        data = self.get(digest)
+        if data is not None:
+            path = self._path(digest)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(self.compress(data))
+            os.replace(tmp_path, path)
+
+    def age(self, digest):
+        """Seconds since the blob was last stored."""
+        try:
+            return time.time() - self._path(digest).stat().st_mtime
+        except FileNotFoundError:
+            return 0
+
+    def remove(self, digest):
+        self._path(digest).unlink(missing_ok=True)
+
+    def train(self, samples):
+        """Train a dictionary on sample bodies and make it current for new blobs.
+
+        Returns:
+            int: The id of the new dictionary.
+        """
+        if self.codec == CODEC_ZSTD:
+            data = zstandard.train_dictionary(DICT_SIZE, samples).as_bytes()
+            suffix = ".zstdict"
+        else:
+            data = zlib_dictionary(samples)
+            suffix = ".zdict"
+        self.dict_directory.mkdir(parents=True, exist_ok=True)
+        dict_id = max(self._latest_dict_id(), self.dict_id) + 1
+        (self.dict_directory / f"{dict_id}{suffix}").write_bytes(data)
+        self.dict_id = dict_id
+        return dict_id
+
+    def stats(self):
+        blobs = stored = 0
+        for path in self.directory.glob("*/*"):
+            if len(path.name) == 64:
+                blobs += 1
+                stored += path.stat().st_size
+        return {"codec": "zstd" if self.codec == CODEC_ZSTD else "zlib", "dictionary": self.dict_id,
+                "blobs": blobs, "bytes": stored}
+
+
+def zlib_dictionary(samples):
+    """Build a zlib preset dictionary from the JSON fragments most common across samples.
+
+    zlib finds matches up to 32 KiB back and prefers recent ones, so the most
+    frequent fragments go at the end.
+    """
+    counts = {}
+    for sample in samples:
+        for fragment in set(FRAGMENT_SEPARATORS.split(sample)):
+            if 8 <= len(fragment) <= 512:
+                counts[fragment] = counts.get(fragment, 0) + 1
+    ranked = sorted((fragment for fragment, count in counts.items() if count > 1),
+                    key=lambda fragment: counts[fragment] * len(fragment), reverse=True)
+    selected, size = [], 0
+    for fragment in ranked:
+        if size + len(fragment) > ZLIB_DICT_SIZE:
+            break
+        selected.append(fragment)
+        size += len(fragment)
+    return b"".join(reversed(selected))
+
+
+def main():
+    from cache import ResponseCache
+
+    parser = argparse.ArgumentParser(description="Train a compression dictionary and compact the response cache.")
+    parser.add_argument("command", choices=["train", "compact", "stats"])
+    parser.add_argument("--samples", type=int, default=TRAINING_SAMPLES)
+    args = parser.parse_args()
+
+    cache = ResponseCache()
+    if args.command == "train":
+        samples = []
+        # reservoir sample, so the cache is read only once
+        for seen, (_, _, body) in enumerate(cache.entries()):
+            if len(samples) < args.samples:
+                samples.append(json.dumps(body).encode("utf-8"))
+            elif (index := random.randrange(seen + 1)) < args.samples:
+                samples[index] = json.dumps(body).encode("utf-8")
+        dict_id = cache.blobs.train(samples)
+        print(f"Trained dictionary {dict_id} on {len(samples)} bodies; run compact to apply it")
+    elif args.command == "compact":
+        print(cache.compact())
+    print(cache.blobs.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""
+On-disk cache for upstream API responses.
+
+Entries are keyed by request URL and query parameters and stored as small JSON
+files under cache/http/ that point to the response body in a content-addressed,
+dictionary-compressed BlobStore (cache/http/blobs/). Only successful (200) JSON
+responses are cached.
+
+A cache created with max_stale enables stale-while-revalidate: an expired entry
+younger than max_stale is returned immediately while a single background thread
+fetches a fresh copy. HotSetRefresher keeps a fixed set of endpoints fresh on a
+schedule, so requests for them never wait on the network.
+
+A MemoryTier in front of the files keeps recently used entries in process memory.
+It is bounded by total bytes rather than entry count, since responses range from
+a few hundred bytes to several megabytes, and can cap each endpoint family (see
+family()) so that large bill lists cannot push out everything else.
+
+"""
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlencode, urlparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+
+from blob_store import BlobStore
+from offload import worker_pool
+
+CACHE_DIR = os.environ.get("CONGRESS_CACHE_DIR", "cache/http")
+DEFAULT_TTL = int(os.environ.get("CONGRESS_CACHE_TTL", 60 * 60))  # seconds
+ORPHAN_GRACE = 60 * 60  # seconds an unreferenced blob is kept by compact()
+MEMORY_BYTES = int(os.environ.get("CONGRESS_MEMORY_CACHE_BYTES", 64 * 1024 * 1024))
+MEMORY_COMPRESS = os.environ.get("CONGRESS_MEMORY_CACHE_COMPRESS", "0") == "1"
+# e.g. "bill=32000000,fred=8000000"
+MEMORY_QUOTAS = os.environ.get("CONGRESS_MEMORY_CACHE_QUOTAS", "")
+
+logger = logging.getLogger(__name__)
+
+
+def family(key):
+    """Classify a cache key as "fred", "treasury" or the Congress.gov collection (e.g. "bill")."""
+    url = urlparse(key)
+    if "stlouisfed" in url.netloc:
+        return "fred"
+    if "fiscaldata" in url.netloc:
+        return "treasury"
+    parts = url.path.strip("/").split("/")
+    return parts[1] if len(parts) > 1 else "other"
+
+
+def parse_quotas(spec):
+    """Parse "family=bytes,..." into a dict."""
+    quotas = {}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, size = part.partition("=")
+        quotas[name.strip()] = int(size)
+    return quotas
+
+
+class MemoryTier:
+    """ Process-local LRU of encoded cache entries, bounded by total bytes and per family.
+
+    Usage example:
+    memory = MemoryTier(max_bytes=64 * 1024 * 1024, quotas={"bill": 32 * 1024 * 1024})
+    cache = ResponseCache(memory=memory)
+    """
+
+    def __init__(self, max_bytes=MEMORY_BYTES, quotas=None, compress=MEMORY_COMPRESS):
+        self.max_bytes = max_bytes
+        self.quotas = parse_quotas(MEMORY_QUOTAS) if quotas is None else quotas
+        self.compress = compress
+        self._entries = OrderedDict()  # key -> (data, stored_at, family), least recently used first
+        self._families = {}  # family -> OrderedDict of its keys, least recently used first
+        self._bytes = 0
+        self._family_bytes = Counter()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def get(self, key):
+        """Return (entry bytes, stored_at) for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._families[entry[2]].move_to_end(key)
+            self.stats["hits"] += 1
+        data, stored_at, _ = entry
+        return (zlib.decompress(data) if self.compress else data), stored_at
+
+    def _remove(self, key):
+        data, _, name = self._entries.pop(key)
+        del self._families[name][key]
+        self._bytes -= len(data)
+        self._family_bytes[name] -= len(data)
+
+    def put(self, key, data, stored_at):
+        """Store the encoded entry for key, evicting least recently used entries as needed."""
+        if self.compress:
+            data = zlib.compress(data, 1)
+        name = family(key)
+        limit = min(self.max_bytes, self.quotas.get(name, self.max_bytes))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if len(data) > limit:
+                self.stats["rejected"] += 1
+                return
+            family_keys = self._families.setdefault(name, OrderedDict())
+            while self._family_bytes[name] + len(data) > limit:
+                self._remove(next(iter(family_keys)))
+                self.stats["evictions"] += 1
+            while self._bytes + len(data) > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+            self._entries[key] = (data, stored_at, name)
+            family_keys[key] = None
+            self._bytes += len(data)
+            self._family_bytes[name] += len(data)
+
+    def summary(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "compressed": self.compress,
+                "hits": self.stats["hits"],
+                "misses": self.stats["misses"],
+                "hitRate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+                "evictions": self.stats["evictions"],
+                "rejected": self.stats["rejected"],
+                "families": {name: {"bytes": size, "quota": self.quotas.get(name)}
+                             for name, size in self._family_bytes.items() if size},
+            }
+
+
+class ResponseCache:
+    """ Cache of decoded JSON responses, shared by every client that is given it.
+
+    Usage example:
+    cache = ResponseCache()
+    client = CDGClient(cache=cache)
+    data, status = client.get("bill/118")  # fetched from Congress.gov
+    data, status = client.get("bill/118")  # served from cache/http/
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=DEFAULT_TTL, max_stale=0, memory=None):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.memory = memory
+        self.blobs = BlobStore(self.directory / "blobs")
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def make_key(url, params=None):
+        """Build a cache key from a URL and its query parameters."""
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return url
+
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def _read(self, path):
+        """Return (key, stored_at, body bytes or None, body) for an entry file."""
+        with open(path, "rb") as file:
+            entry = worker_pool.loads(file.read())
+        if "blob" in entry:
+            return entry["key"], entry["stored_at"], self.blobs.get(entry["blob"]), None
+        # written before bodies moved to the blob store
+        return entry["key"], entry["stored_at"], None, entry["body"]
+
+    def get_entry(self, key):
+        """Return (body, age in seconds) for key, or None if it was never cached."""
+        cached = self.memory.get(key) if self.memory is not None else None
+        try:
+            if cached is not None:
+                data, stored_at = cached
+                body = None
+            else:
+                _, stored_at, data, body = self._read(self._path(key))
+                if data is None and body is None:
+                    return None
+            if body is None:
+                body = worker_pool.loads(data)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if cached is None and self.memory is not None:
+            self.memory.put(key, data or json.dumps(body).encode("utf-8"), stored_at)
+        return body, time.time() - stored_at
+
+    def get(self, key, ttl=None):
+        """Return the cached body for key, or None if it is missing or expired."""
+        entry = self.get_entry(key)
+        ttl = self.ttl if ttl is None else ttl
+        if entry is None or entry[1] > ttl:
+            return None
+        return entry[0]
+
+    def set(self, key, body, stored_at=None):
+        """Store a decoded JSON body under key."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        stored_at = time.time() if stored_at is None else stored_at
+        data = json.dumps(body).encode("utf-8")
+        digest = self.blobs.put(data)
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"key": key, "stored_at": stored_at, "blob": digest}, file)
+        # atomic so concurrent readers never see a partial entry
+        os.replace(tmp_path, path)
+        if self.memory is not None:
+            self.memory.put(key, data, stored_at)
+
+    def entries(self):
+        """Yield (key, stored_at, body) for every cached entry."""
+        for path in sorted(self.directory.glob("*/*.json")):
+            try:
+                key, stored_at, data, body = self._read(path)
+                if data is not None:
+                    body = json.loads(data)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            if body is not None:
+                yield key, stored_at, body
+
+    def compact(self):
+        """Move old entries into the blob store, recompress blobs with the current
+        dictionary and delete blobs no entry refers to.
+
+        Unreferenced blobs stored within ORPHAN_GRACE seconds are kept: a running
+        server writes the blob before the entry that refers to it.
+
+        Returns:
+            dict: Counts of entries converted, blobs recompressed, blobs removed and
+                unreferenced blobs kept as recent.
+        """
+        counts = {"entries": 0, "converted": 0, "recompressed": 0, "removed": 0, "recent": 0}
+        referenced = set()
+        for path in self.directory.glob("*/*.json"):
+            try:
+                with open(path, "rb") as file:
+                    entry = json.load(file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            counts["entries"] += 1
+            if "body" in entry:
+                self.set(entry["key"], entry["body"], entry["stored_at"])
+                counts["converted"] += 1
+                with open(path, "rb") as file:
+                    entry = json.load(file)
+            referenced.add(entry["blob"])
+        for digest in list(self.blobs.digests()):
+            if digest not in referenced:
+                if self.blobs.age(digest) < ORPHAN_GRACE:
+                    counts["recent"] += 1
+                    continue
+                self.blobs.remove(digest)
+                counts["removed"] += 1
+            elif not self.blobs.is_current(digest):
+                self.blobs.rewrite(digest)
+                counts["recompressed"] += 1
+        return counts
+
+    @contextmanager
+    def revalidating(self):
+        """Within this block, requests made by the current thread bypass cached entries and refresh them."""
+        self._local.revalidating = True
+        try:
+            yield
+        finally:
+            self._local.revalidating = False
+
+    def _fetch_and_store(self, key, fetch):
+        body, status = fetch()
+        if status == 200 and isinstance(body, (dict, list)):
+            self.set(key, body)
+        return body, status
+
+    def _revalidate_in_background(self, key, fetch):
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch_and_store(key, fetch)
+            except Exception as e:
+                logger.warning("background refresh of %s failed: %s", key, e)
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"revalidate {key}", daemon=True).start()
+
+    def get_or_fetch(self, key, fetch, ttl=None):
+        """Return the cached body for key, calling fetch() on a miss.
+
+        With max_stale set, an expired entry younger than ttl + max_stale is returned as
+        is and fetch() runs in a background thread to refresh it.
+
+        Args:
+            key (str): The cache key, see make_key().
+            fetch (callable): Performs the request and returns (body, status_code).
+            ttl (int, optional): Maximum age in seconds, defaults to the cache TTL.
+
+        Returns:
+            tuple: The body and status code.
+        """
+        if getattr(self._local, "revalidating", False):
+            return self._fetch_and_store(key, fetch)
+
+        ttl = self.ttl if ttl is None else ttl
+        entry = self.get_entry(key)
+        if entry is not None:
+            body, age = entry
+            if age <= ttl:
+                logger.debug("cache hit %s", key)
+                return body, 200
+            if age <= ttl + self.max_stale:
+                logger.debug("serving stale %s", key)
+                self._revalidate_in_background(key, fetch)
+                return body, 200
+        return self._fetch_and_store(key, fetch)
+
+
+class HotSetRefresher(threading.Thread):
+    """ Refreshes a fixed set of endpoints in the background on a schedule.
+
+    Usage example:
+    refresher = HotSetRefresher(cache, [(CDGClient, "congress/current")], interval=240)
+    refresher.start()
+    """
+
+    def __init__(self, cache, endpoints, interval):
+        super().__init__(name="hot set refresher", daemon=True)
+        self.cache = cache
+        self.endpoints = endpoints
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def refresh_all(self):
+        with self.cache.revalidating():
+            for client_class, endpoint in self.endpoints:
+                try:
+                    _, status = client_class(cache=self.cache).get(endpoint)
+                    if status != 200:
+                        logger.warning("refresh of %s returned %d", endpoint, status)
+                except Exception as e:
+                    logger.warning("refresh of %s failed: %s", endpoint, e)
+
+    def run(self):
+        self.refresh_all()
+        while not self._stop_event.wait(self.interval):
+            self.refresh_all()
+
+    def stop(self):
+        self._stop_event.set()
@@ -5,14 +5,17 @@
     @license: CC0 1.0
 
 """
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 from dotenv import load_dotenv
 import os
 import requests
 import logging
 
+from offload import worker_pool
+from tracing import CLIENT, tracer
+
 API_VERSION = "v3"
-ROOT_URL = "https://api.congress.gov/"
+ROOT_URL = os.environ.get("CONGRESS_API_ROOT", "https://api.congress.gov/")
 RESPONSE_FORMAT = "json"
 load_dotenv(".env")
 
@@ -22,17 +25,28 @@ class _MethodWrapper:
 
     def __init__(self, parent, http_method):
         self._parent = parent
+        self._http_method = http_method
         self._method = getattr(parent._session, http_method)
 
     def __call__(self, endpoint, *args, **kwargs):  # full signature passed here
+        url = urljoin(self._parent.base_url, endpoint)
+        cache = self._parent.cache
+        if cache is None or self._http_method != "get":
+            return self._request(url, *args, **kwargs)
+        key = cache.make_key(url, kwargs.get("params"))
+        return cache.get_or_fetch(key, lambda: self._request(url, *args, **kwargs))
+
+    def _request(self, url, *args, **kwargs):
         logger = logging.getLogger(__name__)
-        response = self._method(
-            urljoin(self._parent.base_url, endpoint), *args, **kwargs
-        )
+        with tracer.span(f"{self._http_method.upper()} {urlparse(url).path}", kind=CLIENT, category="upstream",
+                         **{"http.url": url}) as span:
+            response = self._method(url, *args, **kwargs)
+            span.set("http.status_code", response.status_code)
         logger.debug("%s %d",response.url, response.status_code)
         # unpack
         if response.headers.get("content-type", "").startswith("application/json"):
-            return response.json(), response.status_code
+            # decoded in a worker process when large and called off the event loop
+            return worker_pool.loads(response.content), response.status_code
         else:
             return response.content, response.status_code
 
@@ -53,6 +67,8 @@ class CDGClient:
             print(f"Title: {first_bill.get('title')}")
             print(f"Type: {first_bill.get('type')}")
             print(f"Congress: {first_bill.get('congress')}")
+
+    Pass a ResponseCache as cache to serve repeated GET requests from disk.
     """
 
     def __init__(
@@ -60,9 +76,11 @@ class CDGClient:
             api_version=API_VERSION,
             response_format=RESPONSE_FORMAT,
             raise_on_error=False,
+            cache=None,
     ):
         self.base_url = urljoin(ROOT_URL, api_version) + "/"
         self._session = requests.Session()
+        self.cache = cache
 
         api_key=os.environ["CONGRESS_API_KEY"]
         
@@ -5,14 +5,34 @@ Requires an API key: https://api.congress.gov/sign-up/
 
 """
 from typing import Any
+import asyncio
+import itertools
 
 from mcp.server import FastMCP
+from mcp.server.fastmcp import Context
+from aggregates import committee_snapshot, delegation_activity
+from bill_diff import iter_section_diffs
+from bill_store import BillStore, current_congress
+from bill_text import BillTextStore, bill_id, choose_version, document_id, xml_text_versions
+from cache import MEMORY_BYTES, HotSetRefresher, MemoryTier, ResponseCache
 from cdg_client import CDGClient
+from cosponsor_graph import CosponsorGraph
+from cursors import CursorStore
+from dts_store import DTS_TABLES, DTSTable
 from fdtreasury_client import FDTreasuryClient
 from fred import FREDClient
+from fred_matrix import AGGREGATIONS, FILLS, FREQUENCIES, TRANSFORMS, compare_series
+from offload import LoopLagMonitor, memory_usage, worker_pool
+from page_diff import PageArchive
+from paging import PARTIAL, fetch, list_items
+from prefetch import Prefetcher, bill_endpoints
 from pathlib import Path
 import logging
-from removed_env_data_client import RemovedEnvDataClient
+from removed_env_data_client import CSV_FILE_PATH, RemovedEnvDataClient
+from snapshot import OfflineBundle
+from text_index import TextIndex, summary_text
+from tracing import SERVER, tracer
+from watchlist import POLL_INTERVAL as WATCH_POLL_INTERVAL, BillWatcher, WatchList
 import os
 import json
 
@@ -23,7 +43,146 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-mcp = FastMCP("congress")
+# endpoints hit on almost every conversation; served stale and refreshed in the background
+HOT_ENDPOINTS = [
+    (CDGClient, "congress/current"),
+    (CDGClient, "bill?limit=100"),
+    (CDGClient, "congress"),
+    (FDTreasuryClient, "accounting/dts/operating_cash_balance"),
+]
+HOT_TTL = int(os.environ.get("CONGRESS_HOT_TTL", 5 * 60))
+HOT_MAX_STALE = int(os.environ.get("CONGRESS_HOT_MAX_STALE", 24 * 60 * 60))
+HOT_REFRESH_INTERVAL = int(os.environ.get("CONGRESS_HOT_REFRESH_SECONDS", 4 * 60))
+PREFETCH_TOP_N = int(os.environ.get("CONGRESS_PREFETCH_TOP_N", 0))
+PREFETCH_BUDGET = int(os.environ.get("CONGRESS_PREFETCH_BUDGET", 30))
+
+OFFLINE_BUNDLE = os.environ.get("CONGRESS_OFFLINE_BUNDLE")
+# stdio for a single client; sse serves many sessions on FASTMCP_HOST:FASTMCP_PORT, e.g. for load tests
+TRANSPORT = os.environ.get("CONGRESS_MCP_TRANSPORT", "stdio")
+
+
+class TracedFastMCP(FastMCP):
+    """ FastMCP that records a span for every tool call, continuing the trace in the request _meta. """
+
+    async def call_tool(self, name, arguments):
+        try:
+            meta = self.get_context().request_context.meta
+        except ValueError:
+            meta = None
+        with tracer.span(f"tool {name}", kind=SERVER, traceparent=getattr(meta, "traceparent", None),
+                         category="tool", **{"mcp.tool": name}):
+            return await super().call_tool(name, arguments)
+
+
+mcp = TracedFastMCP("congress")
+if OFFLINE_BUNDLE:
+    # answer every tool from a snapshot bundle, with no network calls
+    response_cache = hot_cache = OfflineBundle(OFFLINE_BUNDLE)
+    memory_tier = None
+    # the bill store, indexes and tables the tools read besides the responses
+    response_cache.extract_files(overwrite=False)
+    HOT_REFRESH_INTERVAL = PREFETCH_TOP_N = 0
+else:
+    # one memory tier in front of both views of cache/http/
+    memory_tier = MemoryTier() if MEMORY_BYTES > 0 else None
+    response_cache = ResponseCache(memory=memory_tier)
+    hot_cache = ResponseCache(ttl=HOT_TTL, max_stale=HOT_MAX_STALE, memory=memory_tier)
+prefetcher = Prefetcher(lambda: CDGClient(cache=response_cache), response_cache, PREFETCH_TOP_N, PREFETCH_BUDGET)
+# bill details and actions change with each new action, so they are only cached, for the response
+# cache TTL, when the prefetcher warms them, or read from an offline bundle
+bill_cache = response_cache if PREFETCH_TOP_N > 0 or OFFLINE_BUNDLE else None
+bill_store = BillStore()
+cosponsor_graph = CosponsorGraph.load()
+# keeps the rest of large list results for next_page
+result_cursors = CursorStore()
+dts_tables = {name: DTSTable(name) for name in DTS_TABLES}
+watch_list = WatchList()
+page_archive = PageArchive()
+# sessions that asked for bill watch notifications, with the event loop serving them
+watch_subscribers = {}
+# started by the first get_server_stats call, on the loop serving the tools
+loop_monitor = LoopLagMonitor()
+
+
+def notify_watch_subscribers(entries):
+    """Send new watched-bill actions to subscribed sessions; runs on the watcher thread."""
+    for session, loop in list(watch_subscribers.items()):
+        future = asyncio.run_coroutine_threadsafe(
+            session.send_log_message(level="notice", data={"newActions": entries}, logger="bill-watch"), loop
+        )
+        try:
+            future.result(timeout=10)
+        except Exception as e:
+            logger.info("dropping bill watch subscriber: %s", e)
+            watch_subscribers.pop(session, None)
+
+
+watch_list.listeners.append(notify_watch_subscribers)
+bill_text_store = BillTextStore()
+text_index = TextIndex.load()
+
+def index_bill_text(doc_id):
+    """Add a stored bill text to the search index, unless it is already indexed."""
+    if doc_id in text_index.docs:
+        return
+    bill, version = doc_id.rsplit("-", 1)
+    with bill_text_store.open(doc_id) as text:
+        added = text_index.add(doc_id, text.read_bytes(), bill=bill, kind="text",
+                               congress=int(bill.split("-")[0]), version=version)
+    if added:
+        text_index.save()
+
+
+async def stored_bill_text(congress, bill_type, bill_number, version=None):
+    """Download, store and index a text version of a bill unless it is already stored.
+
+    Returns:
+        tuple: ((document id, version code, version type), None), or (None, error message).
+    """
+    url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/text"
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
+    if status != 200:
+        logger.error(status)
+        return None, "Unable to fetch bill text, or no text versions found."
+    chosen = choose_version(xml_text_versions(data), version)
+    if chosen is None:
+        return None, f"No XML text found for version {version or 'latest'} of {bill_type.upper()} {bill_number}."
+
+    code, version_type, _, xml_url = chosen
+    doc_id = document_id(congress, bill_type, bill_number, code or "unknown")
+    if OFFLINE_BUNDLE and not bill_text_store.has(doc_id):
+        return None, f"The text of {bill_type.upper()} {bill_number} is not available in the offline snapshot."
+    try:
+        if not bill_text_store.has(doc_id):
+            xml_path = await asyncio.to_thread(bill_text_store.download, xml_url, doc_id)
+            await worker_pool.run(bill_text_store.build, xml_path, doc_id, xml_url, size=xml_path.stat().st_size)
+    except Exception as e:
+        logger.error("%s: %s", xml_url, e)
+        return None, f"Unable to download or parse the text of {bill_type.upper()} {bill_number}."
+    await asyncio.to_thread(index_bill_text, doc_id)
+    return (doc_id, code, version_type), None
+
+
+def index_stored_texts():
+    """Index every stored bill text that was downloaded before the index existed."""
+    for doc_id in bill_text_store.documents():
+        index_bill_text(doc_id)
+
+
+def sync_cosponsor_graph():
+    """Apply bills ingested since the last sync to the co-sponsorship graph."""
+    if cosponsor_graph.sync(bill_store):
+        cosponsor_graph.save()
+
+
+async def stored_bill(read, congress, bill_type, bill_number):
+    """Read a bill from the bill store, or return None when the API should answer."""
+    # stored rows of the congress in session would hide actions taken since they were ingested
+    if not OFFLINE_BUNDLE and congress >= current_congress():
+        return None
+    return await asyncio.to_thread(read, congress, bill_type, bill_number)
+
 
 def format_bill(bill):
     return (f"{bill['type']} {bill['number']} ({bill['congress']}th Congress)\n"
@@ -48,6 +207,7 @@ def format_bill(bill):
         
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bills() -> str:
     """Get recent bills from Congress.gov.
     
@@ -55,16 +215,18 @@ async def get_bills() -> str:
         str: A formatted list of recent bills.
     """
     url = "bill?limit=100"
-    client = CDGClient()
-    data,status = client.get(url)
+    client = CDGClient(cache=hot_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch bills, or no bills found."
 
+    prefetcher.schedule(bill_endpoints(data.get("bills", []), prefetcher.top_n))
     return data
 
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bills_by_congress(congress: int) -> str:
     """Get bills filtered by congress number.
     
@@ -75,14 +237,15 @@ async def get_bills_by_congress(congress: int) -> str:
         str: A formatted list of bills from the specified congress.
     """
     url = f"bill/{congress}?limit=100"
-    client = CDGClient()
-    data,status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch bills, or no bills found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bills_by_congress_and_type(congress: int, bill_type: str) -> str:
     """Get bills filtered by congress number and bill type.
     
@@ -94,8 +257,8 @@ async def get_bills_by_congress_and_type(congress: int, bill_type: str) -> str:
         str: A formatted list of bills matching the criteria.
     """
     url = f"bill/{congress}/{bill_type.lower()}?limit=100"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch bills, or no bills found."
@@ -114,14 +277,19 @@ async def get_bill_details(congress: int, bill_type: str, bill_number: int) -> s
         str: The details of the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}"
-    client = CDGClient()
-    data, status = client.get(url)
+    prefetcher.record_request(url)
+    stored = await stored_bill(bill_store.bill_details, congress, bill_type, bill_number)
+    if stored is not None:
+        return stored
+    client = CDGClient(cache=bill_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch bill details."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bill_actions(congress: int, bill_type: str, bill_number: int) -> str:
     """Get actions of a specific bill.
     
@@ -134,14 +302,19 @@ async def get_bill_actions(congress: int, bill_type: str, bill_number: int) -> s
         str: A list of actions for the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/actions"
-    client = CDGClient()
-    data, status = client.get(url)
+    prefetcher.record_request(url)
+    stored = await stored_bill(bill_store.bill_actions, congress, bill_type, bill_number)
+    if stored is not None:
+        return stored
+    client = CDGClient(cache=bill_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch bill actions."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bill_amendments(congress: int, bill_type: str, bill_number: int) -> str:
     """Get amendments of a specific bill.
     
@@ -154,14 +327,15 @@ async def get_bill_amendments(congress: int, bill_type: str, bill_number: int) -
         str: A list of amendments for the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/amendments"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch bill amendments."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bill_committees(congress: int, bill_type: str, bill_number: int) -> str:
     """Get committees associated with a specific bill.
     
@@ -174,14 +348,18 @@ async def get_bill_committees(congress: int, bill_type: str, bill_number: int) -
         str: A list of committees for the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/committees"
-    client = CDGClient()
-    data, status = client.get(url)
+    stored = await stored_bill(bill_store.bill_committees, congress, bill_type, bill_number)
+    if stored is not None:
+        return stored
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch committees, or no committees found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bill_cosponsors(congress: int, bill_type: str, bill_number: int) -> str:
     """Get cosponsors of a specific bill.
     
@@ -194,14 +372,18 @@ async def get_bill_cosponsors(congress: int, bill_type: str, bill_number: int) -
         str: A list of cosponsors for the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/cosponsors"
-    client = CDGClient()
-    data, status = client.get(url)
+    stored = await stored_bill(bill_store.bill_cosponsors, congress, bill_type, bill_number)
+    if stored is not None:
+        return stored
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch cosponsors, or no cosponsors found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bill_related(congress: int, bill_type: str, bill_number: int) -> str:
     """Get related bills to a specific bill.
     
@@ -214,8 +396,8 @@ async def get_bill_related(congress: int, bill_type: str, bill_number: int) -> s
         str: A list of related bills for the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/relatedbills"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch related bills, or no related bills found."
@@ -234,14 +416,18 @@ async def get_bill_subjects(congress: int, bill_type: str, bill_number: int) ->
         str: A list of legislative subjects for the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/subjects"
-    client = CDGClient()
-    data, status = client.get(url)
+    stored = await stored_bill(bill_store.bill_subjects, congress, bill_type, bill_number)
+    if stored is not None:
+        return stored
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch subjects, or no subjects found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bill_summaries(congress: int, bill_type: str, bill_number: int) -> str:
     """Get summaries of a specific bill.
     
@@ -254,14 +440,23 @@ async def get_bill_summaries(congress: int, bill_type: str, bill_number: int) ->
         str: A list of summaries for the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/summaries"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch summaries, or no summaries found."
+    summary = summary_text(data)
+    if summary:
+        bill = bill_id(congress, bill_type, bill_number)
+        added = await asyncio.to_thread(text_index.add, f"{bill}-summary", summary.encode("utf-8"), bill=bill,
+                                        kind="summary", congress=congress, keep_text=True)
+        # the whole index is rewritten on save, so only when this summary is new or changed
+        if added:
+            await asyncio.to_thread(text_index.save)
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_bill_text(congress: int, bill_type: str, bill_number: int) -> str:
     """Get text versions of a specific bill.
     
@@ -274,14 +469,150 @@ async def get_bill_text(congress: int, bill_type: str, bill_number: int) -> str:
         str: A list of text versions for the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/text"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch bill text, or no text versions found."
     return data
 
 @mcp.tool()
+async def get_bill_text_sections(
+        congress: int,
+        bill_type: str,
+        bill_number: int,
+        version: str | None = None,
+        sections: list[str] | None = None,
+        offset: int = 0,
+        length: int = 20000,
+) -> str:
+    """Read the full text of a bill, a few sections or one page at a time.
+
+    The chosen text version is downloaded once and stored locally with a section index,
+    so even very large bills can be read section by section. Without sections, returns
+    the table of contents (on the first page) and a page of text starting at offset.
+
+    Args:
+        congress (int): The congressional session number.
+        bill_type (str): The type of bill.
+        bill_number (int): The bill number.
+        version (str, optional): The text version code (e.g. "ih", "rh", "eh", "enr") or
+            type (e.g. "Enrolled Bill"). Defaults to the latest version.
+        sections (list[str], optional): Section numbers (e.g. "10102") to return.
+        offset (int): The byte offset of the page of text to return.
+        length (int): The maximum number of bytes of text to return.
+
+    Returns:
+        str: The requested sections, or a page of text and the offset of the next page.
+    """
+    stored, error = await stored_bill_text(congress, bill_type, bill_number, version)
+    if stored is None:
+        return error
+    doc_id, code, version_type = stored
+
+    with bill_text_store.open(doc_id) as text:
+        result = {"document": doc_id, "version": code, "versionType": version_type,
+                  "title": text.index["title"], "size": text.size}
+        if sections:
+            result["sections"] = [
+                {**section, "text": text.section_text(section)} for section in text.find_sections(sections)
+            ]
+            return result
+        if offset == 0:
+            result["tableOfContents"] = [
+                {"enum": section["enum"], "header": section["header"], "path": section["path"],
+                 "start": section["start"]}
+                for section in text.sections
+            ]
+        end = min(offset + length, text.size)
+        result.update({"offset": offset, "text": text.read(offset, end),
+                       "nextOffset": end if end < text.size else None})
+        return result
+
+@mcp.tool()
+async def diff_bill_text_versions(
+        congress: int,
+        bill_type: str,
+        bill_number: int,
+        from_version: str,
+        to_version: str,
+        start: int = 0,
+        max_sections: int = 20,
+        context: int = 2,
+) -> str:
+    """Show what changed between two text versions of a bill, section by section.
+
+    Sections are matched by section number and only changed, added or removed sections
+    are returned, each with the changed lines and a few lines of context.
+
+    Args:
+        congress (int): The congressional session number.
+        bill_type (str): The type of bill.
+        bill_number (int): The bill number.
+        from_version (str): The earlier text version code (e.g. "ih") or type.
+        to_version (str): The later text version code (e.g. "enr") or type.
+        start (int): The number of changed sections to skip, for paging.
+        max_sections (int): The maximum number of changed sections to return.
+        context (int): The number of unchanged lines shown around each change.
+
+    Returns:
+        str: The changed sections and, if there are more, the start of the next page.
+    """
+    stored = []
+    for version in (from_version, to_version):
+        result, error = await stored_bill_text(congress, bill_type, bill_number, version)
+        if result is None:
+            return error
+        stored.append(result)
+    (old_id, old_code, _), (new_id, new_code, _) = stored
+
+    def collect():
+        with bill_text_store.open(old_id) as old_text, bill_text_store.open(new_id) as new_text:
+            diffs = itertools.islice(iter_section_diffs(old_text, new_text, context), start, start + max_sections + 1)
+            return list(diffs)
+
+    changes = await asyncio.to_thread(collect)
+    return {
+        "from": old_code,
+        "to": new_code,
+        "start": start,
+        "sections": changes[:max_sections],
+        "nextStart": start + max_sections if len(changes) > max_sections else None,
+    }
+
+
+@mcp.tool()
+@result_cursors.paged
+async def search_bill_texts(query: str, congress: int | None = None, limit: int = 10) -> str:
+    """Search the full text and summaries of every bill stored locally.
+
+    Only bills whose text was read with get_bill_text_sections, or whose summaries were
+    fetched with get_bill_summaries, are searched. Results are ranked by relevance.
+
+    Args:
+        query (str): Words to search for. Put words in double quotes to match them as a
+            phrase, e.g. "perfluoroalkyl substances" PFAS.
+        congress (int, optional): Only search bills from this congressional session.
+        limit (int): The maximum number of results.
+
+    Returns:
+        str: Matching bills with their score and snippets. Snippet offsets of bill texts
+            can be passed as offset to get_bill_text_sections.
+    """
+    results = await asyncio.to_thread(text_index.search, query, congress, limit)
+    for result in results:
+        if result["kind"] != "text" or not bill_text_store.has(result["document"]):
+            continue
+        with bill_text_store.open(result["document"]) as text:
+            for snippet in result["snippets"]:
+                snippet["text"] = text.read(snippet["offset"], snippet["offset"] + snippet["length"])
+    if not results:
+        return f"No stored bill texts or summaries match {query}."
+    return results
+
+
+@mcp.tool()
+@result_cursors.paged
 async def get_bill_titles(congress: int, bill_type: str, bill_number: int) -> str:
     """Get titles of a specific bill.
     
@@ -294,14 +625,15 @@ async def get_bill_titles(congress: int, bill_type: str, bill_number: int) -> st
         str: A list of titles for the specified bill.
     """
     url = f"bill/{congress}/{bill_type.lower()}/{bill_number}/titles"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch titles, or no titles found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_all_congresses() -> str:
     """Get a list of all congresses and congressional sessions.
 
@@ -309,8 +641,8 @@ async def get_all_congresses() -> str:
         str: A list of congresses and congressional sessions.
     """
     url = "congress"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=hot_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch congress list, or no data found."
@@ -327,8 +659,8 @@ async def get_congress_details(congress: int) -> str:
         str: Detailed information about the specified congress.
     """
     url = f"congress/{congress}"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch details for Congress {congress}, or no data found."
@@ -342,14 +674,15 @@ async def get_current_congress() -> str:
         str: Detailed information about the current congress.
     """
     url = "congress/current"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=hot_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch details for the current congress, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_all_members() -> str:
     """Get a list of all congressional members.
 
@@ -357,8 +690,8 @@ async def get_all_members() -> str:
         str: A list of all congressional members.
     """
     url = "member"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch members, or no data found."
@@ -375,14 +708,15 @@ async def get_member_details(bioguide_id: str) -> str:
         str: Detailed information about the specified member.
     """
     url = f"member/{bioguide_id}"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch details for member {bioguide_id}, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_member_sponsored_legislation(bioguide_id: str) -> str:
     """Get the list of legislation sponsored by a specified congressional member.
 
@@ -393,14 +727,15 @@ async def get_member_sponsored_legislation(bioguide_id: str) -> str:
         str: A list of legislation sponsored by the member.
     """
     url = f"member/{bioguide_id}/sponsored-legislation"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch sponsored legislation for member {bioguide_id}, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_member_cosponsored_legislation(bioguide_id: str) -> str:
     """Get the list of legislation cosponsored by a specified congressional member.
 
@@ -411,14 +746,73 @@ async def get_member_cosponsored_legislation(bioguide_id: str) -> str:
         str: A list of legislation cosponsored by the member.
     """
     url = f"member/{bioguide_id}/cosponsored-legislation"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch cosponsored legislation for member {bioguide_id}, or no data found."
     return data
 
 @mcp.tool()
+async def get_member_top_collaborators(bioguide_id: str, limit: int = 10) -> str:
+    """Get the members who co-sponsor the most bills with a member, as sponsor or cosponsor.
+
+    Answered from the co-sponsorship graph of locally ingested BILLSTATUS data.
+
+    Args:
+        bioguide_id (str): The Bioguide ID of the member.
+        limit (int): Maximum number of collaborators to return.
+
+    Returns:
+        str: The member's collaborators ranked by number of shared bills.
+    """
+    await asyncio.to_thread(sync_cosponsor_graph)
+    data = cosponsor_graph.top_collaborators(bioguide_id, limit)
+    if data is None:
+        return f"No co-sponsorship data for member {bioguide_id}; ingest BILLSTATUS archives first."
+    return data
+
+@mcp.tool()
+async def get_member_party_crossing(bioguide_id: str) -> str:
+    """Get the share of a member's co-sponsorship ties that cross party lines.
+
+    Answered from the co-sponsorship graph of locally ingested BILLSTATUS data.
+
+    Args:
+        bioguide_id (str): The Bioguide ID of the member.
+
+    Returns:
+        str: Ties by party and the cross-party ratio, weighted by shared bills.
+    """
+    await asyncio.to_thread(sync_cosponsor_graph)
+    data = cosponsor_graph.party_crossing(bioguide_id)
+    if data is None:
+        return f"No co-sponsorship data for member {bioguide_id}; ingest BILLSTATUS archives first."
+    return data
+
+@mcp.tool()
+@result_cursors.paged
+async def get_member_cosponsor_network(bioguide_id: str, hops: int = 2, min_shared_bills: int = 1) -> str:
+    """Get the members within a number of co-sponsorship hops of a member.
+
+    Answered from the co-sponsorship graph of locally ingested BILLSTATUS data.
+
+    Args:
+        bioguide_id (str): The Bioguide ID of the member.
+        hops (int): Maximum number of hops, from 1 to 3.
+        min_shared_bills (int): Only follow ties with at least this many shared bills.
+
+    Returns:
+        str: Member counts per hop and party, and the nearest members.
+    """
+    await asyncio.to_thread(sync_cosponsor_graph)
+    data = cosponsor_graph.neighbourhood(bioguide_id, hops, min_shared_bills)
+    if data is None:
+        return f"No co-sponsorship data for member {bioguide_id}; ingest BILLSTATUS archives first."
+    return data
+
+@mcp.tool()
+@result_cursors.paged
 async def get_members_by_congress(congress: int) -> str:
     """Get a list of members in a specific congressional session.
 
@@ -429,14 +823,15 @@ async def get_members_by_congress(congress: int) -> str:
         str: A list of members for the specified congress.
     """
     url = f"member/congress/{congress}?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch members for Congress {congress}, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_members_by_state(state_code: str) -> str:
     """Get a list of members filtered by state.
 
@@ -447,14 +842,15 @@ async def get_members_by_state(state_code: str) -> str:
         str: A list of members representing the specified state.
     """
     url = f"member/{state_code}"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch members for state {state_code}, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_members_by_state_and_district(state_code: str, district: int) -> str:
     """Get a list of members filtered by state and district.
 
@@ -466,14 +862,15 @@ async def get_members_by_state_and_district(state_code: str, district: int) -> s
         str: A list of members representing the specified state and district.
     """
     url = f"member/{state_code}/{district}"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch members for state {state_code}, district {district}, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_members_by_congress_state_and_district(congress: int, state_code: str, district: int) -> str:
     """Get a list of members filtered by congress, state, and district.
 
@@ -486,38 +883,66 @@ async def get_members_by_congress_state_and_district(congress: int, state_code:
         str: A list of members matching the specified criteria.
     """
     url = f"member/congress/{congress}/{state_code}/{district}"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch members for Congress {congress}, state {state_code}, district {district}, or no data found."
     return data
 
+@mcp.tool()
+async def get_state_delegation_activity(state_code: str, congress: int | None = None) -> str:
+    """Get an aggregated summary of the legislation sponsored and cosponsored by a state's delegation.
+
+    Resolves the state's current members and fetches every member's full sponsored
+    and cosponsored legislation concurrently. Bills are de-duplicated across members.
+    Use this instead of calling get_member_sponsored_legislation for each member.
+
+    Args:
+        state_code (str): The two-letter state abbreviation.
+        congress (int, optional): Only count legislation from this congressional session.
+
+    Returns:
+        str: Per-member counts, bill counts by policy area, bills shared by several
+            members of the delegation, and the most recent latest actions.
+    """
+    client = CDGClient(cache=response_cache)
+    data, status = await delegation_activity(client, state_code, congress)
+    if status not in (200, PARTIAL):
+        logger.error(status)
+        return f"Unable to fetch legislative activity for state {state_code}, or no data found."
+    if status == PARTIAL:
+        data["warning"] = "Some pages of the lists under 'incomplete' could not be fetched, so their counts are too low."
+    return data
+
 
 
 @mcp.tool()
+@result_cursors.paged
 async def get_debt_outstanding() -> str:
     """Get info about outstanding debt. Updated once per fiscal year"""
     url = "accounting/od/debt_outstanding"
-    client = FDTreasuryClient()
-    data, status = client.get(url)
+    client = FDTreasuryClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch details for the current congress, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_outstanding_gold_reserves() -> str:
     """Get info about outstanding gold reserves."""
     url = "accounting/od/gold_reserve"
-    client = FDTreasuryClient()
-    data, status = client.get(url)
+    client = FDTreasuryClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch details for the current congress, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_daily_treasury_statement() -> str:
     """
     This table represents the Treasury General Account balance.
@@ -525,8 +950,8 @@ async def get_daily_treasury_statement() -> str:
     All figures are rounded to the nearest million.
     """
     url = "accounting/dts/operating_cash_balance"
-    client = FDTreasuryClient()
-    data, status = client.get(url)
+    client = FDTreasuryClient(cache=hot_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch the daily treasury statement, or no data found."
@@ -534,14 +959,15 @@ async def get_daily_treasury_statement() -> str:
 
 
 @mcp.tool()
+@result_cursors.paged
 async def get_daily_treasury_operating_cash_activities() -> str:
     """
     This table represents deposits and withdrawals from the Treasury General Account.
     A summary of changes to the Treasury General Account can be found in the Operating Cash Balance table.
     All figures are rounded to the nearest million.
     """
-    client = FDTreasuryClient()
-    data, status = client.get("accounting/dts/deposits_withdrawals_operating_cash")
+    client = FDTreasuryClient(cache=response_cache)
+    data, status = await fetch(client, "accounting/dts/deposits_withdrawals_operating_cash")
     if status != 200:
         logger.error(status)
         return "Unable to fetch details on deposits and withdrawls, or no data found."
@@ -549,45 +975,137 @@ async def get_daily_treasury_operating_cash_activities() -> str:
 
 
 @mcp.tool()
+@result_cursors.paged
 async def get_public_debt_transactions() -> str:
     """
     This table represents the issues and redemption of marketable and nonmarketable securities.
     All figures are rounded to the nearest million.
     """
-    client = FDTreasuryClient()
-    data, status = client.get("accounting/dts/public_debt_transactions")
+    client = FDTreasuryClient(cache=response_cache)
+    data, status = await fetch(client, "accounting/dts/public_debt_transactions")
     if status != 200:
         logger.error(status)
         return "Unable to fetch details of public debt transactions, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
+async def aggregate_treasury_table(
+    table: str,
+    value: str,
+    group_by: list[str] | None = None,
+    period: str = "m",
+    start: str | None = None,
+    end: str | None = None,
+    filters: dict[str, str] | None = None,
+    how: str = "sum",
+) -> str:
+    """Aggregate the full history of a Daily Treasury Statement table over a date range.
+
+    The table is kept locally and only days published since the last sync are fetched,
+    so multi-year questions such as monthly withdrawals by category are answered quickly.
+    Useful columns:
+        operating_cash_balance: value open_today_bal, close_today_bal; text account_type.
+        deposits_withdrawals_operating_cash: value transaction_today_amt; text
+            transaction_type ("Deposits" or "Withdrawals"), transaction_catg, account_type.
+        public_debt_transactions: value transaction_today_amt; text transaction_type
+            ("Issues" or "Redemptions"), security_market, security_type, security_type_desc.
+
+    Args:
+        table (str): "operating_cash_balance", "deposits_withdrawals_operating_cash" or
+            "public_debt_transactions".
+        value (str): The numeric column to aggregate.
+        group_by (list[str], optional): Text columns to group by, e.g. ["transaction_catg"].
+        period (str): "d", "m" or "y".
+        start (str, optional): First record date, YYYY-MM-DD.
+        end (str, optional): Last record date, YYYY-MM-DD.
+        filters (dict, optional): Text column -> required value, e.g. {"transaction_type": "Withdrawals"}.
+        how (str): "sum", "avg", "min", "max", "count" or "last" (latest value in the period).
+
+    Returns:
+        str: One row per period and group, in millions of dollars for amounts.
+    """
+    if table not in dts_tables:
+        return f"Unknown table {table!r}; use one of {', '.join(DTS_TABLES)}."
+    store = dts_tables[table]
+    if not OFFLINE_BUNDLE:
+        await store.sync(FDTreasuryClient())
+    if not store.rows:
+        return f"Unable to fetch the {table} table, or no data found."
+    group_by = group_by or []
+    error = store.validate(value, group_by, filters, period, how)
+    if error:
+        return error
+    rows = await asyncio.to_thread(store.aggregate, value, group_by, period, start, end, filters, how)
+    return {"table": table, "latest_date": store.schema["latest_date"], "rows": rows}
+
+@mcp.tool()
+@result_cursors.paged
 async def get_fred_data_releases() -> str:
     """
     Get all releases of economic data from the Federal Reserve Bank of St. Louis.
     :return: a list of releases of economic data
     """
-    client = FREDClient()
-    data, status = client.get("releases")
+    client = FREDClient(cache=response_cache)
+    data, status = await fetch(client, "releases")
     if status != 200:
         logger.error(status)
         return "Unable to fetch FRED economic data releases, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_fred_release_series(release_id: str) -> str:
     """
     Get the series on a release of economic data from the Federal Reserve Bank of St. Louis.
     :return: the series on a release of economic data
     """
-    client = FREDClient()
-    data, status = client.get("release/series",params={"release_id": release_id})
+    client = FREDClient(cache=response_cache)
+    data, status = await fetch(client, "release/series", {"release_id": release_id})
     if status != 200:
         logger.error(status)
         return "Unable to fetch FRED economic data sources, or no data found."
     return data
 
 @mcp.tool()
+async def compare_fred_series(
+    series_ids: list[str],
+    frequency: str = "m",
+    aggregation: str = "avg",
+    fill: str = "ffill",
+    transform: str = "level",
+    start: str | None = None,
+    end: str | None = None,
+    rows: int = 0,
+) -> str:
+    """Compare several FRED series, e.g. CPIAUCSL, UNRATE and FEDFUNDS, aligned on a common date index.
+
+    Args:
+        series_ids (list[str]): FRED series ids.
+        frequency (str): The common frequency: "d", "w", "m", "q" or "a".
+        aggregation (str): How observations within a period are combined: "avg", "sum",
+            "eop" (end of period), "min" or "max".
+        fill (str): "ffill" to carry lower-frequency values forward, or "none".
+        transform (str): "level", "diff", "pct_change" or "yoy" (percent change from a year earlier).
+        start (str, optional): First observation date, YYYY-MM-DD.
+        end (str, optional): Last observation date, YYYY-MM-DD.
+        rows (int): Also return this many of the latest rows of the aligned matrix.
+
+    Returns:
+        str: Statistics per series and pairwise correlations over the common index.
+    """
+    for name, value, allowed in (("frequency", frequency, FREQUENCIES), ("aggregation", aggregation, AGGREGATIONS),
+                                 ("fill", fill, FILLS), ("transform", transform, TRANSFORMS)):
+        if value not in allowed:
+            return f"Unsupported {name} {value!r}; use one of {', '.join(allowed)}."
+    client = FREDClient(cache=response_cache)
+    data = await compare_series(client, series_ids, frequency, aggregation, fill, transform, start, end, rows)
+    if not data["series"]:
+        return "Unable to fetch any of the FRED series."
+    return data
+
+@mcp.tool()
+@result_cursors.paged
 async def get_all_committees() -> str:
     """Get a list of all congressional committees.
 
@@ -595,14 +1113,15 @@ async def get_all_committees() -> str:
         str: A list of all congressional committees.
     """
     url = "committee?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return "Unable to fetch committees, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_committees_by_chamber(chamber: str) -> str:
     """Get a list of congressional committees filtered by chamber.
 
@@ -613,14 +1132,15 @@ async def get_committees_by_chamber(chamber: str) -> str:
         str: A list of committees for the specified chamber.
     """
     url = f"committee/{chamber}?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch committees for the {chamber} chamber, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_committees_by_congress(congress: int) -> str:
     """Get a list of congressional committees filtered by congress.
 
@@ -631,14 +1151,15 @@ async def get_committees_by_congress(congress: int) -> str:
         str: A list of committees for the specified congress.
     """
     url = f"committee/{congress}?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch committees for Congress {congress}, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_committees_by_congress_and_chamber(congress: int, chamber: str) -> str:
     """Get a list of congressional committees filtered by congress and chamber.
 
@@ -650,8 +1171,8 @@ async def get_committees_by_congress_and_chamber(congress: int, chamber: str) ->
         str: A list of committees matching the criteria.
     """
     url = f"committee/{congress}/{chamber}?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch committees for Congress {congress} in the {chamber} chamber, or no data found."
@@ -669,14 +1190,15 @@ async def get_committee_details(chamber: str, committee_code: str) -> str:
         str: Detailed information about the specified committee.
     """
     url = f"committee/{chamber}/{committee_code}"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch details for committee {committee_code} in the {chamber} chamber, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_committee_bills(chamber: str, committee_code: str) -> str:
     """Get a list of legislation associated with a specified congressional committee.
 
@@ -688,14 +1210,16 @@ async def get_committee_bills(chamber: str, committee_code: str) -> str:
         str: A list of bills associated with the specified committee.
     """
     url = f"committee/{chamber}/{committee_code}/bills?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch bills for committee {committee_code} in the {chamber} chamber, or no data found."
+    prefetcher.schedule(bill_endpoints(list_items(data, ("committee-bills", "bills")), prefetcher.top_n))
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_committee_reports(chamber: str, committee_code: str) -> str:
     """Get a list of committee reports associated with a specified congressional committee.
 
@@ -707,14 +1231,15 @@ async def get_committee_reports(chamber: str, committee_code: str) -> str:
         str: A list of committee reports associated with the specified committee.
     """
     url = f"committee/{chamber}/{committee_code}/reports?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch reports for committee {committee_code} in the {chamber} chamber, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_committee_nominations(chamber: str, committee_code: str) -> str:
     """Get a list of nominations associated with a specified congressional committee.
 
@@ -726,14 +1251,15 @@ async def get_committee_nominations(chamber: str, committee_code: str) -> str:
         str: A list of nominations associated with the specified committee.
     """
     url = f"committee/{chamber}/{committee_code}/nominations?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch nominations for committee {committee_code} in the {chamber} chamber, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_committee_house_communications(chamber: str, committee_code: str) -> str:
     """Get a list of House communications associated with a specified congressional committee.
 
@@ -745,14 +1271,15 @@ async def get_committee_house_communications(chamber: str, committee_code: str)
         str: A list of House communications associated with the specified committee.
     """
     url = f"committee/{chamber}/{committee_code}/house-communication?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch House communications for committee {committee_code} in the {chamber} chamber, or no data found."
     return data
 
 @mcp.tool()
+@result_cursors.paged
 async def get_committee_senate_communications(chamber: str, committee_code: str) -> str:
     """Get a list of Senate communications associated with a specified congressional committee.
 
@@ -764,22 +1291,208 @@ async def get_committee_senate_communications(chamber: str, committee_code: str)
         str: A list of Senate communications associated with the specified committee.
     """
     url = f"committee/{chamber}/{committee_code}/senate-communication?limit=40"
-    client = CDGClient()
-    data, status = client.get(url)
+    client = CDGClient(cache=response_cache)
+    data, status = await fetch(client, url)
     if status != 200:
         logger.error(status)
         return f"Unable to fetch Senate communications for committee {committee_code} in the {chamber} chamber, or no data found."
     return data
 
+@mcp.tool()
+async def get_committee_snapshot(chamber: str, committee_code: str, max_items: int = 1000) -> str:
+    """Get a complete activity snapshot of a congressional committee in one call.
+
+    Fetches the committee details, bills, reports, nominations, and House and Senate
+    communications concurrently, paginating each list up to max_items, and computes
+    summary statistics server-side. Use this instead of calling each get_committee_* tool.
+
+    Args:
+        chamber (str): The chamber of Congress ("house" or "senate").
+        committee_code (str): The committee's unique code.
+        max_items (int): The maximum number of items fetched for each list.
+
+    Returns:
+        str: The committee details, item counts, statistics such as bills referred
+            per month and reports filed, and the most recent items of each list.
+    """
+    client = CDGClient(cache=response_cache)
+    data, status = await committee_snapshot(client, chamber, committee_code, max_items)
+    if status not in (200, PARTIAL):
+        logger.error(status)
+        return f"Unable to fetch a snapshot for committee {committee_code} in the {chamber} chamber, or no data found."
+    if status == PARTIAL:
+        data["warning"] = "Some pages of the lists under 'incomplete' could not be fetched, so their counts are too low."
+    return data
+
+
+@mcp.tool()
+async def watch_bill(congress: int, bill_type: str, bill_number: int, ctx: Context) -> str:
+    """Watch a bill for new actions. New actions are sent to this session as notifications
+    and recorded in the feed returned by get_bill_watch_feed.
+
+    Args:
+        congress (int): The congressional session number.
+        bill_type (str): The type of bill.
+        bill_number (int): The bill number.
+
+    Returns:
+        str: The watch entry with the bill's current action count.
+    """
+    if OFFLINE_BUNDLE:
+        # the snapshot never changes and the poller does not run
+        return "Bill watch is unavailable in offline mode."
+    client = CDGClient()
+    entry, status = await asyncio.to_thread(watch_list.add, client, congress, bill_type, bill_number)
+    if status != 200:
+        logger.error(status)
+        return "Unable to watch the bill, or no bill found."
+    watch_subscribers[ctx.session] = asyncio.get_running_loop()
+    return {"watching": len(watch_list.bills), "pollSeconds": WATCH_POLL_INTERVAL, **entry}
+
+
+@mcp.tool()
+async def unwatch_bill(congress: int, bill_type: str, bill_number: int) -> str:
+    """Stop watching a bill for new actions.
+
+    Args:
+        congress (int): The congressional session number.
+        bill_type (str): The type of bill.
+        bill_number (int): The bill number.
+
+    Returns:
+        str: Whether the bill was being watched.
+    """
+    removed = watch_list.remove(congress, bill_type, bill_number)
+    return {"removed": removed, "watching": len(watch_list.bills)}
+
+
+@mcp.tool()
+@result_cursors.paged
+async def get_bill_watch_feed(after: int = 0, limit: int = 100) -> str:
+    """Get new actions on watched bills, oldest first.
+
+    Args:
+        after (int): Only return entries with a seq greater than this, e.g. the last seq already seen.
+        limit (int): Maximum number of entries.
+
+    Returns:
+        str: Feed entries with the bill, the new action and when it was detected, and the watched bills.
+    """
+    entries = await asyncio.to_thread(watch_list.feed, after, limit)
+    return {"entries": entries, "lastPoll": watch_list.state["lastPoll"], "watched": watch_list.bills}
+
+
+@mcp.tool()
+async def get_prefetch_stats() -> str:
+    """Get statistics on prefetching of bill details and actions after bill lists.
+
+    Returns:
+        str: Whether prefetching is enabled, the number of endpoints prefetched, how many
+            were later requested by a tool (hits), and the hit rate.
+    """
+    return prefetcher.summary()
+
+
+@mcp.tool()
+async def get_cache_stats() -> str:
+    """Get statistics on the in-memory response cache.
+
+    Returns:
+        str: Entries and bytes held, hits, misses, evictions, and bytes per endpoint
+            family with its quota.
+    """
+    if memory_tier is None:
+        return "The in-memory cache is disabled."
+    return memory_tier.summary()
+
+
+@mcp.tool()
+async def get_server_stats(reset: bool = False) -> dict:
+    """Get statistics on the server process: event loop lag, memory and worker pool use.
+
+    Event loop lag is sampled from the first call of this tool on, and reported over
+    at most the last minute.
+
+    Args:
+        reset (bool): Clear the lag samples after reading them, to measure the next interval.
+
+    Returns:
+        dict: Lag percentiles in milliseconds, current and peak resident memory in MiB,
+            and how many stages ran inline or in worker processes.
+    """
+    loop_monitor.start()
+    stats = {"loopLag": loop_monitor.summary(), "memory": memory_usage(), "workerPool": dict(worker_pool.stats)}
+    if reset:
+        loop_monitor.reset()
+    return stats
+
+
+@mcp.tool()
+async def next_page(cursor: str) -> str:
+    """Get the next page of a large result returned by another tool.
+
+    Tools that return long lists send only the first page, with a "cursor" entry.
+    Pass its "next" value here for the following page; no new upstream request is made.
+
+    Args:
+        cursor (str): The "next" value of the previous page's cursor.
+
+    Returns:
+        str: The next page of items, and a cursor whose "next" is null on the last page.
+    """
+    data = result_cursors.next_page(cursor)
+    if data is None:
+        return "Unknown or expired cursor; run the original tool again."
+    return data
 
 # TODO: Move this to removed_env_data.py
 @mcp.tool()
+@result_cursors.paged
 async def get_removed_env_data() -> dict:
     """
     Gets environmental data removed from US Federal Websites
     """
-    return RemovedEnvDataClient.read_and_parse_csv()
+    size = os.path.getsize(CSV_FILE_PATH) if os.path.exists(CSV_FILE_PATH) else 0
+    return await worker_pool.run(RemovedEnvDataClient.read_and_parse_csv, size=size)
+
+
+@mcp.tool()
+@result_cursors.paged
+async def diff_removed_env_pages(rows: list[int] | None = None, agency: str | None = None,
+                                 max_lines: int = 20) -> str:
+    """Compare the archived before and after snapshots of pages in the removed environmental
+    data tracker, showing the visible text and links that were removed from each page.
+
+    Args:
+        rows (list[int], optional): Positions of rows in the get_removed_env_data list.
+        agency (str, optional): Only rows of this agency, e.g. "EPA". Without rows or agency,
+            every row of the tracker is compared.
+        max_lines (int): Maximum removed text lines and links returned per page.
+
+    Returns:
+        str: For each page, word counts before and after, and the removed text and links.
+    """
+    data = await worker_pool.run(RemovedEnvDataClient.read_and_parse_csv, size=0)
+    if not data:
+        return "Unable to read the removed environmental data tracker."
+    selected = [(index, row) for index, row in enumerate(data)
+                if (rows is None or index in rows)
+                and (agency is None or (row.get("Agency") or "").lower() == agency.lower())]
+    if not selected:
+        return "No tracker rows match."
+    if OFFLINE_BUNDLE:
+        # stored snapshots only
+        selected = [(index, row) for index, row in selected
+                    if all(row.get(column) in page_archive.index
+                           for column in ("HTML File - Before", "HTML File - After"))]
+    return await page_archive.diff_rows(selected, max_lines)
 
 if __name__ == "__main__":
     logger.info("Running congress API")
-    mcp.run(transport='stdio')
+    index_stored_texts()
+    sync_cosponsor_graph()
+    if HOT_REFRESH_INTERVAL > 0:
+        HotSetRefresher(hot_cache, HOT_ENDPOINTS, HOT_REFRESH_INTERVAL).start()
+    if WATCH_POLL_INTERVAL > 0 and not OFFLINE_BUNDLE:
+        BillWatcher(watch_list, CDGClient, WATCH_POLL_INTERVAL).start()
+    mcp.run(transport=TRANSPORT)
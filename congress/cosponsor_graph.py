@@ -0,0 +1,243 @@
+"""
+Co-sponsorship graph of members, built from the local bill store.
+
+Members are nodes and every (sponsor, cosponsor) pair on a bill adds one to the
+weight of the undirected edge between them; withdrawn cosponsorships are left out.
+The adjacency is held in CSR form: for node i, targets[offsets[i]:offsets[i + 1]]
+are its neighbours, sorted by node id, and weights holds the matching edge weights.
+All three are unsigned int arrays, so the graph of a whole congress takes a few MB
+and pickles quickly.
+
+Changes from newly ingested bills are applied to a small delta map on top of the
+CSR arrays. Re-ingesting a bill replaces its previous edges. Once the delta grows
+past COMPACT_RATIO of the edge count, it is folded back into the arrays.
+
+The graph is saved to cache/index/cosponsor_graph.pkl.
+
+"""
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+import heapq
+import logging
+import os
+import pickle
+import threading
+
+GRAPH_PATH = os.environ.get("CONGRESS_COSPONSOR_GRAPH", "cache/index/cosponsor_graph.pkl")
+GRAPH_FORMAT = 1
+COMPACT_RATIO = 0.25
+MAX_HOPS = 3
+
+logger = logging.getLogger(__name__)
+
+
+class CosponsorGraph:
+    """ Weighted co-sponsorship graph keyed by bioguide ID.
+
+    Usage example:
+    graph = CosponsorGraph.load()
+    graph.sync(BillStore())
+    graph.top_collaborators("S000583", limit=10)
+    """
+
+    def __init__(self, path=GRAPH_PATH):
+        self.path = Path(path)
+        self.members = []  # node id -> bioguide ID
+        self.index = {}  # bioguide ID -> node id
+        self.parties = []
+        self.names = []
+        self.offsets = array("I", [0])
+        self.targets = array("I")
+        self.weights = array("I")
+        self.delta = defaultdict(Counter)  # node -> {neighbour: weight change}
+        self.delta_size = 0
+        self.bill_edges = {}  # (congress, bill_type, number) -> (sponsor node, cosponsor nodes)
+        self.synced_seq = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def load(cls, path=GRAPH_PATH):
+        graph = cls(path)
+        try:
+            with open(graph.path, "rb") as file:
+                state = pickle.load(file)
+        except FileNotFoundError:
+            return graph
+        if state.get("format") != GRAPH_FORMAT:
+            logger.warning("ignoring graph %s with format %s", path, state.get("format"))
+            return graph
+        for name in ("members", "parties", "names", "offsets", "targets", "weights", "bill_edges", "synced_seq"):
+            setattr(graph, name, state[name])
+        graph.index = {bioguide_id: node for node, bioguide_id in enumerate(graph.members)}
+        return graph
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".part")
+        with self._lock, open(tmp_path, "wb") as file:
+            self.compact()
+            state = {name: getattr(self, name) for name in (
+                "members", "parties", "names", "offsets", "targets", "weights", "bill_edges", "synced_seq")}
+            pickle.dump({"format": GRAPH_FORMAT, **state}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def _node(self, bioguide_id, party, name):
+        node = self.index.get(bioguide_id)
+        if node is None:
+            node = self.index[bioguide_id] = len(self.members)
+            self.members.append(bioguide_id)
+            self.parties.append(party)
+            self.names.append(name)
+        else:
+            # keep the most recently seen party and name
+            self.parties[node] = party or self.parties[node]
+            self.names[node] = name or self.names[node]
+        return node
+
+    def _change_edge(self, a, b, change):
+        self.delta[a][b] += change
+        self.delta[b][a] += change
+        self.delta_size += 1
+
+    def set_bill(self, key, sponsor, cosponsors):
+        """Set the sponsorships of one bill, replacing those recorded for it before.
+
+        Args:
+            key (tuple): (congress, bill_type, number).
+            sponsor (tuple): (bioguide_id, party, name), or None if the bill has no sponsor.
+            cosponsors (list): (bioguide_id, party, name) tuples of current cosponsors.
+        """
+        with self._lock:
+            if sponsor is None or sponsor[0] is None:
+                new = None
+            else:
+                sponsor_node = self._node(*sponsor)
+                cosponsor_nodes = {self._node(*cosponsor) for cosponsor in cosponsors if cosponsor[0]}
+                cosponsor_nodes.discard(sponsor_node)
+                new = (sponsor_node, tuple(sorted(cosponsor_nodes)))
+            old = self.bill_edges.pop(key, None)
+            if old is not None:
+                for node in old[1]:
+                    self._change_edge(old[0], node, -1)
+            if new is not None:
+                self.bill_edges[key] = new
+                for node in new[1]:
+                    self._change_edge(new[0], node, 1)
+
+    def sync(self, store):
+        """Apply every bill written to the store since the last sync.
+
+        Returns:
+            int: The number of bills applied.
+        """
+        with self._lock:
+            seq, bills, cosponsor_rows = store.changes_since(self.synced_seq)
+            cosponsors = defaultdict(list)
+            for congress, bill_type, number, bioguide_id, party, name in cosponsor_rows:
+                cosponsors[(congress, bill_type, number)].append((bioguide_id, party, name))
+            for congress, bill_type, number, bioguide_id, party, name in bills:
+                key = (congress, bill_type, number)
+                self.set_bill(key, (bioguide_id, party, name), cosponsors[key])
+            self.synced_seq = seq
+            if self.delta_size > COMPACT_RATIO * max(len(self.targets), 1000):
+                self.compact()
+            return len(bills)
+
+    def _row(self, node):
+        if node + 1 >= len(self.offsets):
+            return {}
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return dict(zip(self.targets[start:end], self.weights[start:end]))
+
+    def neighbours(self, node):
+        """Return {neighbour node: edge weight} for a node, including pending changes."""
+        row = self._row(node)
+        changes = self.delta.get(node)
+        if changes:
+            for neighbour, change in changes.items():
+                row[neighbour] = row.get(neighbour, 0) + change
+            row = {neighbour: weight for neighbour, weight in row.items() if weight > 0}
+        return row
+
+    def compact(self):
+        """Fold pending changes into the CSR arrays."""
+        with self._lock:
+            if not self.delta_size:
+                return
+            offsets, targets, weights = array("I", [0]), array("I"), array("I")
+            for node in range(len(self.members)):
+                for neighbour, weight in sorted(self.neighbours(node).items()):
+                    targets.append(neighbour)
+                    weights.append(weight)
+                offsets.append(len(targets))
+            self.offsets, self.targets, self.weights = offsets, targets, weights
+            self.delta = defaultdict(Counter)
+            self.delta_size = 0
+
+    def _member(self, node, **fields):
+        return {"bioguideId": self.members[node], "name": self.names[node], "party": self.parties[node], **fields}
+
+    def top_collaborators(self, bioguide_id, limit=10):
+        """Return the members sharing the most bills with bioguide_id, or None if unknown."""
+        node = self.index.get(bioguide_id)
+        if node is None:
+            return None
+        with self._lock:
+            row = self.neighbours(node)
+        top = heapq.nlargest(limit, row.items(), key=lambda item: item[1])
+        return {"member": self._member(node), "collaborators": len(row),
+                "top": [self._member(neighbour, sharedBills=weight) for neighbour, weight in top]}
+
+    def party_crossing(self, bioguide_id):
+        """Return the share of bioguide_id's co-sponsorship ties that cross party lines."""
+        node = self.index.get(bioguide_id)
+        if node is None:
+            return None
+        with self._lock:
+            row = self.neighbours(node)
+        party = self.parties[node]
+        by_party = Counter()
+        for neighbour, weight in row.items():
+            by_party[self.parties[neighbour] or "Unknown"] += weight
+        total = sum(by_party.values())
+        crossing = total - by_party.get(party, 0)
+        return {"member": self._member(node), "ties": total, "crossPartyTies": crossing,
+                "crossPartyRatio": round(crossing / total, 4) if total else None,
+                "tiesByParty": dict(by_party.most_common())}
+
+    def neighbourhood(self, bioguide_id, hops=2, min_weight=1, limit=50):
+        """Return the members within a number of hops of bioguide_id.
+
+        Args:
+            bioguide_id (str): The starting member.
+            hops (int): Maximum hops, at most MAX_HOPS.
+            min_weight (int): Ignore edges with fewer shared bills.
+            limit (int): Maximum members listed; counts cover all of them.
+
+        Returns:
+            dict: Member counts per hop and party, and the nearest members, or None if unknown.
+        """
+        start = self.index.get(bioguide_id)
+        if start is None:
+            return None
+        hops = max(1, min(hops, MAX_HOPS))
+        distance = {start: 0}
+        frontier = [start]
+        with self._lock:
+            for hop in range(1, hops + 1):
+                next_frontier = []
+                for node in frontier:
+                    for neighbour, weight in self.neighbours(node).items():
+                        if weight >= min_weight and neighbour not in distance:
+                            distance[neighbour] = hop
+                            next_frontier.append(neighbour)
+                frontier = next_frontier
+        del distance[start]
+        per_hop = Counter(distance.values())
+        return {
+            "member": self._member(start),
+            "hops": {hop: per_hop[hop] for hop in range(1, hops + 1)},
+            "byParty": dict(Counter(self.parties[node] or "Unknown" for node in distance).most_common()),
+            "members": [self._member(node, hop=hop) for node, hop in sorted(distance.items(), key=lambda item: item[1])[:limit]],
+        }
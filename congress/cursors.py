@@ -0,0 +1,138 @@
+"""
+Server-side cursors over large tool results.
+
+The longest list in a tool result, at the top level or one level down as in
+{"committee-bills": {"bills": [...]}}, is cut to a first page when it encodes to
+more than PAGE_BYTES of JSON, and the full list is kept in a CursorStore. The
+result gains a "cursor" entry whose "next" value can be passed to the next_page
+tool for the following page, so reading the rest never calls the upstream again.
+
+Stored lists are kept as their JSON encoding, so the store is bounded by bytes.
+Least recently used results are evicted past MAX_BYTES, and every cursor expires
+CURSOR_TTL seconds after its result was stored.
+
+"""
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+
+PAGE_BYTES = int(os.environ.get("CONGRESS_PAGE_BYTES", 32 * 1024))
+MAX_BYTES = int(os.environ.get("CONGRESS_CURSOR_MAX_BYTES", 64 * 1024 * 1024))
+CURSOR_TTL = int(os.environ.get("CONGRESS_CURSOR_TTL", 15 * 60))  # seconds
+
+
+class CursorStore:
+    """ Memory-bounded store of paged tool results.
+
+    Usage example:
+    cursors = CursorStore()
+    page = cursors.paginate({"bills": [...]})  # first page, with page["cursor"]["next"]
+    page = cursors.next_page(page["cursor"]["next"])
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, ttl=CURSOR_TTL, page_bytes=PAGE_BYTES):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.page_bytes = page_bytes
+        self._results = OrderedDict()  # result id -> entry, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"paged": 0, "served": 0, "expired": 0, "evicted": 0}
+
+    def _largest_list(self, data):
+        """Return the keys leading to the longest list, at the top level or one level down, and the list."""
+        if isinstance(data, list):
+            return (), data
+        lists = [((key,), value) for key, value in data.items() if isinstance(value, list)]
+        lists += [((key, inner), value) for key, nested in data.items() if isinstance(nested, dict)
+                  for inner, value in nested.items() if isinstance(value, list)]
+        return max(lists, key=lambda item: len(item[1]), default=((), None))
+
+    def _drop(self, result_id, reason):
+        entry = self._results.pop(result_id)
+        self._bytes -= len(entry["blob"])
+        self.stats[reason] += 1
+
+    def _store(self, key, blob, offsets):
+        result_id = secrets.token_urlsafe(9)
+        now = time.monotonic()
+        with self._lock:
+            for expired_id in [result_id for result_id, entry in self._results.items() if entry["expires"] <= now]:
+                self._drop(expired_id, "expired")
+            self._results[result_id] = {"key": key, "blob": blob, "offsets": offsets, "expires": now + self.ttl}
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes and len(self._results) > 1:
+                self._drop(next(iter(self._results)), "evicted")
+        return result_id
+
+    def _page(self, result_id, entry, start):
+        offsets, blob = entry["offsets"], entry["blob"]
+        total = len(offsets) - 1
+        # as many whole items as fit in a page, and at least one
+        end = max(start + 1, bisect_right(offsets, offsets[start] + self.page_bytes) - 1)
+        end = min(end, total)
+        items = json.loads(b"[" + b",".join(
+            blob[offsets[index]:offsets[index + 1]] for index in range(start, end)) + b"]")
+        cursor = {
+            "next": f"{result_id}:{end}" if end < total else None,
+            "offset": start,
+            "returned": end - start,
+            "total": total,
+            "expiresIn": max(0, round(entry["expires"] - time.monotonic())),
+        }
+        return items, cursor
+
+    def paginate(self, data):
+        """Return data, or its first page with a cursor if its largest list is over the page size."""
+        if not isinstance(data, (dict, list)):
+            return data
+        key, items = self._largest_list(data)
+        if not items or len(items) < 2:
+            return data
+        encoded = [json.dumps(item, default=str).encode("utf-8") for item in items]
+        offsets = array("Q", [0])
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        if offsets[-1] <= self.page_bytes:
+            return data
+
+        result_id = self._store(key, b"".join(encoded), offsets)
+        self.stats["paged"] += 1
+        page, cursor = self._page(result_id, self._results[result_id], 0)
+        if not key:
+            return {"items": page, "cursor": cursor}
+        if len(key) == 1:
+            return {**data, key[0]: page, "cursor": cursor}
+        outer, inner = key
+        return {**data, outer: {**data[outer], inner: page}, "cursor": cursor}
+
+    def next_page(self, cursor):
+        """Return the page a cursor points to, or None if it is unknown or expired."""
+        result_id, _, start = cursor.partition(":")
+        with self._lock:
+            entry = self._results.get(result_id)
+            if entry is None or not start.isdigit() or int(start) >= len(entry["offsets"]) - 1:
+                return None
+            if entry["expires"] <= time.monotonic():
+                self._drop(result_id, "expired")
+                return None
+            self._results.move_to_end(result_id)
+        self.stats["served"] += 1
+        items, cursor = self._page(result_id, entry, int(start))
+        return {entry["key"][-1] if entry["key"] else "items": items, "cursor": cursor}
+
+    def paged(self, tool):
+        """Decorate an async tool so that large list results are returned a page at a time."""
+        @functools.wraps(tool)
+        async def wrapper(*args, **kwargs):
+            return self.paginate(await tool(*args, **kwargs))
+        return wrapper
+
+    def summary(self):
+        return {"results": len(self._results), "bytes": self._bytes, **self.stats}
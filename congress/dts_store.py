@@ -0,0 +1,295 @@
+"""
+Append-only columnar store of Daily Treasury Statement tables.
+
+Each table lives in cache/dts/<table>/ with one typed column file per field:
+
+    DATE                     int32 days since 1970-01-01
+    CURRENCY, NUMBER, ...    float64, NaN for null (also suffixed kinds such as CURRENCY0)
+    INTEGER, YEAR, MONTH...  int64, NULL_INT for null
+    STRING                   int32 codes into <field>.dict.json
+
+schema.json records the field types, the committed row count and the latest
+record_date. Rows are appended to every column file first and committed by
+rewriting schema.json, so a crash mid-append leaves at most trailing bytes that
+the next append truncates. Columns are read as read-only memory maps.
+
+Sync requests only record_date values after the latest stored one. Rows arrive
+sorted by record_date, so date ranges are found by binary search and
+aggregations run as vectorized numpy group-bys.
+
+"""
+from pathlib import Path
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+
+from paging import fetch
+
+DTS_DIR = os.environ.get("CONGRESS_DTS_DIR", "cache/dts")
+SYNC_START = os.environ.get("CONGRESS_DTS_START", "")  # e.g. 2015-01-01; empty for the full history
+SYNC_INTERVAL = int(os.environ.get("CONGRESS_DTS_SYNC_SECONDS", 60 * 60))
+PAGE_SIZE = 10000
+FORMAT = 2  # schema.json format; tables in another format are downloaded again
+NULL_INT = np.iinfo(np.int64).min
+DTS_TABLES = {
+    "operating_cash_balance": "accounting/dts/operating_cash_balance",
+    "deposits_withdrawals_operating_cash": "accounting/dts/deposits_withdrawals_operating_cash",
+    "public_debt_transactions": "accounting/dts/public_debt_transactions",
+}
+FLOAT_TYPES = ("CURRENCY", "NUMBER", "PERCENTAGE")
+INT_TYPES = ("INTEGER", "YEAR", "MONTH", "QUARTER", "DAY")
+PERIODS = {"d": "datetime64[D]", "m": "datetime64[M]", "y": "datetime64[Y]"}
+AGGREGATIONS = ("sum", "avg", "min", "max", "count", "last")
+
+logger = logging.getLogger(__name__)
+
+
+def is_float(kind):
+    # meta.dataTypes suffixes some kinds with their precision, e.g. CURRENCY0
+    return kind.startswith(FLOAT_TYPES)
+
+
+def is_int(kind):
+    return kind.startswith(INT_TYPES)
+
+
+def column_dtype(kind):
+    if kind == "DATE":
+        return np.dtype("<i4")
+    if is_float(kind):
+        return np.dtype("<f8")
+    if is_int(kind):
+        return np.dtype("<i8")
+    return np.dtype("<i4")  # dictionary codes of STRING and any other type
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return NULL_INT
+
+
+class DTSTable:
+    """ One DTS table stored as memory-mapped columns.
+
+    Usage example:
+    table = DTSTable("deposits_withdrawals_operating_cash")
+    await table.sync(FDTreasuryClient())
+    rows = table.aggregate("transaction_today_amt", group_by=["transaction_catg"],
+                           filters={"transaction_type": "Withdrawals"}, period="m")
+    """
+
+    def __init__(self, name, directory=DTS_DIR):
+        self.name = name
+        self.endpoint = DTS_TABLES[name]
+        self.directory = Path(directory) / name
+        self.schema = {"format": FORMAT, "fields": {}, "rows": 0, "latest_date": None, "synced_at": 0}
+        self.dictionaries = {}
+        self._lock = asyncio.Lock()
+        try:
+            schema = json.loads((self.directory / "schema.json").read_text())
+        except FileNotFoundError:
+            return
+        if schema.get("format") != FORMAT:
+            # written before suffixed kinds such as CURRENCY0 were stored as numbers
+            logger.info("dropping %s, stored in an older format; the next sync downloads it again", name)
+            shutil.rmtree(self.directory)
+            return
+        self.schema = schema
+        for field, kind in self.fields.items():
+            if column_dtype(kind) == np.dtype("<i4") and kind != "DATE":
+                self.dictionaries[field] = json.loads((self.directory / f"{field}.dict.json").read_text())
+
+    @property
+    def fields(self):
+        return self.schema["fields"]
+
+    @property
+    def rows(self):
+        return self.schema["rows"]
+
+    def column(self, field):
+        """Return a read-only memory map of a column's committed rows."""
+        dtype = column_dtype(self.fields[field])
+        if not self.rows:
+            return np.empty(0, dtype)
+        return np.memmap(self.directory / f"{field}.col", dtype=dtype, mode="r", shape=(self.rows,))
+
+    def _encode(self, field, kind, values):
+        if kind == "DATE":
+            return np.array([value or "1970-01-01" for value in values], dtype="datetime64[D]").astype("<i4")
+        if is_float(kind):
+            return np.array([_float(value) for value in values], dtype="<f8")
+        if is_int(kind):
+            return np.array([_int(value) for value in values], dtype="<i8")
+        dictionary = self.dictionaries.setdefault(field, [])
+        codes = {value: code for code, value in enumerate(dictionary)}
+        encoded = []
+        for value in values:
+            if value not in codes:
+                codes[value] = len(dictionary)
+                dictionary.append(value)
+            encoded.append(codes[value])
+        return np.array(encoded, dtype="<i4")
+
+    def append(self, records, data_types=None):
+        """Append records (dicts of strings from the API) and commit them.
+
+        Args:
+            records (list): Rows sorted by record_date, all later than the latest stored one.
+            data_types (dict, optional): meta.dataTypes of the response; fixes the schema on
+                the first append.
+        """
+        if not records:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self.fields:
+            self.schema["fields"] = dict(data_types or {field: "STRING" for field in records[0]})
+        for field, kind in self.fields.items():
+            column = self._encode(field, kind, [record.get(field) for record in records])
+            path = self.directory / f"{field}.col"
+            with open(path, "ab") as file:
+                # drop bytes of an append that was never committed
+                file.truncate(self.rows * column.itemsize)
+                file.write(column.tobytes())
+            if field in self.dictionaries:
+                self._write_json(f"{field}.dict.json", self.dictionaries[field])
+        self.schema["rows"] += len(records)
+        self.schema["latest_date"] = max(record["record_date"] for record in records)
+        self._write_json("schema.json", self.schema)
+
+    def _write_json(self, name, value):
+        tmp_path = self.directory / f"{name}.part"
+        tmp_path.write_text(json.dumps(value))
+        os.replace(tmp_path, self.directory / name)
+
+    async def sync(self, client, force=False):
+        """Fetch and append the rows published after the latest stored record_date.
+
+        Returns:
+            int: The number of rows appended.
+        """
+        async with self._lock:
+            if not force and time.time() - self.schema["synced_at"] < SYNC_INTERVAL:
+                return 0
+            latest = self.schema["latest_date"]
+            params = {"sort": "record_date", "page[size]": PAGE_SIZE}
+            if latest:
+                params["filter"] = f"record_date:gt:{latest}"
+            elif SYNC_START:
+                params["filter"] = f"record_date:gte:{SYNC_START}"
+            data, status = await fetch(client, self.endpoint, {**params, "page[number]": 1})
+            if status != 200:
+                logger.error("sync of %s returned %d", self.name, status)
+                return 0
+            pages = [data]
+            total_pages = data.get("meta", {}).get("total-pages", 1)
+            pages += [page for page, page_status in await asyncio.gather(*(
+                fetch(client, self.endpoint, {**params, "page[number]": number})
+                for number in range(2, total_pages + 1)
+            )) if page_status == 200]
+            if len(pages) < total_pages:
+                # a gap would be skipped for good by the next record_date:gt filter
+                logger.error("sync of %s got %d of %d pages", self.name, len(pages), total_pages)
+                return 0
+            records = [record for page in pages for record in page.get("data", [])]
+            records.sort(key=lambda record: record["record_date"])
+            await asyncio.to_thread(self.append, records, data.get("meta", {}).get("dataTypes"))
+            self.schema["synced_at"] = time.time()
+            if self.directory.exists():
+                await asyncio.to_thread(self._write_json, "schema.json", self.schema)
+            return len(records)
+
+    def _date_range(self, start, end):
+        dates = self.column("record_date")
+        low = np.searchsorted(dates, np.datetime64(start, "D").astype(np.int32)) if start else 0
+        high = np.searchsorted(dates, np.datetime64(end, "D").astype(np.int32), side="right") if end else len(dates)
+        return dates, slice(int(low), int(high))
+
+    def validate(self, value, group_by=(), filters=None, period="m", how="sum"):
+        """Return a message describing the first unusable argument of aggregate, or None."""
+        if period not in PERIODS or how not in AGGREGATIONS:
+            return f"Use a period of {', '.join(PERIODS)} and how of {', '.join(AGGREGATIONS)}."
+        numeric = [field for field, kind in self.fields.items() if is_float(kind) or is_int(kind)]
+        if value not in numeric:
+            return f"{value!r} is not a numeric column of {self.name}; use one of {', '.join(numeric)}."
+        for field in [*group_by, *(filters or {})]:
+            if field not in self.dictionaries:
+                return f"{field!r} is not a text column of {self.name}; use one of {', '.join(self.dictionaries)}."
+        return None
+
+    def aggregate(self, value, group_by=(), period="m", start=None, end=None, filters=None, how="sum"):
+        """Aggregate a numeric column by period and grouping columns.
+
+        Args:
+            value (str): A numeric column, e.g. "transaction_today_amt".
+            group_by (list): STRING columns to group by, e.g. ["transaction_catg"].
+            period (str): "d", "m" or "y".
+            start (str, optional): First record_date, YYYY-MM-DD.
+            end (str, optional): Last record_date, YYYY-MM-DD.
+            filters (dict, optional): STRING column -> required value.
+            how (str): One of AGGREGATIONS.
+
+        Returns:
+            list: One dict per period and group, ordered by period.
+        """
+        dates, rows = self._date_range(start, end)
+        values = np.asarray(self.column(value)[rows], dtype=np.float64)
+        if is_int(self.fields[value]):
+            values[values == NULL_INT] = np.nan
+        mask = ~np.isnan(values)
+        for field, wanted in (filters or {}).items():
+            dictionary = self.dictionaries[field]
+            if wanted not in dictionary:
+                return []
+            mask &= self.column(field)[rows] == dictionary.index(wanted)
+
+        periods = np.asarray(dates[rows]).astype("datetime64[D]").astype(PERIODS[period]).astype(np.int64)
+        base = int(periods[0]) if len(periods) else 0
+        # one int64 key per (period, group codes), in mixed radix
+        keys = periods - base
+        radices = []
+        for field in group_by:
+            radix = len(self.dictionaries[field])
+            keys = keys * radix + self.column(field)[rows]
+            radices.append(radix)
+        keys, values = keys[mask], values[mask]
+        unique, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(unique))
+        if how in ("sum", "avg"):
+            results = np.bincount(inverse, weights=values, minlength=len(unique))
+            if how == "avg":
+                results = results / counts
+        elif how == "count":
+            results = counts.astype(np.float64)
+        elif how == "last":
+            # rows are in record_date order, so the highest row index is the latest value
+            latest = np.zeros(len(unique), dtype=np.int64)
+            np.maximum.at(latest, inverse, np.arange(len(inverse)))
+            results = values[latest]
+        else:
+            results = np.full(len(unique), np.inf if how == "min" else -np.inf)
+            (np.minimum if how == "min" else np.maximum).at(results, inverse, values)
+
+        output = []
+        for key, result, count in zip(unique.tolist(), results.tolist(), counts.tolist()):
+            group = {}
+            for field, radix in zip(reversed(group_by), reversed(radices)):
+                key, code = divmod(key, radix)
+                group[field] = self.dictionaries[field][code]
+            label = str(np.datetime64(int(key + base), PERIODS[period][-2]))
+            output.append({"period": label, **dict(reversed(group.items())), how: round(result, 2), "rows": count})
+        return output
@@ -2,12 +2,16 @@
     This module provides a client for the Fiscal Data Treasury API.
     API Documentation: https://fiscaldata.treasury.gov/api-documentation/#list-of-endpoints
     """
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 import requests
 import logging
+import os
+
+from offload import worker_pool
+from tracing import CLIENT, tracer
 
 API_VERSION = "v2"
-ROOT_URL = "https://api.fiscaldata.treasury.gov/services/api/fiscal_service/"
+ROOT_URL = os.environ.get("FISCALDATA_API_ROOT", "https://api.fiscaldata.treasury.gov/services/api/fiscal_service/")
 
 
 class _MethodWrapper:
@@ -15,17 +19,28 @@ class _MethodWrapper:
 
     def __init__(self, parent, http_method):
         self._parent = parent
+        self._http_method = http_method
         self._method = getattr(parent._session, http_method)
 
     def __call__(self, endpoint, *args, **kwargs):  # full signature passed here
+        url = urljoin(self._parent.base_url, endpoint)
+        cache = self._parent.cache
+        if cache is None or self._http_method != "get":
+            return self._request(url, *args, **kwargs)
+        key = cache.make_key(url, kwargs.get("params"))
+        return cache.get_or_fetch(key, lambda: self._request(url, *args, **kwargs))
+
+    def _request(self, url, *args, **kwargs):
         logger = logging.getLogger(__name__)
-        response = self._method(
-            urljoin(self._parent.base_url, endpoint), *args, **kwargs
-        )
+        with tracer.span(f"{self._http_method.upper()} {urlparse(url).path}", kind=CLIENT, category="upstream",
+                         **{"http.url": url}) as span:
+            response = self._method(url, *args, **kwargs)
+            span.set("http.status_code", response.status_code)
         logger.debug("%s %d",response.url, response.status_code)
         # unpack
         if response.headers.get("content-type", "").startswith("application/json"):
-            return response.json(), response.status_code
+            # decoded in a worker process when large and called off the event loop
+            return worker_pool.loads(response.content), response.status_code
         else:
             return response.content, response.status_code
 
@@ -35,9 +50,11 @@ class FDTreasuryClient:
             api_version=API_VERSION,
             # response_format=RESPONSE_FORMAT,
             raise_on_error=False,
+            cache=None,
     ):
         self.base_url = urljoin(ROOT_URL, api_version) + "/"
         self._session = requests.Session()
+        self.cache = cache
 
         if raise_on_error:
             self._session.hooks = {
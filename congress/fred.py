@@ -6,12 +6,14 @@ This requires an API key, which can be obtained by registering at https://fredac
 
 """
 import requests
-from urllib.parse import urljoin, quote_plus
+from urllib.parse import urljoin, quote_plus, urlparse
 import os
 import logging
 from dotenv import load_dotenv
+from offload import worker_pool
+from tracing import CLIENT, tracer
 
-ROOT_URL = "https://api.stlouisfed.org/fred/"
+ROOT_URL = os.environ.get("FRED_API_ROOT", "https://api.stlouisfed.org/fred/")
 RESPONSE_FORMAT = "json"
 load_dotenv(".env")
 
@@ -21,21 +23,33 @@ class _MethodWrapper:
 
     def __init__(self, parent, http_method):
         self._parent = parent
+        self._http_method = http_method
         self._method = getattr(parent._session, http_method)
 
     def __call__(self, endpoint, *args, **kwargs):  # full signature passed here
+        url = urljoin(self._parent.base_url, endpoint)
+        cache = self._parent.cache
+        if cache is None or self._http_method != "get":
+            return self._request(url, *args, **kwargs)
+        # the api key is a session parameter, so it never becomes part of the cache key
+        key = cache.make_key(url, kwargs.get("params"))
+        return cache.get_or_fetch(key, lambda: self._request(url, *args, **kwargs))
+
+    def _request(self, url, *args, **kwargs):
         logger = logging.getLogger(__name__)
 
-        response = self._method(
-            urljoin(self._parent.base_url, endpoint), *args, **kwargs
-        )
+        with tracer.span(f"{self._http_method.upper()} {urlparse(url).path}", kind=CLIENT, category="upstream",
+                         **{"http.url": url}) as span:
+            response = self._method(url, *args, **kwargs)
+            span.set("http.status_code", response.status_code)
         logger.debug("%s %d",response.url, response.status_code)
         if response.status_code != 200:
             logger.warning("%s returned %d", response.url, response.status_code)
 
         # unpack
         if response.headers.get("content-type", "").startswith("application/json"):
-            return response.json(), response.status_code
+            # decoded in a worker process when large and called off the event loop
+            return worker_pool.loads(response.content), response.status_code
         else:
             return response.content, response.status_code
 
@@ -45,9 +59,11 @@ class FREDClient:
             api_key=os.environ["FRED_API_KEY"],
             response_format=RESPONSE_FORMAT,
             raise_on_error=False,
+            cache=None,
     ):
         self.base_url = ROOT_URL
         self._session = requests.Session()
+        self.cache = cache
         self._session.params = {"api_key": api_key, "file_type": response_format}
 
         if raise_on_error:
@@ -0,0 +1,251 @@
+"""
+Several FRED series aligned into one date-indexed NumPy matrix.
+
+Observations of every series are fetched concurrently (and cached like any other
+FRED response), mapped onto integer period codes of a common frequency, reduced
+per period with an aggregation rule, and placed in a (periods x series) float
+matrix with NaN for gaps. Lower-frequency series can be forward-filled onto the
+common index. Summary statistics and pairwise correlations are computed on the
+matrix, so only a compact result goes back to the model. Weeks end on Friday, as
+in FRED's own weekly aggregation, and are labeled with that Friday.
+
+"""
+import asyncio
+import logging
+
+import numpy as np
+
+from offload import worker_pool
+from paging import fetch
+
+FREQUENCIES = ("d", "w", "m", "q", "a")
+PERIODS_PER_YEAR = {"d": 365, "w": 52, "m": 12, "q": 4, "a": 1}
+AGGREGATIONS = ("avg", "sum", "eop", "min", "max")
+FILLS = ("ffill", "none")
+TRANSFORMS = ("level", "diff", "pct_change", "yoy")
+MIN_CORRELATION_OBSERVATIONS = 3
+OFFLOAD_OBSERVATIONS = 50000  # comparisons over more observations than this run in a worker process
+# days from 1970-01-01, a Thursday, to the end of the first week: FRED's weeks end on Friday
+WEEK_END = 1
+
+logger = logging.getLogger(__name__)
+
+
+def period_codes(dates, frequency):
+    """Map ISO dates to consecutive integer periods of the given frequency."""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    if frequency == "d":
+        return days.astype(np.int64)
+    if frequency == "w":
+        # week k ends on day 7k + WEEK_END; numpy's datetime64[W] would end weeks on Wednesday
+        return (days.astype(np.int64) - WEEK_END + 6) // 7
+    if frequency == "a":
+        return days.astype("datetime64[Y]").astype(np.int64)
+    months = days.astype("datetime64[M]").astype(np.int64)
+    return months if frequency == "m" else months // 3
+
+
+def period_label(code, frequency):
+    code = int(code)
+    if frequency == "d":
+        return str(np.datetime64(code, "D"))
+    if frequency == "w":
+        return str(np.datetime64(7 * code + WEEK_END, "D"))
+    if frequency == "m":
+        return str(np.datetime64(code, "M"))
+    if frequency == "q":
+        return f"{1970 + code // 4}-Q{code % 4 + 1}"
+    return str(1970 + code)
+
+
+def aggregate(codes, values, how):
+    """Reduce values to one per period code.
+
+    Returns:
+        tuple: The sorted unique period codes and their aggregated values.
+    """
+    present = ~np.isnan(values)
+    codes, values = codes[present], values[present]
+    if not len(codes):
+        return codes, values
+    order = np.argsort(codes, kind="stable")
+    codes, values = codes[order], values[order]
+    periods, starts = np.unique(codes, return_index=True)
+    if how == "eop":
+        return periods, values[np.r_[starts[1:], len(codes)] - 1]
+    if how == "min":
+        return periods, np.minimum.reduceat(values, starts)
+    if how == "max":
+        return periods, np.maximum.reduceat(values, starts)
+    sums = np.add.reduceat(values, starts)
+    if how == "sum":
+        return periods, sums
+    return periods, sums / np.diff(np.r_[starts, len(codes)])
+
+
+def forward_fill(matrix):
+    """Carry the last value of each column forward over NaN gaps, up to its last observation."""
+    rows = np.arange(matrix.shape[0])[:, None]
+    present = ~np.isnan(matrix)
+    last = np.maximum.accumulate(np.where(present, rows, 0), axis=0)
+    filled = matrix[last, np.arange(matrix.shape[1])]
+    last_observed = np.where(present.any(axis=0), matrix.shape[0] - 1 - np.argmax(present[::-1], axis=0), -1)
+    filled[rows > last_observed] = np.nan
+    return filled
+
+
+def transform(matrix, how, frequency):
+    if how == "level":
+        return matrix
+    lag = PERIODS_PER_YEAR[frequency] if how == "yoy" else 1
+    result = np.full_like(matrix, np.nan)
+    if how == "diff":
+        result[lag:] = matrix[lag:] - matrix[:-lag]
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[lag:] = (matrix[lag:] / matrix[:-lag] - 1) * 100
+        result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def align(observations, frequency="m", aggregation="avg", fill="ffill"):
+    """Align series onto a common period index.
+
+    Args:
+        observations (dict): Series id -> (list of ISO dates, float array with NaN for gaps).
+        frequency (str): One of FREQUENCIES.
+        aggregation (str): How observations within one period are combined, one of AGGREGATIONS.
+        fill (str): "ffill" to carry values forward over gaps, or "none".
+
+    Returns:
+        tuple: The first period code and the (periods x series) matrix, columns in the
+            order of observations.
+    """
+    reduced = [aggregate(period_codes(dates, frequency), values, aggregation)
+               for dates, values in observations.values()]
+    nonempty = [periods for periods, _ in reduced if len(periods)]
+    if not nonempty:
+        return 0, np.empty((0, len(reduced)))
+    first = min(int(periods[0]) for periods in nonempty)
+    last = max(int(periods[-1]) for periods in nonempty)
+    matrix = np.full((last - first + 1, len(reduced)), np.nan)
+    for column, (periods, values) in enumerate(reduced):
+        matrix[periods - first, column] = values
+    if fill == "ffill":
+        matrix = forward_fill(matrix)
+    return first, matrix
+
+
+def summarize_matrix(ids, first, matrix, frequency):
+    """Per-series statistics and pairwise correlations over complete pairs of observations."""
+    finite = ~np.isnan(matrix)
+    stats = {}
+    for column, series_id in enumerate(ids):
+        rows = np.flatnonzero(finite[:, column])
+        if not len(rows):
+            stats[series_id] = {"observations": 0}
+            continue
+        values = matrix[rows, column]
+        stats[series_id] = {
+            "observations": len(rows),
+            "first": {"period": period_label(first + rows[0], frequency), "value": round(float(values[0]), 4)},
+            "last": {"period": period_label(first + rows[-1], frequency), "value": round(float(values[-1]), 4)},
+            "mean": round(float(values.mean()), 4),
+            "std": round(float(values.std()), 4),
+            "min": round(float(values.min()), 4),
+            "max": round(float(values.max()), 4),
+        }
+
+    correlations = {series_id: {} for series_id in ids}
+    for i in range(len(ids)):
+        for j in range(i + 1, len(ids)):
+            both = finite[:, i] & finite[:, j]
+            if both.sum() < MIN_CORRELATION_OBSERVATIONS:
+                continue
+            a, b = matrix[both, i], matrix[both, j]
+            if a.std() == 0 or b.std() == 0:
+                continue
+            r = round(float(np.corrcoef(a, b)[0, 1]), 3)
+            correlations[ids[i]][ids[j]] = correlations[ids[j]][ids[i]] = r
+    return stats, correlations
+
+
+def parse_observations(data):
+    """Return (dates, values) from a series/observations response; "." marks a missing value."""
+    observations = data.get("observations", [])
+    dates = [observation["date"] for observation in observations]
+    values = np.array([np.nan if observation["value"] == "." else float(observation["value"])
+                       for observation in observations], dtype=np.float64)
+    return dates, values
+
+
+async def fetch_series(client, series_ids, start=None, end=None):
+    """Fetch the metadata and observations of several series concurrently.
+
+    Returns:
+        tuple: Series id -> metadata, series id -> (dates, values), and the ids that failed.
+    """
+    params = {key: value for key, value in (("observation_start", start), ("observation_end", end)) if value}
+    responses = await asyncio.gather(*(
+        request
+        for series_id in series_ids
+        for request in (fetch(client, "series", {"series_id": series_id}),
+                        fetch(client, "series/observations", {"series_id": series_id, **params}))
+    ))
+    metadata, observations, failed = {}, {}, []
+    for index, series_id in enumerate(series_ids):
+        (info, info_status), (data, status) = responses[2 * index], responses[2 * index + 1]
+        if status != 200 or not isinstance(data, dict):
+            logger.warning("observations of %s returned %d", series_id, status)
+            failed.append(series_id)
+            continue
+        observations[series_id] = parse_observations(data)
+        series = (info.get("seriess") or [{}])[0] if info_status == 200 and isinstance(info, dict) else {}
+        metadata[series_id] = {"title": series.get("title"), "units": series.get("units_short"),
+                               "frequency": series.get("frequency_short")}
+    return metadata, observations, failed
+
+
+async def compare_series(client, series_ids, frequency="m", aggregation="avg", fill="ffill",
+                         how="level", start=None, end=None, rows=0):
+    """Fetch, align and summarize several series.
+
+    Returns:
+        dict: The common index, per-series metadata and statistics, pairwise correlations,
+            the series that could not be fetched, and optionally the last rows of the matrix.
+    """
+    series_ids = list(dict.fromkeys(series_id.strip().upper() for series_id in series_ids if series_id.strip()))
+    metadata, observations, failed = await fetch_series(client, series_ids, start, end)
+    return await worker_pool.run(summarize_series, metadata, observations, failed,
+                                 frequency, aggregation, fill, how, rows,
+                                 size=sum(len(values) for _, values in observations.values()),
+                                 threshold=OFFLOAD_OBSERVATIONS)
+
+
+def summarize_series(metadata, observations, failed, frequency, aggregation, fill, how, rows):
+    """Align and summarize fetched series; the CPU-bound part of compare_series()."""
+    ids = list(observations)
+    first, matrix = align(observations, frequency, aggregation, fill)
+    matrix = transform(matrix, how, frequency)
+    stats, correlations = summarize_matrix(ids, first, matrix, frequency)
+    result = {
+        "frequency": frequency,
+        "aggregation": aggregation,
+        "fill": fill,
+        "transform": how,
+        "index": {"start": period_label(first, frequency) if len(matrix) else None,
+                  "end": period_label(first + len(matrix) - 1, frequency) if len(matrix) else None,
+                  "periods": len(matrix)},
+        "series": {series_id: {**metadata[series_id], **stats[series_id]} for series_id in ids},
+        "correlations": correlations,
+        "failed": failed,
+    }
+    if rows > 0:
+        tail = range(max(0, len(matrix) - rows), len(matrix))
+        result["rows"] = {
+            period_label(first + row, frequency): [None if np.isnan(value) else round(float(value), 4)
+                                                   for value in matrix[row]]
+            for row in tail
+        }
+        result["columns"] = ids
+    return result
@@ -0,0 +1,236 @@
+"""
+Bulk ingest of GovInfo BILLSTATUS archives into the local bill store.
+
+Backfilling a congress through Congress.gov takes thousands of rate-limited API
+calls. GovInfo publishes the same data as one zip archive per congress and bill
+type (https://www.govinfo.gov/bulkdata/BILLSTATUS), e.g. BILLSTATUS-118-hr.zip.
+
+Each XML member is stream-parsed with iterparse in a worker process, discarding
+elements as soon as they are consumed, so memory stays flat however large the
+archive is. The parent process bulk-inserts the parsed records into bill_store in
+batches and reports records (rows) per second, then brings the co-sponsorship
+graph and the dashboard's pipeline aggregates up to date.
+
+Usage:
+    python congress/ingest_billstatus.py BILLSTATUS-118-hr.zip BILLSTATUS-118-s.zip [--workers 8]
+
+"""
+from multiprocessing import Pool
+import argparse
+import logging
+import os
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+
+from bill_store import BillStore, STORE_PATH
+from cosponsor_graph import CosponsorGraph
+from pipeline import PipelineAggregates
+
+BATCH_SIZE = 500  # bills per insert transaction
+REPORT_INTERVAL = 5  # seconds
+
+logger = logging.getLogger(__name__)
+
+# bill-level fields and their names in the current (v3) and older schemas
+BILL_FIELDS = {
+    "number": "number", "billNumber": "number",
+    "type": "type", "billType": "type",
+    "congress": "congress",
+    "title": "title",
+    "introducedDate": "introduced_date",
+    "originChamber": "origin_chamber",
+    "updateDate": "update_date",
+}
+# open archives, one set per worker process
+_archives = {}
+
+
+def _text(element, path):
+    found = element.find(path)
+    return found.text.strip() if found is not None and found.text else None
+
+
+def _action(item):
+    return (_text(item, "actionDate"), _text(item, "actionTime"), _text(item, "actionCode"), _text(item, "type"),
+            _text(item, "text"), _text(item, "sourceSystem/name"), _text(item, "committees/item/systemCode"))
+
+
+def _cosponsor(item):
+    return (_text(item, "bioguideId"), _text(item, "fullName"), _text(item, "party"), _text(item, "state"),
+            _text(item, "sponsorshipDate"), int(_text(item, "isOriginalCosponsor") == "True"),
+            _text(item, "sponsorshipWithdrawnDate"))
+
+
+def _committee_rows(item):
+    committee = (_text(item, "systemCode"), _text(item, "name"), _text(item, "chamber"))
+    activities = item.findall("activities/item")
+    if not activities:
+        return [committee + (None, None)]
+    return [committee + (_text(activity, "name"), _text(activity, "date")) for activity in activities]
+
+
+def parse_billstatus(source):
+    """Stream-parse one BILLSTATUS XML document.
+
+    Only direct children of <bill> are read; the actions and committees nested in
+    amendments and related bills are skipped. Each element is removed from the tree
+    once consumed.
+
+    Args:
+        source: A path or binary file object.
+
+    Returns:
+        dict: A record for BillStore.write_bills(), or None if the document has no bill.
+    """
+    fields = {}
+    sponsor = (None, None, None, None)
+    latest_action = (None, None)
+    policy_area = None
+    actions, cosponsors, committees, subjects = [], [], [], []
+
+    path = []
+    parents = []
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            path.append(element.tag)
+            parents.append(element)
+            continue
+        path.pop()
+        parents.pop()
+        # path now holds the ancestors of element, starting at billStatus
+        if len(path) < 2 or path[1] != "bill":
+            continue
+        section = path[2:]
+        if not section:
+            if element.tag in BILL_FIELDS:
+                fields[BILL_FIELDS[element.tag]] = element.text.strip() if element.text else None
+            elif element.tag == "latestAction":
+                latest_action = (_text(element, "actionDate"), _text(element, "text"))
+            elif element.tag == "policyArea":
+                policy_area = _text(element, "name")
+            elif element.tag in ("subjects", "billSubjects"):
+                # subjects/policyArea in the current schema, subjects/billSubjects/policyArea in older ones
+                policy_area = (_text(element, "policyArea/name") or _text(element, "billSubjects/policyArea/name")
+                               or policy_area)
+            else:
+                # nothing else at bill level is ingested; drop it along with what it contains
+                parents[-1].remove(element)
+                continue
+        elif element.tag != "item":
+            continue
+        elif section == ["actions"]:
+            actions.append(_action(element))
+        elif section == ["cosponsors"]:
+            cosponsors.append(_cosponsor(element))
+        elif section == ["sponsors"]:
+            if sponsor[0] is None:
+                sponsor = (_text(element, "bioguideId"), _text(element, "fullName"),
+                           _text(element, "party"), _text(element, "state"))
+        elif section in (["committees"], ["committees", "billCommittees"]):
+            committees.extend(_committee_rows(element))
+        elif section[-1] == "legislativeSubjects":
+            # subjects/legislativeSubjects, or subjects/billSubjects/legislativeSubjects in older schemas
+            subjects.append((_text(element, "name"),))
+        else:
+            continue
+        parents[-1].remove(element)
+
+    if "number" not in fields or "type" not in fields or "congress" not in fields:
+        return None
+    return {
+        "key": (int(fields["congress"]), fields["type"].lower(), int(fields["number"])),
+        "bill": (fields.get("title"), fields.get("introduced_date"), fields.get("origin_chamber"), policy_area)
+                + sponsor + latest_action + (fields.get("update_date"),),
+        "actions": actions,
+        "cosponsors": cosponsors,
+        "committees": committees,
+        "subjects": subjects,
+    }
+
+
+def parse_member(task):
+    """Parse one member of an archive; runs in a worker process."""
+    archive_path, name = task
+    if archive_path not in _archives:
+        _archives[archive_path] = zipfile.ZipFile(archive_path)
+    try:
+        with _archives[archive_path].open(name) as member:
+            return parse_billstatus(member)
+    except ET.ParseError as e:
+        logger.warning("%s in %s: %s", name, archive_path, e)
+        return None
+
+
+def archive_members(archive_paths):
+    for archive_path in archive_paths:
+        with zipfile.ZipFile(archive_path) as archive:
+            names = [name for name in archive.namelist() if name.endswith(".xml")]
+        for name in names:
+            yield str(archive_path), name
+
+
+def ingest(archive_paths, store, workers=None, batch_size=BATCH_SIZE, report=print):
+    """Parse every BILLSTATUS document in the archives and write it to the store.
+
+    Args:
+        archive_paths (list): Paths of BILLSTATUS zip archives.
+        store (BillStore): The store to write to.
+        workers (int, optional): Number of parser processes, defaults to the CPU count.
+        batch_size (int): Bills per insert transaction.
+        report (callable): Called with progress lines.
+
+    Returns:
+        dict: Counts of bills, records and skipped documents, elapsed seconds and records/sec.
+    """
+    stats = {"bills": 0, "records": 0, "skipped": 0}
+    start = last_report = time.perf_counter()
+    connection = store.connect()
+    try:
+        batch = []
+        with Pool(workers or os.cpu_count()) as pool:
+            for record in pool.imap_unordered(parse_member, archive_members(archive_paths), chunksize=32):
+                if record is None:
+                    stats["skipped"] += 1
+                    continue
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    stats["records"] += store.write_bills(connection, batch)
+                    stats["bills"] += len(batch)
+                    batch = []
+                    if time.perf_counter() - last_report >= REPORT_INTERVAL:
+                        last_report = time.perf_counter()
+                        elapsed = last_report - start
+                        report(f"{stats['bills']} bills, {stats['records']} records, "
+                               f"{stats['records'] / elapsed:,.0f} records/sec")
+        if batch:
+            stats["records"] += store.write_bills(connection, batch)
+            stats["bills"] += len(batch)
+    finally:
+        connection.close()
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    stats["records_per_second"] = round(stats["records"] / stats["seconds"]) if stats["seconds"] else 0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest GovInfo BILLSTATUS zip archives into the local bill store.")
+    parser.add_argument("archives", nargs="+", help="BILLSTATUS zip archives, e.g. BILLSTATUS-118-hr.zip")
+    parser.add_argument("--store", default=STORE_PATH, help="Path of the SQLite bill store")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    stats = ingest(args.archives, BillStore(args.store), args.workers, args.batch_size)
+    print(f"Ingested {stats['bills']} bills ({stats['records']} records, {stats['skipped']} skipped) "
+          f"in {stats['seconds']}s: {stats['records_per_second']:,} records/sec")
+
+    graph = CosponsorGraph.load()
+    if graph.sync(BillStore(args.store)):
+        graph.save()
+        print(f"Co-sponsorship graph: {len(graph.members)} members, {len(graph.targets) // 2} ties")
+    print(f"Pipeline aggregates: {PipelineAggregates(BillStore(args.store)).refresh()} bills recounted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Process pool for CPU-heavy post-processing in the MCP server.
+
+FastMCP runs every session on one asyncio event loop, so parsing a large bill XML
+or aggregating thousands of bills inline stalls every other session. WorkerPool
+runs such stages in worker processes once their payload crosses a size threshold
+and keeps small payloads inline, where a process round trip would cost more than
+it saves.
+
+Submissions are bounded: at most max_workers + max_queued stages are in the pool
+at once and further callers wait on the event loop. If the awaiting MCP request is
+cancelled, a stage that has not started yet is withdrawn from the pool.
+
+run_sync() and loads() serve code running in worker threads, such as cache reads
+and upstream requests issued through asyncio.to_thread. They have a bound of their
+own, and on an event loop thread they always run inline, since waiting there for a
+worker process would stall the loop longer than the work itself.
+
+LoopLagMonitor measures how late the event loop wakes up, to verify the effect,
+and memory_usage reports the resident memory of the process.
+
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import json
+import os
+import resource
+import statistics
+import threading
+import time
+
+OFFLOAD_THRESHOLD = int(os.environ.get("CONGRESS_OFFLOAD_THRESHOLD", 1024 * 1024))  # bytes
+MAX_WORKERS = int(os.environ.get("CONGRESS_OFFLOAD_WORKERS", min(4, os.cpu_count() or 1)))
+MAX_QUEUED = int(os.environ.get("CONGRESS_OFFLOAD_QUEUE", 16))
+
+
+def _on_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class WorkerPool:
+    """ Runs CPU-bound functions in worker processes when their payload is large.
+
+    Usage example:
+    pool = WorkerPool()
+    summary = await pool.run(summarize, items, size=len(items), threshold=5000)
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_queued=MAX_QUEUED, threshold=OFFLOAD_THRESHOLD):
+        self.max_workers = max_workers
+        self.threshold = threshold
+        self._slots = asyncio.Semaphore(max_workers + max_queued)
+        self._sync_slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.stats = {"inline": 0, "offloaded": 0, "cancelled": 0}
+
+    def _get_executor(self):
+        with self._executor_lock:
+            # created on first use so small deployments never start worker processes
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            return self._executor
+
+    def _should_offload(self, size, threshold):
+        return self.max_workers > 0 and size >= (self.threshold if threshold is None else threshold)
+
+    async def run(self, fn, *args, size=0, threshold=None):
+        """Run fn(*args), in a worker process if size is at least the threshold.
+
+        Args:
+            fn (callable): A picklable, module-level function or bound method.
+            size (int): The size of the payload, in bytes unless threshold says otherwise.
+            threshold (int, optional): Overrides the pool threshold, e.g. as an item count.
+
+        Returns:
+            The result of fn(*args).
+        """
+        if not self._should_offload(size, threshold):
+            self.stats["inline"] += 1
+            return fn(*args)
+
+        async with self._slots:
+            future = self._get_executor().submit(fn, *args)
+            self.stats["offloaded"] += 1
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # only stages still waiting in the pool can be withdrawn
+                if future.cancel():
+                    self.stats["cancelled"] += 1
+                raise
+
+    def run_sync(self, fn, *args, size=0, threshold=None):
+        """Like run(), for code running in a worker thread; inline on an event loop thread."""
+        if not self._should_offload(size, threshold) or _on_event_loop():
+            self.stats["inline"] += 1
+            return fn(*args)
+        with self._sync_slots:
+            self.stats["offloaded"] += 1
+            return self._get_executor().submit(fn, *args).result()
+
+    def loads(self, data):
+        """Decode JSON text or bytes, in a worker process if it is large."""
+        return self.run_sync(json.loads, data, size=len(data))
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+class LoopLagMonitor:
+    """ Samples how late the running event loop wakes up from a short sleep.
+
+    Only the samples of the last window seconds are kept.
+
+    Usage example:
+    monitor = LoopLagMonitor()
+    monitor.start()
+    ...
+    print(monitor.summary())
+    """
+
+    def __init__(self, interval=0.01, window=60):
+        self.interval = interval
+        self.samples = deque(maxlen=int(window / interval))
+        self._task = None
+
+    async def _sample(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - start - self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    def reset(self):
+        self.samples.clear()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def summary(self):
+        """Return lag percentiles in milliseconds."""
+        if len(self.samples) < 2:
+            return {"samples": len(self.samples)}
+        lags = sorted(sample * 1000 for sample in self.samples)
+        quantiles = statistics.quantiles(lags, n=100, method="inclusive")
+        return {"samples": len(lags), "p50": round(quantiles[49], 2), "p99": round(quantiles[98], 2),
+                "max": round(lags[-1], 2)}
+
+
+def memory_usage():
+    """Return the current and peak resident memory of this process in MiB."""
+    # ru_maxrss is in KiB on Linux; /proc is only there on Linux too
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        current = peak
+    return {"rssMiB": round(current, 1), "peakRssMiB": round(peak, 1)}
+
+
+worker_pool = WorkerPool()
@@ -0,0 +1,230 @@
+"""
+Before/after diffs of the pages in the removed environmental data tracker.
+
+Each tracker row links archived "before" and "after" snapshots of a federal web
+page. Archived versions never change, so each snapshot is downloaded once and kept
+for good in a content-addressed BlobStore under cache/pages/, with url -> digest
+in index.json.
+
+The visible text of a page (outside script, style, head and similar elements) is
+split into lines at block elements, and links are collected with their anchor
+text. A page's diff is the lines and links of the before snapshot that are missing
+from the after snapshot, counted as multisets, so moved content is not reported.
+
+Snapshots of many rows are fetched concurrently, at most MAX_CONCURRENT_FETCHES at
+a time, and the diffs of large pages run in the worker pool.
+
+"""
+from collections import Counter
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+import asyncio
+import json
+import logging
+import os
+import re
+
+import requests
+
+from blob_store import BlobStore
+from offload import worker_pool
+from tracing import CLIENT, tracer
+
+PAGE_DIR = os.environ.get("CONGRESS_PAGE_DIR", "cache/pages")
+MAX_CONCURRENT_FETCHES = int(os.environ.get("CONGRESS_PAGE_CONCURRENCY", 8))
+FETCH_TIMEOUT = 30
+DIFF_OFFLOAD_BYTES = 256 * 1024  # pages larger than this are diffed in a worker process
+MAX_LINES = 20  # removed lines and links returned per page
+HIDDEN_TAGS = {"script", "style", "noscript", "template", "svg", "head", "iframe", "object"}
+BLOCK_TAGS = {"address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption",
+              "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+              "nav", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul"}
+WHITESPACE = re.compile(r"\s+")
+
+logger = logging.getLogger(__name__)
+
+
+class _VisibleText(HTMLParser):
+    """ Collects the visible text lines and the links of an HTML page. """
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.lines = []
+        self.links = []
+        self._words = []
+        self._hidden = 0
+        self._link = None
+
+    def _flush(self):
+        line = WHITESPACE.sub(" ", "".join(self._words)).strip()
+        if line:
+            self.lines.append(line)
+        self._words = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self._hidden += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        if tag == "a" and not self._hidden:
+            href = dict(attrs).get("href") or ""
+            if href and not href.startswith(("#", "javascript:")):
+                self._link = [urljoin(self.base_url, href), []]
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS:
+            self._hidden = max(0, self._hidden - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        if tag == "a" and self._link is not None:
+            href, words = self._link
+            self.links.append((href, WHITESPACE.sub(" ", "".join(words)).strip()))
+            self._link = None
+
+    def handle_data(self, data):
+        if self._hidden:
+            return
+        self._words.append(data)
+        if self._link is not None:
+            self._link[1].append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def visible_text(html, base_url):
+    """Return the visible text lines and the (href, anchor text) links of a page."""
+    parser = _VisibleText(base_url)
+    parser.feed(html.decode("utf-8", errors="replace") if isinstance(html, bytes) else html)
+    parser.close()
+    return parser.lines, parser.links
+
+
+def _missing(old, new):
+    """Items of old not in new, counting repeats, in their order in old."""
+    remaining = Counter(old) - Counter(new)
+    missing = []
+    for item in old:
+        if remaining[item] > 0:
+            remaining[item] -= 1
+            missing.append(item)
+    return missing
+
+
+def diff_pages(before, after, url, max_lines=MAX_LINES):
+    """Compare the visible text and links of two snapshots of a page.
+
+    Returns:
+        dict: Word counts, and the text lines and links removed, with counts of what was added.
+    """
+    before_lines, before_links = visible_text(before, url)
+    after_lines, after_links = visible_text(after, url)
+    removed_lines = _missing(before_lines, after_lines)
+    removed_links = _missing(before_links, after_links)
+    words_before = sum(len(line.split()) for line in before_lines)
+    words_after = sum(len(line.split()) for line in after_lines)
+    return {
+        "wordsBefore": words_before,
+        "wordsAfter": words_after,
+        "removedWords": sum(len(line.split()) for line in removed_lines),
+        "removedLineCount": len(removed_lines),
+        "addedLineCount": len(_missing(after_lines, before_lines)),
+        "removedText": removed_lines[:max_lines],
+        "removedLinkCount": len(removed_links),
+        "addedLinkCount": len(_missing(after_links, before_links)),
+        "removedLinks": [{"href": href, "text": text} for href, text in removed_links[:max_lines]],
+    }
+
+
+class PageArchive:
+    """ Archived page snapshots, downloaded once and kept permanently.
+
+    Usage example:
+    archive = PageArchive()
+    results = await archive.diff_rows(enumerate(RemovedEnvDataClient.read_and_parse_csv()))
+    """
+
+    def __init__(self, directory=PAGE_DIR):
+        self.directory = Path(directory)
+        self.blobs = BlobStore(self.directory / "blobs")
+        self._session = requests.Session()
+        self._slots = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        self._pending = {}  # url -> task, so a snapshot shared by several rows is fetched once
+        try:
+            self.index = json.loads((self.directory / "index.json").read_text())
+        except FileNotFoundError:
+            self.index = {}
+
+    def _save_index(self, index):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / "index.json.part"
+        tmp_path.write_text(json.dumps(index))
+        os.replace(tmp_path, self.directory / "index.json")
+
+    def _download(self, url):
+        with tracer.span(f"GET {urlparse(url).path}", kind=CLIENT, category="upstream", **{"http.url": url}) as span:
+            response = self._session.get(url, timeout=FETCH_TIMEOUT)
+            span.set("http.status_code", response.status_code)
+        return response.content, response.status_code
+
+    async def fetch(self, url):
+        """Return the body of an archived snapshot and a status code, from disk when stored."""
+        if url not in self._pending:
+            self._pending[url] = asyncio.ensure_future(self._fetch(url))
+            self._pending[url].add_done_callback(lambda _: self._pending.pop(url, None))
+        return await self._pending[url]
+
+    async def _fetch(self, url):
+        digest = self.index.get(url)
+        if digest is not None:
+            body = await asyncio.to_thread(self.blobs.get, digest)
+            if body is not None:
+                return body, 200
+            # the blob is missing or unreadable; download the snapshot again
+            self.index.pop(url, None)
+        async with self._slots:
+            try:
+                body, status = await asyncio.to_thread(self._download, url)
+            except requests.RequestException as e:
+                logger.warning("snapshot %s failed: %s", url, e)
+                return None, 502
+        if status != 200:
+            logger.warning("snapshot %s returned %d", url, status)
+            return None, status
+        self.index[url] = await asyncio.to_thread(self.blobs.put, body)
+        return body, status
+
+    async def diff_row(self, index, row, max_lines=MAX_LINES):
+        """Fetch both snapshots of a tracker row concurrently and diff them."""
+        result = {
+            "row": index,
+            "agency": row.get("Agency"),
+            "pageName": row.get("Page Name"),
+            "url": row.get("URL"),
+            "description": row.get("Brief Description"),
+        }
+        before_url, after_url = row.get("HTML File - Before"), row.get("HTML File - After")
+        if not before_url or not after_url:
+            return {**result, "error": "The row has no before and after snapshots."}
+        (before, before_status), (after, after_status) = await asyncio.gather(
+            self.fetch(before_url), self.fetch(after_url))
+        if before is None or after is None:
+            return {**result, "error": f"Snapshot requests returned {before_status} and {after_status}."}
+        diff = await worker_pool.run(diff_pages, before, after, row.get("URL") or before_url, max_lines,
+                                     size=len(before) + len(after), threshold=DIFF_OFFLOAD_BYTES)
+        return {**result, **diff}
+
+    async def diff_rows(self, rows, max_lines=MAX_LINES):
+        """Diff many (index, row) pairs in one batch; fetches are bounded by MAX_CONCURRENT_FETCHES."""
+        try:
+            return await asyncio.gather(*(self.diff_row(index, row, max_lines) for index, row in rows))
+        finally:
+            # a copy, since fetches on the event loop keep adding to the index
+            await asyncio.to_thread(self._save_index, dict(self.index))
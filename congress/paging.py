@@ -0,0 +1,73 @@
+"""
+Concurrent pagination over Congress.gov list endpoints.
+
+List endpoints return at most 250 items per request along with a
+pagination.count of the total. The first page is fetched to learn the count,
+then every remaining page is requested concurrently. Requests are made in
+worker threads since the clients are built on requests. When a later page
+fails, the pages that arrived are returned with the status PARTIAL.
+
+"""
+import asyncio
+import logging
+
+PAGE_SIZE = 250
+MAX_CONCURRENT_REQUESTS = 8
+PARTIAL = 206  # returned by fetch_all when some pages after the first failed
+
+logger = logging.getLogger(__name__)
+_request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def list_items(data, items_key):
+    """Return the list stored under items_key, which may be a key or a tuple path of keys."""
+    path = (items_key,) if isinstance(items_key, str) else items_key
+    for key in path:
+        if not isinstance(data, dict):
+            return []
+        data = data.get(key) or {}
+    return data if isinstance(data, list) else []
+
+
+async def fetch(client, endpoint, params=None):
+    """Issue client.get in a worker thread, bounded by MAX_CONCURRENT_REQUESTS."""
+    async with _request_slots:
+        return await asyncio.to_thread(client.get, endpoint, params=params)
+
+
+async def fetch_all(client, endpoint, items_key, params=None, max_items=None):
+    """Fetch every page of a list endpoint concurrently.
+
+    Args:
+        client (CDGClient): The client used for the requests.
+        endpoint (str): The list endpoint, without limit or offset.
+        items_key (str | tuple): Where the list lives in each response.
+        params (dict, optional): Additional query parameters.
+        max_items (int, optional): Stop after this many items.
+
+    Returns:
+        tuple: The combined list of items and the status code of the first page,
+            or PARTIAL if a later page failed and its items are missing.
+    """
+    params = dict(params or {})
+    page_size = min(PAGE_SIZE, max_items) if max_items else PAGE_SIZE
+    data, status = await fetch(client, endpoint, {**params, "limit": page_size, "offset": 0})
+    if status != 200:
+        return None, status
+
+    items = list_items(data, items_key)
+    total = data.get("pagination", {}).get("count", len(items))
+    if max_items:
+        total = min(total, max_items)
+
+    pages = await asyncio.gather(*(
+        fetch(client, endpoint, {**params, "limit": page_size, "offset": offset})
+        for offset in range(page_size, total, page_size)
+    ))
+    for page, page_status in pages:
+        if page_status != 200:
+            logger.warning("%s page returned %d", endpoint, page_status)
+            status = PARTIAL
+            continue
+        items.extend(list_items(page, items_key))
+    return items[:total], status
@@ -0,0 +1,206 @@
+"""
+Materialized legislative pipeline aggregates for the dashboard.
+
+Every bill in the local bill store is classified into a pipeline stage from its
+actions, and counted per congress by stage, and by stage within each origin
+chamber, policy area and week of introduction. Counts live in pipeline_counts in
+the bill store, next to one pipeline_bills row per bill holding the values it was
+counted under.
+
+The bill store logs every bill it writes in its changes table. refresh() applies
+the changes after the last applied seq: each changed bill's old contribution is
+subtracted and its new one added, so keeping the counts current costs time in
+proportion to the bills that changed, not to the congress. Snapshots are built
+once per applied seq and then served from memory.
+
+Only the standard library is used, so the dashboard can import it without the
+server's dependencies.
+
+"""
+from contextlib import closing
+from datetime import date, timedelta
+import logging
+import threading
+
+from bill_store import KEY, BillStore
+
+STAGES = (
+    "Introduced",
+    "In committee",
+    "Reported",
+    "Passed one chamber",
+    "Passed both chambers",
+    "To President",
+    "Became law",
+)
+DIMENSIONS = {"chamber": "byChamber", "policy_area": "byPolicyArea", "week": "byWeek"}
+PIPELINE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pipeline_bills (
+    congress INTEGER, bill_type TEXT, number INTEGER,
+    stage TEXT, chamber TEXT, policy_area TEXT, week TEXT,
+    PRIMARY KEY (congress, bill_type, number)
+);
+CREATE TABLE IF NOT EXISTS pipeline_counts (
+    congress INTEGER, dimension TEXT, value TEXT, stage TEXT, count INTEGER,
+    PRIMARY KEY (congress, dimension, value, stage)
+);
+CREATE TABLE IF NOT EXISTS pipeline_state (name TEXT PRIMARY KEY, value INTEGER);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def bill_stage(actions):
+    """Return the furthest stage reached, from (type, text) rows of a bill's actions."""
+    stage = 0
+    chambers = set()
+    for action_type, text in actions:
+        text = text or ""
+        if action_type == "BecameLaw" or text.startswith(("Became Public Law", "Became Private Law")):
+            stage = max(stage, 6)
+        elif action_type in ("President", "Veto") or text.startswith("Presented to President"):
+            stage = max(stage, 5)
+        elif text.startswith(("Passed/agreed to in House", "Passed House")):
+            chambers.add("House")
+        elif text.startswith(("Passed/agreed to in Senate", "Passed Senate")):
+            chambers.add("Senate")
+        elif text.startswith(("Reported", "Ordered to be Reported")):
+            stage = max(stage, 2)
+        elif text.startswith("Referred to"):
+            stage = max(stage, 1)
+    if chambers:
+        stage = max(stage, 2 + len(chambers))
+    return STAGES[stage]
+
+
+def week_of(introduced_date):
+    """Return the Monday of the week of an ISO date, or "Unknown"."""
+    try:
+        day = date.fromisoformat((introduced_date or "")[:10])
+    except ValueError:
+        return "Unknown"
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+class PipelineAggregates:
+    """ Maintains the pipeline counts and serves snapshots of them.
+
+    Usage example:
+    pipeline = PipelineAggregates()
+    pipeline.refresh()
+    data = pipeline.snapshot(118)
+    """
+
+    def __init__(self, store=None):
+        self.store = store or BillStore()
+        self.version = None
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection = self.store.connect()
+        connection.executescript(PIPELINE_SCHEMA)
+        return connection
+
+    def _count(self, connection, congress, row, delta):
+        stage, *values = row
+        connection.executemany(
+            "INSERT INTO pipeline_counts VALUES (?, ?, ?, ?, ?) ON CONFLICT (congress, dimension, value, stage) "
+            "DO UPDATE SET count = count + excluded.count",
+            [(congress, dimension, value, stage, delta)
+             for dimension, value in zip(("all", *DIMENSIONS), ("", *values))],
+        )
+
+    def refresh(self):
+        """Apply bill store changes since the last refresh.
+
+        Returns:
+            int: The number of bills recounted.
+        """
+        with self._lock, closing(self._connect()) as connection:
+            applied = connection.execute("SELECT value FROM pipeline_state WHERE name = 'seq'").fetchone()
+            applied = applied[0] if applied else 0
+            latest = connection.execute("SELECT MAX(seq) FROM changes").fetchone()[0] or 0
+            if latest > applied:
+                changed = connection.execute(
+                    "SELECT DISTINCT congress, bill_type, number FROM changes WHERE seq > ? AND seq <= ?",
+                    (applied, latest),
+                ).fetchall()
+                with connection:
+                    for key in changed:
+                        self._recount(connection, tuple(key))
+                    connection.execute("INSERT OR REPLACE INTO pipeline_state VALUES ('seq', ?)", (latest,))
+                logger.info("pipeline recounted %d bills up to change %d", len(changed), latest)
+            else:
+                changed = []
+            if self.version != latest:
+                self.version = latest
+                self._snapshots = {}
+            return len(changed)
+
+    def _recount(self, connection, key):
+        congress = key[0]
+        old = connection.execute(
+            f"SELECT stage, chamber, policy_area, week FROM pipeline_bills WHERE {KEY}", key).fetchone()
+        if old:
+            self._count(connection, congress, tuple(old), -1)
+        bill = connection.execute(
+            f"SELECT origin_chamber, policy_area, introduced_date FROM bills WHERE {KEY}", key).fetchone()
+        if bill is None:
+            connection.execute(f"DELETE FROM pipeline_bills WHERE {KEY}", key)
+            return
+        actions = connection.execute(f"SELECT type, text FROM actions WHERE {KEY}", key).fetchall()
+        row = (bill_stage(actions), bill["origin_chamber"] or "Unknown", bill["policy_area"] or "Unspecified",
+               week_of(bill["introduced_date"]))
+        self._count(connection, congress, row, 1)
+        connection.execute("INSERT OR REPLACE INTO pipeline_bills VALUES (?, ?, ?, ?, ?, ?, ?)", key + row)
+
+    def congresses(self):
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT congress FROM pipeline_counts WHERE count > 0 ORDER BY congress DESC").fetchall()
+        return [row[0] for row in rows]
+
+    def snapshot(self, congress=None):
+        """Return the aggregates of a congress, the latest one by default, built once per version.
+
+        Returns:
+            dict: Totals by stage, and per chamber, policy area and week with counts by stage
+                and each value's share of the largest total, for drawing bars.
+        """
+        requested = congress
+        cached = self._snapshots.get(requested)
+        if cached is not None:
+            return cached
+        if congress is None:
+            congresses = self.congresses()
+            congress = congresses[0] if congresses else None
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT dimension, value, stage, count FROM pipeline_counts WHERE congress = ? AND count > 0",
+                (congress,),
+            ).fetchall()
+        groups = {dimension: {} for dimension in ("all", *DIMENSIONS)}
+        for dimension, value, stage, count in rows:
+            groups[dimension].setdefault(value, dict.fromkeys(STAGES, 0))[stage] = count
+        stages = groups["all"].get("", dict.fromkeys(STAGES, 0))
+        snapshot = {
+            "congress": congress,
+            "version": self.version,
+            "stages": STAGES,
+            "total": sum(stages.values()),
+            "byStage": stages,
+        }
+        for dimension, name in DIMENSIONS.items():
+            values = [{"value": value, "total": sum(counts.values()), "stages": counts}
+                      for value, counts in groups[dimension].items()]
+            if dimension == "week":
+                values.sort(key=lambda item: item["value"])
+            else:
+                values.sort(key=lambda item: -item["total"])
+            largest = max((item["total"] for item in values), default=0)
+            for item in values:
+                item["share"] = round(100 * item["total"] / largest, 1) if largest else 0
+            snapshot[name] = values
+        self._snapshots[congress] = self._snapshots[requested] = snapshot
+        return snapshot
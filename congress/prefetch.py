@@ -0,0 +1,131 @@
+"""
+Predictive prefetch of bill lookups that usually follow a bill list.
+
+After get_bills or get_committee_bills returns, the agent almost always asks for the
+details and actions of a few of the listed bills. The Prefetcher warms the response
+cache with those lookups for the first top_n bills of each list, one request at a
+time in a background thread and within a per-minute request budget, so the
+follow-up tool calls are served from cache.
+
+Hits are counted when a tool requests an endpoint that was prefetched, so the hit
+rate can be used to tune top_n or turn prefetching off.
+
+"""
+from urllib.parse import urljoin
+import logging
+import queue
+import threading
+import time
+
+DEFAULT_BUDGET = 30  # requests per minute
+QUEUE_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+
+def bill_endpoints(items, top_n):
+    """Return the detail and action endpoints for the first top_n bills of a list."""
+    endpoints = []
+    for item in items[:top_n]:
+        bill_type = item.get("type") or item.get("billType")
+        if not (item.get("congress") and bill_type and item.get("number")):
+            continue
+        url = f"bill/{item['congress']}/{bill_type.lower()}/{item['number']}"
+        endpoints += [url, f"{url}/actions"]
+    return endpoints
+
+
+class Prefetcher:
+    """ Warms a response cache in the background, within a request budget.
+
+    Usage example:
+    prefetcher = Prefetcher(lambda: CDGClient(cache=cache), cache, top_n=5)
+    prefetcher.schedule(bill_endpoints(data["bills"], prefetcher.top_n))
+    ...
+    prefetcher.record_request("bill/118/hr/1234")  # in the follow-up tool
+    """
+
+    def __init__(self, client_factory, cache, top_n, budget=DEFAULT_BUDGET):
+        self.client_factory = client_factory
+        self.cache = cache
+        self.top_n = top_n
+        self.budget = budget
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._prefetched = set()
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+        self._worker = None
+        self.stats = {"scheduled": 0, "prefetched": 0, "alreadyCached": 0, "overBudget": 0,
+                      "dropped": 0, "failed": 0, "hits": 0}
+
+    @property
+    def enabled(self):
+        return self.top_n > 0
+
+    def schedule(self, endpoints):
+        """Queue endpoints for prefetching, dropping them if the queue is full."""
+        if not self.enabled:
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="prefetcher", daemon=True)
+            self._worker.start()
+        for endpoint in endpoints:
+            try:
+                self._queue.put_nowait(endpoint)
+                self.stats["scheduled"] += 1
+            except queue.Full:
+                self.stats["dropped"] += 1
+
+    def record_request(self, endpoint):
+        """Count a hit if a tool requests an endpoint that was prefetched."""
+        with self._lock:
+            if endpoint in self._prefetched:
+                self._prefetched.discard(endpoint)
+                self.stats["hits"] += 1
+
+    def _within_budget(self):
+        now = time.monotonic()
+        if now - self._window_start >= 60:
+            self._window_start = now
+            self._window_requests = 0
+        if self._window_requests >= self.budget:
+            return False
+        self._window_requests += 1
+        return True
+
+    def _prefetch(self, endpoint):
+        client = self.client_factory()
+        key = self.cache.make_key(urljoin(client.base_url, endpoint))
+        if self.cache.get(key) is not None:
+            self.stats["alreadyCached"] += 1
+            return
+        if not self._within_budget():
+            self.stats["overBudget"] += 1
+            return
+        _, status = client.get(endpoint)
+        if status != 200:
+            self.stats["failed"] += 1
+            return
+        with self._lock:
+            self._prefetched.add(endpoint)
+        self.stats["prefetched"] += 1
+
+    def _run(self):
+        while True:
+            endpoint = self._queue.get()
+            try:
+                self._prefetch(endpoint)
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.warning("prefetch of %s failed: %s", endpoint, e)
+
+    def summary(self):
+        prefetched = self.stats["prefetched"]
+        return {
+            "enabled": self.enabled,
+            "topN": self.top_n,
+            "budgetPerMinute": self.budget,
+            **self.stats,
+            "hitRate": round(self.stats["hits"] / prefetched, 3) if prefetched else None,
+        }
@@ -0,0 +1,225 @@
+"""
+Compact typed records for bills, members and committees.
+
+List responses from Congress.gov are nested dicts with a URL, an update timestamp
+and repeated strings on every item. Holding a delegation's or a congress's worth
+of them costs many times the useful data. These records keep only the fields the
+tools use, in __slots__ classes:
+
+- repeated values (bill type, chamber, party, state, policy area, action text,
+  bioguide ids) are interned, so every record shares one string object
+- dates are proleptic Gregorian ordinals (date.toordinal()), 0 when absent
+- URLs are rebuilt from the identifying fields instead of stored
+
+from_api() converts a list item, to_dict() produces the compact tool output.
+
+"""
+from datetime import date
+import sys
+
+API_URL = "https://api.congress.gov/v3"
+
+
+def interned(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def to_ordinal(value):
+    """Return the ordinal of an ISO date or timestamp, or 0."""
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def from_ordinal(value):
+    return date.fromordinal(value).isoformat() if value else None
+
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class Bill:
+    """ A bill, resolution or amendment from a bill or legislation list.
+
+    Usage example:
+    bills = [Bill.from_api(item) for item in data["sponsoredLegislation"]]
+    bills[0].key, bills[0].to_dict()
+    """
+
+    __slots__ = ("congress", "type", "number", "amendment", "title", "policy_area",
+                 "introduced", "action_date", "action_text")
+
+    def __init__(self, congress, type, number, amendment=False, title=None, policy_area=None,
+                 introduced=0, action_date=0, action_text=None):
+        self.congress = congress
+        self.type = type
+        self.number = number
+        self.amendment = amendment
+        self.title = title
+        self.policy_area = policy_area
+        self.introduced = introduced
+        self.action_date = action_date
+        self.action_text = action_text
+
+    @classmethod
+    def from_api(cls, item):
+        latest_action = item.get("latestAction") or {}
+        amendment = bool(item.get("amendmentNumber"))
+        if amendment:
+            # amendment items carry their type only in the URL, e.g. .../amendment/118/samdt/12
+            parts = (item.get("url") or "").split("?")[0].rstrip("/").split("/")
+            bill_type = parts[-2] if len(parts) > 2 else None
+            number = item["amendmentNumber"]
+        else:
+            bill_type, number = item.get("type"), item.get("number")
+        return cls(
+            _int(item.get("congress")),
+            interned(bill_type.upper() if bill_type else None),
+            _int(number),
+            amendment,
+            item.get("title"),
+            interned((item.get("policyArea") or {}).get("name")),
+            to_ordinal(item.get("introducedDate")),
+            to_ordinal(latest_action.get("actionDate")),
+            interned(latest_action.get("text")),
+        )
+
+    @property
+    def key(self):
+        """A stable identifier such as "118-HR-1234", or "118-AMDT-12" for an amendment."""
+        if self.amendment:
+            return f"{self.congress}-AMDT-{self.number}"
+        return f"{self.congress}-{self.type}-{self.number}"
+
+    @property
+    def url(self):
+        if self.type is None:
+            return None
+        resource = "amendment" if self.amendment else "bill"
+        return f"{API_URL}/{resource}/{self.congress}/{self.type.lower()}/{self.number}?format=json"
+
+    @property
+    def latest_action(self):
+        if not self.action_date and not self.action_text:
+            return None
+        return {"actionDate": from_ordinal(self.action_date), "text": self.action_text}
+
+    def to_dict(self):
+        return {
+            "bill": self.key,
+            "title": self.title,
+            "policyArea": self.policy_area,
+            "introducedDate": from_ordinal(self.introduced),
+            "latestAction": self.latest_action,
+            "url": self.url,
+        }
+
+    def __repr__(self):
+        return f"Bill({self.key})"
+
+
+class Member:
+    """ A member of Congress from a member list, with their latest term.
+
+    Usage example:
+    members = [Member.from_api(item) for item in data["members"]]
+    """
+
+    __slots__ = ("bioguide_id", "name", "party", "state", "district", "chamber", "start_year", "end_year")
+
+    def __init__(self, bioguide_id, name, party=None, state=None, district=0, chamber=None,
+                 start_year=0, end_year=0):
+        self.bioguide_id = bioguide_id
+        self.name = name
+        self.party = party
+        self.state = state
+        self.district = district
+        self.chamber = chamber
+        self.start_year = start_year
+        self.end_year = end_year
+
+    @classmethod
+    def from_api(cls, item):
+        terms = item.get("terms") or {}
+        terms = terms.get("item", []) if isinstance(terms, dict) else terms
+        latest = max(terms, key=lambda term: term.get("startYear") or 0, default={})
+        return cls(
+            interned(item.get("bioguideId")),
+            item.get("name") or item.get("directOrderName"),
+            interned(item.get("partyName")),
+            interned(item.get("state")),
+            _int(item.get("district")),
+            interned(latest.get("chamber")),
+            _int(latest.get("startYear")),
+            _int(latest.get("endYear")),
+        )
+
+    @property
+    def url(self):
+        return f"{API_URL}/member/{self.bioguide_id}?format=json"
+
+    def to_dict(self):
+        return {
+            "bioguideId": self.bioguide_id,
+            "name": self.name,
+            "party": self.party,
+            "state": self.state,
+            "district": self.district or None,
+            "chamber": self.chamber,
+            "startYear": self.start_year or None,
+            "endYear": self.end_year or None,
+        }
+
+    def __repr__(self):
+        return f"Member({self.bioguide_id})"
+
+
+class Committee:
+    """ A committee or subcommittee from a committee list.
+
+    Usage example:
+    committees = [Committee.from_api(item) for item in data["committees"]]
+    """
+
+    __slots__ = ("system_code", "name", "chamber", "committee_type", "parent_code", "subcommittees")
+
+    def __init__(self, system_code, name, chamber=None, committee_type=None, parent_code=None, subcommittees=()):
+        self.system_code = system_code
+        self.name = name
+        self.chamber = chamber
+        self.committee_type = committee_type
+        self.parent_code = parent_code
+        self.subcommittees = subcommittees
+
+    @classmethod
+    def from_api(cls, item):
+        return cls(
+            interned(item.get("systemCode")),
+            item.get("name"),
+            interned(item.get("chamber")),
+            interned(item.get("committeeTypeCode") or item.get("type")),
+            interned((item.get("parent") or {}).get("systemCode")),
+            tuple(interned(sub.get("systemCode")) for sub in item.get("subcommittees") or ()),
+        )
+
+    @property
+    def url(self):
+        return f"{API_URL}/committee/{(self.chamber or '').lower()}/{self.system_code}?format=json"
+
+    def to_dict(self):
+        return {
+            "systemCode": self.system_code,
+            "name": self.name,
+            "chamber": self.chamber,
+            "committeeTypeCode": self.committee_type,
+            "parent": self.parent_code,
+            "subcommittees": list(self.subcommittees),
+        }
+
+    def __repr__(self):
+        return f"Committee({self.system_code})"
@@ -0,0 +1,237 @@
+"""
+Snapshot bundles of cached upstream data, for air-gapped and offline operation.
+
+A bundle is a single versioned file holding every cached response from cache/http/
+(Congress.gov, FRED and Treasury) and the local stores the tools read besides it:
+the bill texts, the bill store, the Treasury tables, the page archive, the bill
+text index and the cosponsor graph (see bundled_stores):
+
+    MAGIC | format (u16) | header length (u32) | header JSON | payloads
+
+The header maps each cache key or file path to the offset and length of its
+zlib-compressed payload, so entries can be read individually from a memory map.
+In offline mode the stores missing locally are unpacked from the bundle on startup.
+
+Usage:
+    python congress/snapshot.py export snapshot.cgsnap
+    python congress/snapshot.py import snapshot.cgsnap
+    python congress/snapshot.py info snapshot.cgsnap
+
+Set CONGRESS_OFFLINE_BUNDLE=snapshot.cgsnap to run the MCP server from a bundle
+with no network calls.
+
+"""
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import logging
+import mmap
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import zlib
+
+from bill_store import STORE_PATH
+from bill_text import TEXT_DIR
+from cache import CACHE_DIR, ResponseCache, family
+from cosponsor_graph import GRAPH_PATH
+from dts_store import DTS_DIR, DTS_TABLES
+from page_diff import PAGE_DIR
+from text_index import INDEX_PATH
+
+MAGIC = b"CGSNAP"
+# 2 added the stores besides bill texts; format 1 bundles hold only bill_text/ files
+BUNDLE_FORMAT = 2
+READABLE_FORMATS = (1, 2)
+BILL_TEXT = "bill_text"
+PREFIX = struct.Struct(">HI")
+OFFLINE_STATUS = 404
+
+logger = logging.getLogger(__name__)
+
+
+def bundled_stores():
+    """Return {name in the bundle: local file or directory} of the stores bundled with the responses."""
+    stores = {
+        BILL_TEXT: Path(TEXT_DIR),
+        "bills.sqlite": Path(STORE_PATH),
+        "pages": Path(PAGE_DIR),
+        "index/bill_text.idx": Path(INDEX_PATH),
+        "index/cosponsor_graph.pkl": Path(GRAPH_PATH),
+    }
+    stores.update({f"dts/{name}": Path(DTS_DIR) / name for name in DTS_TABLES})
+    return stores
+
+
+def _store_files(name, path):
+    """Yield (name in the bundle, contents) of the files of one store."""
+    if path.suffix == ".sqlite":
+        if path.exists():
+            # a consistent copy, including pages still in the write-ahead log
+            with closing(sqlite3.connect(path)) as connection:
+                yield name, connection.serialize()
+    elif path.is_dir():
+        for file_path in sorted(path.rglob("*")):
+            if file_path.is_file() and not file_path.name.endswith(".part"):
+                yield f"{name}/{file_path.relative_to(path).as_posix()}", file_path.read_bytes()
+    elif path.is_file():
+        yield name, path.read_bytes()
+
+
+def export_bundle(path, cache_dir=CACHE_DIR, stores=None):
+    """Write every cached response and the bundled stores to a bundle at path.
+
+    The bundle is assembled in a temporary file and moved into place, so readers
+    never see a partial bundle.
+
+    Returns:
+        dict: The bundle header without the entry tables.
+    """
+    path = Path(path)
+    header = {"format": BUNDLE_FORMAT, "created": datetime.now(timezone.utc).isoformat(),
+              "families": {}, "http": {}, "files": {}}
+    offset = 0
+    with tempfile.TemporaryFile(dir=path.parent) as payloads:
+        for key, stored_at, body in ResponseCache(cache_dir).entries():
+            data = zlib.compress(json.dumps(body).encode("utf-8"))
+            payloads.write(data)
+            header["http"][key] = [offset, len(data), stored_at]
+            header["families"][family(key)] = header["families"].get(family(key), 0) + 1
+            offset += len(data)
+        for name, store_path in (stores or bundled_stores()).items():
+            for file_name, contents in _store_files(name, store_path):
+                data = zlib.compress(contents)
+                payloads.write(data)
+                header["files"][file_name] = [offset, len(data)]
+                offset += len(data)
+
+        encoded = json.dumps(header).encode("utf-8")
+        tmp_path = path.with_name(f"{path.name}.part")
+        with open(tmp_path, "wb") as out:
+            out.write(MAGIC + PREFIX.pack(BUNDLE_FORMAT, len(encoded)) + encoded)
+            payloads.seek(0)
+            shutil.copyfileobj(payloads, out)
+        os.replace(tmp_path, path)
+    return {name: value for name, value in header.items() if name not in ("http", "files")}
+
+
+class OfflineBundle:
+    """ A read-only, memory-mapped bundle used in place of a ResponseCache.
+
+    Every lookup is answered from the bundle and fetch() is never called, so
+    clients given an OfflineBundle make no network requests.
+
+    Usage example:
+    bundle = OfflineBundle("snapshot.cgsnap")
+    client = CDGClient(cache=bundle)
+    data, status = client.get("bill/118")
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot bundle")
+        bundle_format, header_length = PREFIX.unpack_from(self._map, len(MAGIC))
+        if bundle_format not in READABLE_FORMATS:
+            raise ValueError(f"{path} has unsupported bundle format {bundle_format}")
+        start = len(MAGIC) + PREFIX.size
+        self.header = json.loads(self._map[start:start + header_length])
+        self._payload_start = start + header_length
+
+    make_key = staticmethod(ResponseCache.make_key)
+
+    def _read(self, offset, length):
+        start = self._payload_start + offset
+        return zlib.decompress(self._map[start:start + length])
+
+    def get_entry(self, key):
+        entry = self.header["http"].get(key)
+        if entry is None:
+            return None
+        offset, length, stored_at = entry
+        return json.loads(self._read(offset, length)), 0
+
+    def get(self, key, ttl=None):
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_or_fetch(self, key, fetch, ttl=None):
+        body = self.get(key)
+        if body is None:
+            logger.info("offline miss %s", key)
+            return {"error": "Not available in the offline snapshot."}, OFFLINE_STATUS
+        return body, 200
+
+    def set(self, key, body, stored_at=None):
+        """Bundles are read-only; responses are never stored."""
+
+    def http_entries(self):
+        """Yield (key, stored_at, body) for every response in the bundle."""
+        for key, (offset, length, stored_at) in self.header["http"].items():
+            yield key, stored_at, json.loads(self._read(offset, length))
+
+    def extract_files(self, stores=None, overwrite=True):
+        """Write the bundled store files to the local stores.
+
+        Without overwrite, bill texts are written where missing, and every other
+        store only if it does not exist locally, so its files stay consistent.
+
+        Returns:
+            int: The number of files written.
+        """
+        stores = stores or bundled_stores()
+        present = set() if overwrite else {store for store, path in stores.items() if path.exists()}
+        written = 0
+        # bill text index files last, since their presence marks a complete bill text
+        for name in sorted(self.header["files"], key=lambda name: name.endswith(".index.json")):
+            store = next((store for store in stores if name == store or name.startswith(f"{store}/")), None)
+            if store is None:
+                logger.info("skipping unknown bundle file %s", name)
+                continue
+            target = stores[store] / name[len(store) + 1:] if name != store else stores[store]
+            if store in present and (store != BILL_TEXT or target.exists()):
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            offset, length = self.header["files"][name]
+            tmp_path = target.with_name(f"{target.name}.part")
+            tmp_path.write_bytes(self._read(offset, length))
+            os.replace(tmp_path, target)
+            written += 1
+        return written
+
+
+def import_bundle(path, cache_dir=CACHE_DIR, stores=None):
+    """Unpack a bundle into the response cache and the local stores."""
+    bundle = OfflineBundle(path)
+    cache = ResponseCache(cache_dir)
+    for key, stored_at, body in bundle.http_entries():
+        cache.set(key, body, stored_at)
+    return len(bundle.header["http"]), bundle.extract_files(stores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import a snapshot bundle of cached upstream data.")
+    parser.add_argument("command", choices=["export", "import", "info"])
+    parser.add_argument("bundle", help="Path of the bundle file")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        header = export_bundle(args.bundle)
+        print(f"Exported {sum(header['families'].values())} responses to {args.bundle}: {header['families']}")
+    elif args.command == "import":
+        responses, files = import_bundle(args.bundle)
+        print(f"Imported {responses} responses and {files} store files from {args.bundle}")
+    else:
+        header = OfflineBundle(args.bundle).header
+        print(json.dumps({"format": header["format"], "created": header["created"],
+                          "families": header["families"], "files": len(header["files"])}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
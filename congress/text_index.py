@@ -0,0 +1,235 @@
+"""
+Positional inverted index over locally stored bill texts and summaries.
+
+Documents are bill text versions from bill_text.BillTextStore and bill summaries
+fetched through get_bill_summaries. Queries are ranked with BM25; words in double
+quotes must appear as a phrase. Snippet offsets are byte offsets into the stored
+document, so they can be passed to get_bill_text_sections as offset.
+
+Only the latest version of a bill's text is kept in the index: adding a later
+version removes the earlier one, and an earlier version never replaces a later one.
+
+The index is pickled to cache/index/bill_text.idx, postings as compact arrays, so
+it opens quickly on server start.
+
+"""
+from array import array
+from pathlib import Path
+import html
+import logging
+import math
+import os
+import pickle
+import re
+import threading
+
+INDEX_PATH = os.environ.get("CONGRESS_TEXT_INDEX", "cache/index/bill_text.idx")
+INDEX_FORMAT = 1
+TOKEN_PATTERN = re.compile(rb"[a-z0-9]+")
+QUERY_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+TAG_PATTERN = re.compile(r"<[^>]+>")
+K1 = 1.2
+B = 0.75
+SNIPPET_BYTES = 160
+# later stages of a bill's text replace earlier ones in the index
+VERSION_RANK = {
+    "ih": 1, "is": 1, "rfh": 2, "rfs": 2, "rh": 3, "rs": 3, "rch": 3, "rcs": 3, "pch": 3, "pcs": 3,
+    "eh": 4, "es": 4, "eah": 5, "eas": 5, "enr": 6,
+}
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(data):
+    """Yield (term, byte_offset) for each token of a UTF-8 byte string."""
+    for match in TOKEN_PATTERN.finditer(data.lower()):
+        yield match.group().decode("ascii"), match.start()
+
+
+def summary_text(summaries_data):
+    """Return the plain text of every summary in a bill/.../summaries response."""
+    texts = [
+        html.unescape(TAG_PATTERN.sub(" ", summary.get("text") or ""))
+        for summary in summaries_data.get("summaries", [])
+    ]
+    return "\n\n".join(" ".join(text.split()) for text in texts if text.strip())
+
+
+class TextIndex:
+    """ BM25-ranked positional index, keyed by document id.
+
+    Usage example:
+    index = TextIndex.load()
+    index.add("118-hr1234-ih", text_bytes, bill="118-hr1234", kind="text", congress=118, version="ih")
+    index.save()
+    results = index.search('"per- and polyfluoroalkyl" PFAS', congress=118)
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = Path(path)
+        self.docs = {}
+        self.postings = {}
+        self.total_length = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        index = cls(path)
+        try:
+            with open(index.path, "rb") as file:
+                state = pickle.load(file)
+        except FileNotFoundError:
+            return index
+        if state.get("format") != INDEX_FORMAT:
+            logger.warning("ignoring index %s with format %s", path, state.get("format"))
+            return index
+        index.docs, index.postings = state["docs"], state["postings"]
+        index.total_length = sum(doc["length"] for doc in index.docs.values())
+        return index
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".part")
+        # copy the dicts add() and remove() change, then pickle without holding the lock;
+        # the arrays and doc entries themselves are never modified once indexed
+        with self._lock:
+            docs = dict(self.docs)
+            postings = {term: dict(term_postings) for term, term_postings in self.postings.items()}
+        with open(tmp_path, "wb") as file:
+            pickle.dump({"format": INDEX_FORMAT, "docs": docs, "postings": postings},
+                        file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def add(self, doc_id, data, bill, kind, congress=None, version=None, keep_text=False):
+        """Index a document, replacing any earlier version of the same bill and kind.
+
+        Args:
+            doc_id (str): The document id, e.g. a bill_text document id.
+            data (bytes): The UTF-8 document text.
+            bill (str): The bill the document belongs to, e.g. "118-hr1234".
+            kind (str): "text" or "summary".
+            congress (int, optional): The congress of the bill, for filtering.
+            version (str, optional): The text version code, e.g. "ih".
+            keep_text (bool): Keep the text in the index for snippets; used for summaries,
+                which are not stored anywhere else.
+
+        Returns:
+            bool: False if a later version of the bill is already indexed, or the document
+                is indexed with the same kept text; the index is unchanged then.
+        """
+        with self._lock:
+            if keep_text and doc_id in self.docs and self.docs[doc_id]["text"] == data:
+                return False
+
+        # tokenized outside the lock, so searches are not held up by a large text
+        positions = {}
+        offsets = array("I")
+        for position, (term, offset) in enumerate(tokenize(data)):
+            positions.setdefault(term, array("I")).append(position)
+            offsets.append(offset)
+
+        with self._lock:
+            for other_id, other in list(self.docs.items()):
+                if other["bill"] != bill or other["kind"] != kind or other_id == doc_id:
+                    continue
+                if VERSION_RANK.get(other["version"], 0) > VERSION_RANK.get(version, 0):
+                    return False
+                self._remove(other_id)
+            self._remove(doc_id)
+            for term, term_positions in positions.items():
+                self.postings.setdefault(term, {})[doc_id] = term_positions
+            self.docs[doc_id] = {
+                "bill": bill, "kind": kind, "congress": congress, "version": version,
+                "length": len(offsets), "offsets": offsets, "terms": list(positions),
+                "text": data if keep_text else None,
+            }
+            self.total_length += len(offsets)
+            return True
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in doc["terms"]:
+            term_postings = self.postings.get(term, {})
+            term_postings.pop(doc_id, None)
+            if not term_postings:
+                self.postings.pop(term, None)
+        self.total_length -= doc["length"]
+
+    def _phrase_positions(self, terms):
+        """Return {doc_id: [start positions]} for documents containing terms as a phrase."""
+        term_postings = [self.postings.get(term, {}) for term in terms]
+        if not all(term_postings):
+            return {}
+        matches = {}
+        for doc_id in set.intersection(*(set(postings) for postings in term_postings)):
+            following = [set(postings[doc_id]) for postings in term_postings[1:]]
+            starts = [
+                start for start in term_postings[0][doc_id]
+                if all(start + i + 1 in positions for i, positions in enumerate(following))
+            ]
+            if starts:
+                matches[doc_id] = starts
+        return matches
+
+    def search(self, query, congress=None, limit=10, snippets=3):
+        """Rank documents against a query.
+
+        Returns:
+            list: Up to limit results with bill, document, score and snippets. Each snippet has
+                the byte offset of the match and of a window of SNIPPET_BYTES around it.
+        """
+        clauses = []
+        for phrase, word in QUERY_PATTERN.findall(query):
+            terms = [term for term, _ in tokenize((phrase or word).encode("utf-8"))]
+            if terms:
+                clauses.append((terms, bool(phrase)))
+        if not clauses or not self.docs:
+            return []
+
+        with self._lock:
+            doc_count = len(self.docs)
+            average_length = self.total_length / doc_count or 1
+            scores = {}
+            hits = {}
+            required = None
+            for terms, quoted in clauses:
+                if len(terms) > 1:
+                    matches = self._phrase_positions(terms)
+                else:
+                    matches = self.postings.get(terms[0], {})
+                if quoted:
+                    required = set(matches) if required is None else required & set(matches)
+                idf = math.log(1 + (doc_count - len(matches) + 0.5) / (len(matches) + 0.5))
+                for doc_id, starts in matches.items():
+                    doc = self.docs[doc_id]
+                    if congress and doc["congress"] != congress:
+                        continue
+                    frequency = len(starts)
+                    norm = K1 * (1 - B + B * doc["length"] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+                    hits.setdefault(doc_id, []).extend(starts[:snippets])
+
+            ranked = sorted(
+                (doc_id for doc_id in scores if required is None or doc_id in required),
+                key=scores.get, reverse=True,
+            )[:limit]
+            return [self._result(doc_id, scores[doc_id], sorted(hits[doc_id])[:snippets]) for doc_id in ranked]
+
+    def _result(self, doc_id, score, hits):
+        doc = self.docs[doc_id]
+        snippets = []
+        for position in hits:
+            match = doc["offsets"][position]
+            start = max(0, match - SNIPPET_BYTES // 2)
+            snippet = {"match": match, "offset": start, "length": SNIPPET_BYTES}
+            if doc["text"] is not None:
+                snippet["text"] = doc["text"][start:start + SNIPPET_BYTES].decode("utf-8", errors="ignore")
+            snippets.append(snippet)
+        return {"bill": doc["bill"], "document": doc_id, "kind": doc["kind"], "version": doc["version"],
+                "score": round(score, 4), "snippets": snippets}
@@ -0,0 +1,285 @@
+"""
+Latency tracing across client.py, the MCP session and the upstream APIs.
+
+Set CONGRESS_TRACE_FILE (e.g. cache/traces/spans.jsonl) to append spans to a
+file, one OTLP/JSON ExportTraceServiceRequest per line, the format of the
+OpenTelemetry collector's file exporter, so the file can be loaded by any OTLP
+tooling. The client and the server process append to the same file, which is
+rotated to <file>.1 once it exceeds CONGRESS_TRACE_MAX_BYTES. Tool call
+arguments are only recorded with CONGRESS_TRACE_ARGUMENTS=1.
+
+A tracer created with keep=True also holds its finished spans in memory until
+pop_trace(), which the client uses to summarize each query without reading the
+file back.
+
+The current span is tracked in a context variable, so it follows asyncio tasks and
+asyncio.to_thread. Between processes, the client sends a W3C traceparent in the
+_meta of each tools/call request and the server continues the trace from it.
+
+This module only uses the standard library, so client.py can import it as
+congress.tracing.
+
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+
+TRACE_FILE = os.environ.get("CONGRESS_TRACE_FILE", "")
+TRACE_MAX_BYTES = int(os.environ.get("CONGRESS_TRACE_MAX_BYTES", 64 * 1024 * 1024))
+TRACE_ARGUMENTS = os.environ.get("CONGRESS_TRACE_ARGUMENTS", "") == "1"
+# OTLP span kinds and status codes
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_ERROR = 2
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value):
+    """Return (trace_id, span_id) from a W3C traceparent header, or None."""
+    parts = (value or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """ A timed operation; use Tracer.span() to create one. """
+
+    def __init__(self, name, kind, trace_id, parent_id, attributes):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error = None
+        self.start = time.time_ns()
+        self.end = None
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [{"key": key, "value": _attribute_value(value)}
+                           for key, value in self.attributes.items() if value is not None],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+    def to_dict(self, service):
+        """Return the span in the plain form of read_trace()."""
+        return {
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "service": service,
+            "start": self.start,
+            "end": self.end,
+            "attributes": {key: value for key, value in self.attributes.items() if value is not None},
+            "error": self.error,
+        }
+
+
+class Tracer:
+    """ Records spans of one service to the trace file, and in memory if keep is set.
+
+    Usage example:
+    tracer = Tracer("mcp-client", keep=True)
+    with tracer.span("query", category="query") as span:
+        ...
+    print(summarize_trace(span.trace_id, tracer.pop_trace(span.trace_id)))
+    """
+
+    def __init__(self, service, path=TRACE_FILE, keep=False, max_bytes=TRACE_MAX_BYTES):
+        self.service = service
+        self.path = Path(path) if path else None
+        self.keep = keep
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._kept = defaultdict(list)
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    @staticmethod
+    def current():
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name, kind=INTERNAL, traceparent=None, **attributes):
+        """Time the enclosed block as a child of the current span, or of traceparent if given.
+
+        Yields:
+            Span: The span; it is only written out when tracing is enabled.
+        """
+        parent = parse_traceparent(traceparent)
+        if parent is None and _current_span.get() is not None:
+            parent = _current_span.get().trace_id, _current_span.get().span_id
+        trace_id, parent_id = parent or (secrets.token_hex(16), None)
+        span = Span(name, kind, trace_id, parent_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end = time.time_ns()
+            if self.keep:
+                with self._lock:
+                    self._kept[span.trace_id].append(span.to_dict(self.service))
+            if self.enabled:
+                self._export(span)
+
+    def pop_trace(self, trace_id):
+        """Return and forget the spans of a trace kept in memory."""
+        with self._lock:
+            return self._kept.pop(trace_id, [])
+
+    def _export(self, span):
+        line = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service}}]},
+            "scopeSpans": [{"scope": {"name": "congressgov"}, "spans": [span.to_otlp()]}],
+        }]})
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+
+    def _rotate(self):
+        stat = os.fstat(self._file.fileno())
+        self._file.close()
+        self._file = None
+        try:
+            # the other process may have rotated the file already; then only reopen it
+            if os.path.samestat(stat, os.stat(self.path)):
+                os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+        except FileNotFoundError:
+            pass
+
+
+def read_trace(trace_id, path=TRACE_FILE):
+    """Return the spans of one trace from the trace file as plain dicts."""
+    spans = []
+    if not path:
+        return spans
+    try:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if trace_id not in line:
+                    continue
+                for resource_spans in json.loads(line)["resourceSpans"]:
+                    service = resource_spans["resource"]["attributes"][0]["value"]["stringValue"]
+                    for scope_spans in resource_spans["scopeSpans"]:
+                        for span in scope_spans["spans"]:
+                            if span["traceId"] != trace_id:
+                                continue
+                            spans.append({
+                                "id": span["spanId"],
+                                "parent": span.get("parentSpanId"),
+                                "name": span["name"],
+                                "service": service,
+                                "start": int(span["startTimeUnixNano"]),
+                                "end": int(span["endTimeUnixNano"]),
+                                "attributes": {attribute["key"]: next(iter(attribute["value"].values()))
+                                               for attribute in span["attributes"]},
+                                "error": span.get("status", {}).get("message"),
+                            })
+    except FileNotFoundError:
+        pass
+    return spans
+
+
+def critical_path(spans):
+    """Return [(depth, span, self time in ns)] along the critical path of a trace.
+
+    From the end of each span, the child that finished last is on the path, then the
+    child that finished last before that one started, and so on.
+    """
+    children = defaultdict(list)
+    ids = {span["id"] for span in spans}
+    roots = []
+    for span in spans:
+        if span["parent"] in ids:
+            children[span["parent"]].append(span)
+        else:
+            roots.append(span)
+    path = []
+
+    def walk(span, depth):
+        entry = [depth, span, span["end"] - span["start"]]
+        path.append(entry)
+        cursor = span["end"]
+        chosen = []
+        for child in sorted(children[span["id"]], key=lambda child: child["end"], reverse=True):
+            if child["end"] <= cursor:
+                chosen.append(child)
+                cursor = child["start"]
+        for child in reversed(chosen):
+            entry[2] -= child["end"] - child["start"]
+            walk(child, depth + 1)
+
+    for root in sorted(roots, key=lambda root: root["start"]):
+        walk(root, 0)
+    return [tuple(entry) for entry in path]
+
+
+def summarize_trace(trace_id, spans):
+    """Format the critical path of a trace from its spans, with time per category of work."""
+    if not spans:
+        return f"No spans recorded for trace {trace_id}."
+    steps = critical_path(spans)
+    total = max(span["end"] for span in spans) - min(span["start"] for span in spans)
+    lines = [f"Trace {trace_id}: {total / 1e9:.2f}s, critical path:"]
+    by_category = defaultdict(int)
+    for depth, span, self_time in steps:
+        duration = span["end"] - span["start"]
+        category = span["attributes"].get("category", "other")
+        by_category[category] += max(self_time, 0)
+        error = f"  [{span['error'][:80]}]" if span["error"] else ""
+        lines.append(f"  {duration / 1e9:8.3f}s {'  ' * depth}{span['name']} ({span['service']}){error}")
+    lines.append("  time on critical path: " + ", ".join(
+        f"{category} {nanoseconds / 1e9:.2f}s ({nanoseconds / total:.0%})"
+        for category, nanoseconds in sorted(by_category.items(), key=lambda item: -item[1])))
+    return "\n".join(lines)
+
+
+# spans of the MCP server process and its upstream clients
+tracer = Tracer("congress")
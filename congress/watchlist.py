@@ -0,0 +1,218 @@
+"""
+Watch-list of bills with alerts on new actions.
+
+Instead of polling the actions of every watched bill, each cycle requests the bill
+list with fromDateTime set to the previous poll, which returns every bill updated
+since then in one request (more only when over 250 bills changed). The updated
+bills are intersected with the watch set, and only for watched bills that changed
+are the actions fetched. Actions are listed newest first, so the new ones are the
+first (count - previously seen count) items.
+
+New actions are appended to an NDJSON feed (cache/watch/feed.ndjson), one entry
+per action with an increasing seq, and passed to registered listeners, which the
+server uses to send MCP notifications to subscribed sessions.
+
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import logging
+import os
+import threading
+
+from records import Bill
+
+WATCH_FILE = os.environ.get("CONGRESS_WATCH_FILE", "cache/watch/watchlist.json")
+FEED_FILE = os.environ.get("CONGRESS_WATCH_FEED", "cache/watch/feed.ndjson")
+POLL_INTERVAL = int(os.environ.get("CONGRESS_WATCH_POLL_SECONDS", 5 * 60))
+PAGE_SIZE = 250
+
+logger = logging.getLogger(__name__)
+
+
+def utc_now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def watch_key(congress, bill_type, bill_number):
+    return f"{congress}-{bill_type.upper()}-{bill_number}"
+
+
+class WatchList:
+    """ Watched bills, the last poll time and the feed of new actions.
+
+    Usage example:
+    watch_list = WatchList()
+    watch_list.add(CDGClient(), 118, "hr", 815)
+    entries = watch_list.poll(CDGClient())
+    """
+
+    def __init__(self, path=WATCH_FILE, feed_path=FEED_FILE):
+        self.path = Path(path)
+        self.feed_path = Path(feed_path)
+        self.listeners = []
+        self._lock = threading.RLock()
+        try:
+            self.state = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            self.state = {"bills": {}, "lastPoll": None, "seq": 0}
+
+    @property
+    def bills(self):
+        return self.state["bills"]
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".part")
+        tmp_path.write_text(json.dumps(self.state))
+        os.replace(tmp_path, self.path)
+
+    def _actions(self, client, key, limit):
+        congress, bill_type, number = key.split("-")
+        return client.get(f"bill/{congress}/{bill_type.lower()}/{number}/actions", params={"limit": limit})
+
+    def add(self, client, congress, bill_type, bill_number):
+        """Watch a bill, recording its current action count as the baseline.
+
+        Returns:
+            tuple: The watch entry and the status code of the actions request.
+        """
+        key = watch_key(congress, bill_type, bill_number)
+        with self._lock:
+            if key in self.bills:
+                return self.bills[key], 200
+        data, status = self._actions(client, key, 1)
+        if status != 200:
+            return None, status
+        actions = data.get("actions", [])
+        with self._lock:
+            self.bills[key] = {
+                "actions": data.get("pagination", {}).get("count", len(actions)),
+                "latestActionDate": actions[0].get("actionDate") if actions else None,
+                "since": utc_now(),
+            }
+            if self.state["lastPoll"] is None:
+                self.state["lastPoll"] = utc_now()
+            self._save()
+            return self.bills[key], 200
+
+    def remove(self, congress, bill_type, bill_number):
+        with self._lock:
+            removed = self.bills.pop(watch_key(congress, bill_type, bill_number), None)
+            self._save()
+        return removed is not None
+
+    def updated_bills(self, client, since, until):
+        """Return the keys of every bill updated between since and until, or None on failure."""
+        keys = set()
+        offset = 0
+        while True:
+            data, status = client.get("bill", params={
+                "fromDateTime": since, "toDateTime": until, "sort": "updateDate asc",
+                "limit": PAGE_SIZE, "offset": offset,
+            })
+            if status != 200:
+                logger.warning("bill updates since %s returned %d", since, status)
+                return None
+            items = data.get("bills", [])
+            keys.update(Bill.from_api(item).key for item in items)
+            offset += len(items)
+            if not items or offset >= data.get("pagination", {}).get("count", 0):
+                return keys
+
+    def poll(self, client):
+        """Check watched bills for new actions once.
+
+        Returns:
+            list: The new feed entries, also appended to the feed and passed to listeners.
+        """
+        with self._lock:
+            since = self.state["lastPoll"]
+            watched = set(self.bills)
+        until = utc_now()
+        if since is None or not watched:
+            with self._lock:
+                self.state["lastPoll"] = until
+                self._save()
+            return []
+        changed = self.updated_bills(client, since, until)
+        if changed is None:
+            # keep lastPoll, so the next cycle covers this window again
+            return []
+
+        entries = []
+        for key in sorted(changed & watched):
+            with self._lock:
+                if key not in self.bills:
+                    continue
+                seen = self.bills[key]["actions"]
+            data, status = self._actions(client, key, PAGE_SIZE)
+            if status != 200:
+                logger.warning("actions of %s returned %d", key, status)
+                continue
+            actions = data.get("actions", [])
+            count = data.get("pagination", {}).get("count", len(actions))
+            new = actions[:max(0, count - seen)]
+            for action in reversed(new):
+                entries.append({"bill": key, "action": action, "detectedAt": until})
+            with self._lock:
+                if key in self.bills:
+                    self.bills[key]["actions"] = count
+                    if actions:
+                        self.bills[key]["latestActionDate"] = actions[0].get("actionDate")
+
+        with self._lock:
+            for entry in entries:
+                self.state["seq"] += 1
+                entry["seq"] = self.state["seq"]
+            if entries:
+                self.feed_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.feed_path, "a", encoding="utf-8") as feed:
+                    feed.writelines(json.dumps(entry) + "\n" for entry in entries)
+            self.state["lastPoll"] = until
+            self._save()
+        logger.info("%d watched bills updated, %d new actions", len(changed & watched), len(entries))
+        if entries:
+            for listener in self.listeners:
+                listener(entries)
+        return entries
+
+    def feed(self, after=0, limit=100):
+        """Return up to limit feed entries with a seq greater than after."""
+        entries = []
+        try:
+            with open(self.feed_path, encoding="utf-8") as feed:
+                for line in feed:
+                    entry = json.loads(line)
+                    if entry["seq"] > after:
+                        entries.append(entry)
+                        if len(entries) >= limit:
+                            break
+        except FileNotFoundError:
+            pass
+        return entries
+
+
+class BillWatcher(threading.Thread):
+    """ Polls a WatchList in the background on a schedule.
+
+    Usage example:
+    BillWatcher(watch_list, lambda: CDGClient(), interval=300).start()
+    """
+
+    def __init__(self, watch_list, client_factory, interval=POLL_INTERVAL):
+        super().__init__(name="bill watcher", daemon=True)
+        self.watch_list = watch_list
+        self.client_factory = client_factory
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.watch_list.poll(self.client_factory())
+            except Exception as e:
+                logger.warning("bill watch poll failed: %s", e)
+
+    def stop(self):
+        self._stop_event.set()
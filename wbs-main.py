@@ -1,10 +1,49 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from pathlib import Path
+import asyncio
+import json
+import logging
+import os
+import sys
+
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "congress"))
+
+from pipeline import PipelineAggregates  # noqa: E402
+
+# how often the pipeline aggregates pick up newly ingested bills and actions
+REFRESH_SECONDS = int(os.environ.get("CONGRESS_DASHBOARD_REFRESH_SECONDS", 60))
+CACHE_CONTROL = f"public, max-age={REFRESH_SECONDS}"
+
+logger = logging.getLogger(__name__)
+pipeline = PipelineAggregates()
+# JSON bodies by (congress, version), encoded once per snapshot
+encoded_snapshots = {}
+
+
+async def refresh_pipeline():
+    while True:
+        try:
+            await asyncio.to_thread(pipeline.refresh)
+        except Exception as e:
+            logger.warning("pipeline refresh failed: %s", e)
+        await asyncio.sleep(REFRESH_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await asyncio.to_thread(pipeline.refresh)
+    task = asyncio.create_task(refresh_pipeline())
+    yield
+    task.cancel()
+
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Mount static files directory
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -13,10 +52,37 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
 
+def cache_headers(request, snapshot, variant):
+    """Return (headers, not_modified) for a snapshot; the ETag changes only when the aggregates do."""
+    etag = f'W/"{variant}-{snapshot["congress"]}-{snapshot["version"]}"'
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}, request.headers.get("if-none-match") == etag
+
+
 # Define root endpoint
 @app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request, "title": "My FastAPI Website"})
+async def read_root(request: Request, congress: int | None = None):
+    snapshot = pipeline.snapshot(congress)
+    headers, not_modified = cache_headers(request, snapshot, "html")
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return templates.TemplateResponse("index.html", {
+        "request": request,
+        "title": f"Legislative pipeline, {snapshot['congress']}th Congress" if snapshot["congress"] else "Legislative pipeline",
+        "pipeline": snapshot,
+    }, headers=headers)
+
+
+@app.get("/api/pipeline")
+async def read_pipeline(request: Request, congress: int | None = None):
+    snapshot = pipeline.snapshot(congress)
+    headers, not_modified = cache_headers(request, snapshot, "json")
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    key = (snapshot["congress"], snapshot["version"])
+    if key not in encoded_snapshots:
+        encoded_snapshots.clear()
+        encoded_snapshots[key] = json.dumps(snapshot).encode()
+    return Response(encoded_snapshots[key], media_type="application/json", headers=headers)
 
 # Run the application
 if __name__ == "__main__":